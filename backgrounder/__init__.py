@@ -1,6 +1,55 @@
 __version__ = "0.2.0"
 
-from .decorator import background
-from .tasks import Task, Tasks
+from typing import TYPE_CHECKING, Any, Dict, List
 
-__all__ = ["background", "Task", "Tasks"]
+if TYPE_CHECKING:
+    from .batch import BatchedTask
+    from .decorator import background
+    from .handle import TaskHandle
+    from .queue import TaskQueue
+    from .results import GroupResult, TaskResult
+    from .runner import portal
+    from .tasks import Task, Tasks
+
+__all__ = [
+    "background",
+    "BatchedTask",
+    "GroupResult",
+    "portal",
+    "Task",
+    "TaskHandle",
+    "TaskQueue",
+    "TaskResult",
+    "Tasks",
+]
+
+# The public objects are imported on first access, so `import backgrounder` (and the
+# `backgrounder` command) does not pay for anyio and the event loop machinery upfront.
+_LAZY_IMPORTS: Dict[str, str] = {
+    "background": ".decorator",
+    "BatchedTask": ".batch",
+    "GroupResult": ".results",
+    "portal": ".runner",
+    "Task": ".tasks",
+    "TaskHandle": ".handle",
+    "TaskQueue": ".queue",
+    "TaskResult": ".results",
+    "Tasks": ".tasks",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cached in the module, the next accesses don't go through __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
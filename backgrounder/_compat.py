@@ -1,15 +1,39 @@
 import asyncio
 import functools
+import types
+import weakref
 from typing import Any
 
+_async_callables: "weakref.WeakKeyDictionary[Any, bool]" = weakref.WeakKeyDictionary()
+
+
+def _is_async_callable(obj: Any) -> bool:
+    return asyncio.iscoroutinefunction(obj) or (
+        callable(obj) and asyncio.iscoroutinefunction(obj.__call__)
+    )
+
 
 def is_async_callable(obj: Any) -> bool:
     """
     Validates if a given object is an async callable or not.
+
+    The answer is cached per callable for as long as it is alive. Partials and bound
+    methods are created on the fly, so the callable they wrap is the one cached.
     """
     while isinstance(obj, functools.partial):
         obj = obj.func
+    if isinstance(obj, types.MethodType):
+        obj = obj.__func__
 
-    return asyncio.iscoroutinefunction(obj) or (
-        callable(obj) and asyncio.iscoroutinefunction(obj.__call__)
-    )
+    try:
+        return _async_callables[obj]
+    except (KeyError, TypeError):
+        # TypeError when the callable is not hashable or cannot be weakly referenced.
+        pass
+
+    result = _is_async_callable(obj)
+    try:
+        _async_callables[obj] = result
+    except TypeError:
+        pass
+    return result
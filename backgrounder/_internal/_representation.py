@@ -8,7 +8,7 @@ class BaseRepr:
         keys = self.__slots__
         if not keys and hasattr(self, "__dict__"):
             keys = self.__dict__.keys()  # type: ignore
-        attrs = ((s, getattr(self, s)) for s in keys)  # type: ignore
+        attrs = ((s, getattr(self, s)) for s in keys if not s.startswith("_"))  # type: ignore
         return [(a, v) for a, v in attrs if v is not None]  # type: ignore
 
     def __pretty__(self, fmt: Callable[[Any], Any], **kwargs: Any) -> Generator[Any, None, None]:
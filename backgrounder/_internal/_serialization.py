@@ -0,0 +1,68 @@
+import importlib
+import inspect
+import pickle
+from typing import Any, Callable, Tuple
+
+from backgrounder.exceptions import NotPicklableError
+
+
+def callable_path(func: Callable[..., Any]) -> str:
+    """
+    The import path of a module level callable, as `module:qualname`.
+    """
+    func = getattr(func, "_func", func)
+    module = getattr(func, "__module__", None)
+    qualname = getattr(func, "__qualname__", None)
+    if module is None or qualname is None or "<" in qualname:
+        raise NotPicklableError(f"{func!r} is not defined at module level.")
+    return f"{module}:{qualname}"
+
+
+def import_callable(path: str) -> Callable[..., Any]:
+    """
+    Imports the callable of `callable_path()`, unwrapping the decorators.
+    """
+    module, _, qualname = path.partition(":")
+    obj: Any = importlib.import_module(module)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    func: Callable[..., Any] = inspect.unwrap(obj)
+    return func
+
+
+def dumps(value: Any, what: str = "The value") -> bytes:
+    try:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError) as exc:
+        raise NotPicklableError(f"{what} cannot be pickled: {exc}") from exc
+
+
+def loads(data: bytes) -> Any:
+    return pickle.loads(data)
+
+
+def _resolve(module: str, qualname: str) -> "Unwrapped":
+    return Unwrapped(import_callable(f"{module}:{qualname}"))
+
+
+class Unwrapped:
+    """
+    A picklable reference to a decorated function.
+
+    Pickling the function by name would resolve to the decorator wrapper, so the
+    reference is resolved and unwrapped again in the worker process.
+    """
+
+    __slots__ = ("_func",)
+
+    def __init__(self, func: Callable[..., Any]) -> None:
+        self._func = func
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._func(*args, **kwargs)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        qualname = self._func.__qualname__
+        if "<locals>" in qualname:
+            raise pickle.PicklingError(f"{qualname} is not defined at module level.")
+        return (_resolve, (self._func.__module__, qualname))
@@ -0,0 +1,281 @@
+import logging
+import sys
+from contextvars import ContextVar
+from types import TracebackType
+from typing import Any, Awaitable, Callable, List, MutableMapping, Set, Type, Union
+
+if sys.version_info >= (3, 10):  # pragma: no cover
+    from typing import ParamSpec
+else:  # pragma: no cover
+    from typing_extensions import ParamSpec
+
+import anyio
+from anyio import CapacityLimiter
+from anyio.abc import TaskGroup
+
+from backgrounder.tasks import Task
+
+P = ParamSpec("P")
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+logger = logging.getLogger("backgrounder")
+
+_request_tasks: ContextVar[Union[List[Task], None]] = ContextVar(
+    "backgrounder_request_tasks", default=None
+)
+
+
+def add(task: Task) -> None:
+    """
+    Runs a task, or a `Tasks`, once the response of the current request is sent.
+
+    Raises a `RuntimeError` outside of a request going through the
+    [middleware](./asgi.md).
+    """
+    tasks = _request_tasks.get()
+    if tasks is None:
+        raise RuntimeError("No request is going through the BackgroundMiddleware.")
+    tasks.append(task)
+
+
+def add_task(func: Callable[P, Any], *args: P.args, **kwargs: P.kwargs) -> None:
+    """
+    Runs `func(*args, **kwargs)` once the response of the current request is sent.
+
+    **Example**
+
+    ```python
+    from backgrounder.asgi import add_task
+
+    @post("/users")
+    async def create_user(data: User) -> User:
+        user = await User.query.create(**data.model_dump())
+        add_task(send_welcome_email, user.email)
+        return user
+    ```
+    """
+    add(Task(func, *args, **kwargs))
+
+
+class AfterResponseRunner:
+    """
+    Runs the tasks handed over by the [middleware](./asgi.md) in a task group living as
+    long as the application, with at most `max_concurrency` tasks at once for all the
+    requests.
+
+    The runner is started and drained by the lifespan of the application, or by
+    `async with runner:`. Leaving it waits for the tasks still running or waiting, up
+    to `drain_timeout` seconds, then cancels the rest.
+
+    The tasks are not retried, the errors are logged.
+    """
+
+    __slots__ = (
+        "max_concurrency",
+        "drain_timeout",
+        "_limiter",
+        "_group",
+        "_closing",
+        "_scopes",
+        "_pending",
+        "_idle",
+    )
+
+    def __init__(self, max_concurrency: int = 100, drain_timeout: float = 30.0) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than zero.")
+
+        self.max_concurrency = max_concurrency
+        self.drain_timeout = drain_timeout
+        self._limiter = CapacityLimiter(max_concurrency)
+        self._group: Union[TaskGroup, None] = None
+        # Set by drain(), the group stays open until the runner is left.
+        self._closing = False
+        # One scope per task, cancelling the group would cancel the lifespan with it.
+        self._scopes: Set[anyio.CancelScope] = set()
+        self._pending = 0
+        self._idle: Union[anyio.Event, None] = None
+
+    @property
+    def started(self) -> bool:
+        return self._group is not None and not self._closing
+
+    def __len__(self) -> int:
+        """
+        The number of tasks running or waiting for a slot.
+        """
+        return self._pending
+
+    async def _run(self, task: Task) -> None:
+        scope = anyio.CancelScope()
+        self._scopes.add(scope)
+        try:
+            with scope:
+                async with self._limiter:
+                    await task()
+        except Exception:
+            logger.exception("Error while running the task %s after the response.", task.name)
+        finally:
+            self._scopes.discard(scope)
+            self._pending -= 1
+            if self._pending == 0 and self._idle is not None:
+                self._idle.set()
+
+    def submit(self, tasks: List[Task]) -> None:
+        """
+        Schedules the tasks in the task group of the runner, without waiting for them.
+        """
+        if not self.started:
+            raise RuntimeError("The runner is not started.")
+        for task in tasks:
+            self._pending += 1
+            self._group.start_soon(self._run, task)
+
+    async def run(self, tasks: List[Task]) -> None:
+        """
+        Runs the tasks in the current task, sharing the concurrency limit of the runner.
+        Used when the runner is not started.
+        """
+        for task in tasks:
+            self._pending += 1
+            await self._run(task)
+
+    async def drain(self) -> None:
+        """
+        Waits for the submitted tasks, up to `drain_timeout` seconds, and cancels the
+        ones left.
+        """
+        if not self.started:
+            return
+        self._closing = True
+        if self._pending:
+            self._idle = anyio.Event()
+            with anyio.move_on_after(self.drain_timeout):
+                await self._idle.wait()
+            self._idle = None
+        if self._pending:
+            logger.warning("Cancelling %s tasks not finished after draining.", self._pending)
+            for scope in self._scopes:
+                scope.cancel()
+
+    async def __aenter__(self) -> "AfterResponseRunner":
+        if self._group is not None:
+            raise RuntimeError("The runner is already started.")
+        group = anyio.create_task_group()
+        await group.__aenter__()
+        self._group = group
+        self._closing = False
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Union[Type[BaseException], None],
+        exc_value: Union[BaseException, None],
+        traceback: Union[TracebackType, None],
+    ) -> Union[bool, None]:
+        assert self._group is not None
+        group = self._group
+        try:
+            await self.drain()
+        finally:
+            self._group = None
+            self._closing = False
+        return await group.__aexit__(exc_type, exc_value, traceback)
+
+
+class BackgroundMiddleware:
+    """
+    An ASGI middleware running the tasks added during a request with
+    [add_task()](./asgi.md) once the response is sent, so they never add to its
+    latency.
+
+    The tasks are handed to the `runner` once the last `http.response.body` message,
+    the one without `more_body`, is sent. The runner is started and drained by the
+    lifespan of the application. Without a lifespan, the tasks run in the task of the
+    request, after the response.
+
+    The tasks of a request that did not send a complete response are discarded.
+
+    **Example**
+
+    ```python
+    from esmerald import Esmerald
+    from lilya.middleware import DefineMiddleware
+
+    from backgrounder.asgi import BackgroundMiddleware
+
+    app = Esmerald(
+        routes=[...],
+        middleware=[DefineMiddleware(BackgroundMiddleware, max_concurrency=50)],
+    )
+    ```
+    """
+
+    __slots__ = ("app", "runner")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        runner: Union[AfterResponseRunner, None] = None,
+        max_concurrency: int = 100,
+        drain_timeout: float = 30.0,
+    ) -> None:
+        self.app = app
+        self.runner = (
+            AfterResponseRunner(max_concurrency, drain_timeout) if runner is None else runner
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(scope, receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _lifespan(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.runner.started:
+            # Started by the application itself or by an outer middleware.
+            await self.app(scope, receive, send)
+            return
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "lifespan.shutdown":
+                # Drained before the shutdown handlers close what the tasks may use.
+                await self.runner.drain()
+            return message
+
+        async with self.runner:
+            await self.app(scope, receive_wrapper, send)
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tasks: List[Task] = []
+        sent = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal sent
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                sent = True
+                if tasks and self.runner.started:
+                    self.runner.submit(tasks[:])
+                    tasks.clear()
+
+        token = _request_tasks.set(tasks)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_tasks.reset(token)
+
+        if sent and tasks:
+            # Added after the response, or without a started runner.
+            if self.runner.started:
+                self.runner.submit(tasks)
+            else:
+                await self.runner.run(tasks)
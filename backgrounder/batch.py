@@ -0,0 +1,179 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple, Union
+
+import anyio
+
+from backgrounder.handle import TaskHandle
+from backgrounder.runner import get_runner
+from backgrounder.tasks import Task
+
+
+class BatchedTask:
+    """
+    Buffers many small calls to the same function and runs them as one bulk call.
+
+    The `func` receives the list of the positional argument tuples of every buffered call.
+    The buffer is flushed when it reaches `max_size` calls or when `max_wait` seconds
+    passed since the first call of the batch, whatever happens first.
+
+    The bulk calls run in the shared [runner](./runner.md), so calls can be buffered from
+    any thread or event loop.
+
+    **Example**
+
+    ```python
+    from backgrounder import BatchedTask, Task, Tasks
+
+    def write_rows(rows: list) -> None:
+        # One INSERT for all the rows.
+        ...
+
+    write_row = BatchedTask(write_rows, max_size=500, max_wait=0.05)
+
+    # From blocking code, returns a TaskHandle immediately.
+    write_row.submit(1, "first")
+
+    # From async code, waits for the batch to be written.
+    await write_row(2, "second")
+
+    # As any other callable.
+    tasks = Tasks([Task(write_row, 3, "third"), Task(write_row, 4, "fourth")], as_group=True)
+    await tasks()
+    ```
+
+    Every call of the same batch shares the same handle, whose result is the return of the
+    bulk call. The buffered calls cannot be cancelled.
+    """
+
+    __slots__ = ("func", "max_size", "max_wait", "_lock", "_buffer", "_future", "_generation")
+
+    def __init__(
+        self,
+        func: Callable[[List[Tuple[Any, ...]]], Any],
+        max_size: int = 100,
+        max_wait: float = 0.1,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be greater than zero.")
+        if max_wait < 0:
+            raise ValueError("max_wait cannot be negative.")
+
+        self.func = func
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._buffer: List[Tuple[Any, ...]] = []
+        self._future: "Future[Any]" = self._new_future()
+        self._generation = 0
+
+    @staticmethod
+    def _new_future() -> "Future[Any]":
+        future: "Future[Any]" = Future()
+        # The calls of a batch are shared, so they cannot be cancelled individually.
+        future.set_running_or_notify_cancel()
+        return future
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def submit(self, *args: Any) -> TaskHandle:
+        """
+        Buffers a call and returns the handle of its batch without waiting.
+        """
+        batch = None
+        with self._lock:
+            self._buffer.append(args)
+            future = self._future
+            generation = self._generation
+            first = len(self._buffer) == 1
+            if len(self._buffer) >= self.max_size:
+                batch = self._take()
+
+        # The runner is never called while holding the lock, the flush timer needs it.
+        if batch is not None:
+            self._dispatch(batch, future)
+        elif first:
+            get_runner().submit(self._flush_later, generation)
+        return TaskHandle(future)
+
+    async def __call__(self, *args: Any) -> Any:
+        """
+        Buffers a call and waits for its batch to run.
+        """
+        return await self.submit(*args)
+
+    def flush(self) -> Union[TaskHandle, None]:
+        """
+        Runs the buffered calls straight away. Returns the handle of the batch or None
+        if there was nothing to run.
+        """
+        with self._lock:
+            if not self._buffer:
+                return None
+            future = self._future
+            batch = self._take()
+
+        self._dispatch(batch, future)
+        return TaskHandle(future)
+
+    def _take(self) -> List[Tuple[Any, ...]]:
+        batch, self._buffer = self._buffer, []
+        self._future = self._new_future()
+        self._generation += 1
+        return batch
+
+    async def _flush_later(self, generation: int) -> None:
+        await anyio.sleep(self.max_wait)
+        with self._lock:
+            if generation != self._generation or not self._buffer:
+                return
+            future = self._future
+            batch = self._take()
+        await self._run(batch, future)
+
+    def _dispatch(self, batch: List[Tuple[Any, ...]], future: "Future[Any]") -> None:
+        get_runner().submit(self._run, batch, future)
+
+    async def _run(self, batch: List[Tuple[Any, ...]], future: "Future[Any]") -> None:
+        try:
+            result = await Task(self.func, batch)()
+        except BaseException as exc:
+            future.set_exception(exc)
+            if not isinstance(exc, Exception):
+                raise
+        else:
+            future.set_result(result)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self.func!r}, max_size={self.max_size}, "
+            f"max_wait={self.max_wait})"
+        )
+
+
+def batched(
+    max_size: int = 100, max_wait: float = 0.1
+) -> Callable[[Callable[[List[Tuple[Any, ...]]], Any]], BatchedTask]:
+    """
+    Decorator turning a bulk function into a [BatchedTask](#batchedtask). Also available as
+    `background.batched`.
+
+    **Example**
+
+    ```python
+    from backgrounder import background
+
+    @background.batched(max_size=500, max_wait=0.05)
+    def send_metrics(metrics: list) -> None:
+        ...
+
+    send_metrics.submit("requests", 1)
+    await send_metrics("errors", 1)
+    ```
+    """
+
+    def decorator(func: Callable[[List[Tuple[Any, ...]]], Any]) -> BatchedTask:
+        return BatchedTask(func, max_size=max_size, max_wait=max_wait)
+
+    return decorator
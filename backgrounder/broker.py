@@ -0,0 +1,310 @@
+import contextlib
+import multiprocessing
+import os
+import queue
+import secrets
+import socket
+import stat
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from multiprocessing.managers import BaseManager
+from types import TracebackType
+from typing import Any, Dict, Tuple, Type, Union
+
+from backgrounder.journal import decode, encode
+from backgrounder.tasks import Task
+
+Message = Tuple[str, bytes]
+"""
+A serialized task, the import path of its callable and its pickled payload.
+"""
+
+
+def _default_address() -> str:
+    """
+    A socket in a directory private to the user, the runtime directory of the session
+    when there is one.
+    """
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, "backgrounder.sock")
+    directory = os.path.join(tempfile.gettempdir(), f"backgrounder-{os.getuid()}")
+    return os.path.join(directory, "backgrounder.sock")
+
+
+DEFAULT_ADDRESS = _default_address()
+AUTHKEY_ENVIRON = "BACKGROUNDER_AUTHKEY"
+
+
+class Broker(ABC):
+    """
+    The transport between the processes submitting tasks and the
+    [workers](./worker.md) running them.
+
+    A broker moves `Message` tuples, built from a task by the same encoding as the
+    [journal](./journal.md), so only module level callables can be sent. The methods
+    are blocking, the workers call them from a thread.
+
+    A broker is given to every worker process, so it must be picklable and should
+    only connect on first use.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def publish(self, message: Message) -> None:
+        """
+        Adds a message to the queue.
+        """
+
+    @abstractmethod
+    def consume(self, timeout: float) -> Union[Message, None]:
+        """
+        Takes the next message, waiting at most `timeout` seconds for one. Returns None
+        when the queue stayed empty.
+        """
+
+    @abstractmethod
+    def qsize(self) -> int:
+        """
+        The number of messages waiting, used to scale the workers.
+        """
+
+    def close(self) -> None:
+        """
+        Releases the connection of the broker, if any.
+        """
+        return None
+
+    def send(self, task: Task) -> None:
+        """
+        Serializes a task and publishes it.
+        """
+        self.publish(encode(task))
+
+    def receive(self, timeout: float) -> Union[Task, None]:
+        """
+        Consumes a message and rebuilds its task.
+        """
+        message = self.consume(timeout)
+        return None if message is None else decode(*message)
+
+
+_queue: "queue.Queue[Message]" = queue.Queue()
+
+
+def _get_queue() -> "queue.Queue[Message]":
+    return _queue
+
+
+class _QueueManager(BaseManager):
+    pass
+
+
+_QueueManager.register("get_queue", callable=_get_queue)
+
+
+def _parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """
+    A `host:port` address is a TCP one, anything else a Unix socket path.
+    """
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit() and os.sep not in address:
+        return (host, int(port))
+    return address
+
+
+def _check_owner(path: str) -> None:
+    """
+    Refuses a file of another user, who could be listening in place of the server or
+    have written its own key.
+    """
+    if os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"{path} belongs to another user.")
+
+
+def _private_directory(path: str) -> None:
+    """
+    Creates the default directory of the socket, checking that nobody else created it
+    first.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    _check_owner(path)
+    if stat.S_IMODE(os.stat(path).st_mode) & 0o077:
+        raise PermissionError(f"{path} is accessible to other users.")
+
+
+def _write_key(path: str, key: bytes) -> None:
+    try:
+        _check_owner(path)
+    except FileNotFoundError:
+        pass
+    else:
+        os.unlink(path)
+    # Fails rather than writing in a file created by someone else in the meantime.
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(key)
+
+
+def _read_key(path: str) -> bytes:
+    _check_owner(path)
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def _remove_stale_socket(path: str) -> None:
+    """
+    Removes the socket left behind by a server that did not stop cleanly, refusing to
+    replace one that still answers.
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket.")
+
+    with socket.socket(socket.AF_UNIX) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise RuntimeError(f"A queue is already served on {path}.")
+
+
+class LocalBroker(Broker):
+    """
+    A broker keeping the queue in memory, in a server process reachable through a
+    Unix socket or a `host:port` TCP address.
+
+    One process serves the queue with `serve()`, usually the `backgrounder worker`
+    command, and the others connect to it by creating a `LocalBroker` with the same
+    address and authentication key.
+
+    The workers unpickle the messages, anyone able to connect can run code in them.
+    Without an `authkey`, given explicitly or by the `BACKGROUNDER_AUTHKEY`
+    environment variable, `serve()` generates a random one and writes it next to the
+    Unix socket, in a file only readable by its owner, where the clients of the same
+    user find it. A TCP address needs an explicit `authkey` and is otherwise refused.
+    The clients refuse a socket or a key file belonging to another user.
+
+    **Example**
+
+    ```python
+    from backgrounder import Task
+    from backgrounder.broker import LocalBroker
+
+    broker = LocalBroker("/tmp/backgrounder.sock")
+    broker.send(Task(send_email_notification, "Account created"))
+    ```
+
+    The queue does not survive the server process, the messages waiting when it stops
+    are lost.
+    """
+
+    __slots__ = ("address", "authkey", "_local", "_server", "_keyfile")
+
+    def __init__(
+        self, address: str = DEFAULT_ADDRESS, authkey: Union[bytes, str, None] = None
+    ) -> None:
+        if not authkey:
+            authkey = os.environ.get(AUTHKEY_ENVIRON)
+        if not authkey and not isinstance(_parse_address(address), str):
+            raise ValueError(f"A TCP address needs an authkey, pass one or set {AUTHKEY_ENVIRON}.")
+
+        self.address = address
+        # None until read from the key file of the socket, or generated by serve().
+        self.authkey: Union[bytes, None] = (
+            authkey.encode() if isinstance(authkey, str) else authkey or None
+        )
+        self._local = threading.local()
+        self._server: Union[_QueueManager, None] = None
+        self._keyfile: Union[str, None] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"address": self.address, "authkey": self.authkey}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["address"], state["authkey"])  # type: ignore[misc]
+
+    @property
+    def _proxy(self) -> Any:
+        # The proxies are not thread safe, each thread has its own connection.
+        proxy = getattr(self._local, "queue", None)
+        if proxy is None:
+            address = _parse_address(self.address)
+            if isinstance(address, str):
+                _check_owner(address)
+                if self.authkey is None:
+                    self.authkey = _read_key(f"{address}.key")
+            manager = _QueueManager(address, self.authkey)
+            manager.connect()
+            proxy = self._local.queue = manager.get_queue()  # type: ignore[attr-defined]
+        return proxy
+
+    def serve(self) -> "LocalBroker":
+        """
+        Starts the server process holding the queue. Stopped by `close()` or by leaving
+        the context.
+
+        Raises a `RuntimeError` when another server already answers on the Unix socket.
+        """
+        address = _parse_address(self.address)
+        if isinstance(address, str):
+            directory = os.path.dirname(address)
+            if directory == os.path.dirname(DEFAULT_ADDRESS):
+                _private_directory(directory)
+            _remove_stale_socket(address)
+            if self.authkey is None:
+                self.authkey = secrets.token_hex(32).encode()
+                self._keyfile = f"{address}.key"
+                _write_key(self._keyfile, self.authkey)
+
+        server = _QueueManager(address, self.authkey, ctx=multiprocessing.get_context("spawn"))
+        server.start()
+        if isinstance(address, str):
+            # The key guards the socket until then.
+            os.chmod(address, 0o600)
+        self._server = server
+        return self
+
+    def publish(self, message: Message) -> None:
+        self._proxy.put(message)
+
+    def consume(self, timeout: float) -> Union[Message, None]:
+        try:
+            message: Message = self._proxy.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return message
+
+    def qsize(self) -> int:
+        size: int = self._proxy.qsize()
+        return size
+
+    def close(self) -> None:
+        self._local = threading.local()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+        if self._keyfile is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self._keyfile)
+            self._keyfile = None
+
+    def __enter__(self) -> "LocalBroker":
+        return self if self._server is not None else self.serve()
+
+    def __exit__(
+        self,
+        exc_type: Union[Type[BaseException], None],
+        exc_value: Union[BaseException, None],
+        traceback: Union[TracebackType, None],
+    ) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(address={self.address!r})"
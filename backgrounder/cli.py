@@ -0,0 +1,143 @@
+import argparse
+import logging
+from typing import List, Union
+
+from backgrounder._internal._serialization import import_callable
+from backgrounder.broker import DEFAULT_ADDRESS, Broker, LocalBroker
+from backgrounder.worker import WorkerPool
+
+
+def _load_broker(path: str) -> Broker:
+    """
+    The broker at the `module:attribute` path, either an instance or a factory.
+    """
+    broker = import_callable(path)
+    if not isinstance(broker, Broker):
+        broker = broker()
+    if not isinstance(broker, Broker):
+        raise TypeError(f"{path} is not a Broker nor a function returning one.")
+    return broker
+
+
+def _worker(arguments: argparse.Namespace) -> int:
+    if arguments.uvloop and arguments.backend != "asyncio":
+        raise SystemExit("--uvloop only applies to the asyncio backend.")
+    pool_options = {
+        "processes": arguments.workers,
+        "max_processes": arguments.max_workers,
+        "concurrency": arguments.concurrency,
+        "prefetch": arguments.prefetch,
+        "scale_interval": arguments.scale_interval,
+        "drain_timeout": arguments.drain_timeout,
+        "backend": arguments.backend,
+        "backend_options": {"use_uvloop": True} if arguments.uvloop else None,
+    }
+
+    if arguments.broker is not None:
+        broker = _load_broker(arguments.broker)
+        WorkerPool(broker, **pool_options).run()
+        return 0
+
+    try:
+        local = LocalBroker(arguments.address, arguments.authkey)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    if arguments.connect:
+        WorkerPool(local, **pool_options).run()
+        return 0
+
+    try:
+        local.serve()
+    except (RuntimeError, FileExistsError) as exc:
+        raise SystemExit(str(exc)) from None
+    with local:
+        logging.getLogger("backgrounder").info("Serving the queue on %s.", arguments.address)
+        WorkerPool(local, **pool_options).run()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="backgrounder")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser(
+        "worker",
+        help="Run worker processes consuming tasks from a broker.",
+        description=(
+            "Serves a local queue (unless --connect or --broker is given) and runs worker "
+            "processes consuming it. SIGTERM and SIGINT drain the workers."
+        ),
+    )
+    worker.add_argument(
+        "--address",
+        default=DEFAULT_ADDRESS,
+        help="Unix socket path or host:port of the local queue (default: %(default)s).",
+    )
+    worker.add_argument(
+        "--authkey",
+        default=None,
+        help=(
+            "Authentication key of the local queue, required for a TCP address "
+            "(default: the BACKGROUNDER_AUTHKEY environment variable)."
+        ),
+    )
+    worker.add_argument(
+        "--connect",
+        action="store_true",
+        help="Connect to a local queue served by another process instead of serving one.",
+    )
+    worker.add_argument(
+        "--broker", help="module:attribute of a Broker, or of a function returning one."
+    )
+    worker.add_argument(
+        "-w", "--workers", type=int, default=1, help="Minimum number of worker processes."
+    )
+    worker.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Maximum number of worker processes when scaling with the queue depth.",
+    )
+    worker.add_argument(
+        "-c", "--concurrency", type=int, default=10, help="Concurrent tasks per process."
+    )
+    worker.add_argument(
+        "--prefetch",
+        type=int,
+        default=None,
+        help="Messages taken in advance per process (default: the concurrency).",
+    )
+    worker.add_argument(
+        "--scale-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between two checks of the queue depth.",
+    )
+    worker.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds given to the workers to finish their tasks on shutdown.",
+    )
+    worker.add_argument("--backend", choices=("asyncio", "trio"), default="asyncio")
+    worker.add_argument(
+        "--uvloop",
+        action="store_true",
+        help="Run the asyncio loops of the workers on uvloop, installed by the uvloop extra.",
+    )
+    worker.add_argument("--log-level", default="INFO")
+    worker.set_defaults(handler=_worker)
+    return parser
+
+
+def main(argv: Union[List[str], None] = None) -> int:
+    """
+    The entry point of the `backgrounder` command.
+    """
+    arguments = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=arguments.log_level.upper(),
+        format="%(asctime)s %(processName)s %(levelname)s %(message)s",
+    )
+    code: int = arguments.handler(arguments)
+    return code
@@ -1,25 +1,55 @@
-import asyncio
 import functools
+import pickle
+import threading
+import time
 from concurrent import futures
-from typing import Any, Awaitable, Callable, Coroutine, TypeVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Literal,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import anyio.to_thread
+from anyio import CapacityLimiter
 
+from backgrounder import instrumentation
 from backgrounder._compat import is_async_callable
+from backgrounder.exceptions import NotPicklableError
+from backgrounder.runner import get_runner
 
 T = TypeVar("T")
 
+Executor = Literal["thread", "process"]
+
+
+async def _await(awaitable: Awaitable[T]) -> T:
+    return await awaitable
+
 
 def run_sync(async_function: Coroutine) -> Any:
     """
-    Runs the queries in sync mode
+    Runs the queries in sync mode.
+
+    The coroutine is handed to the shared [runner](./runner.md) instead of creating a new
+    event loop per call.
     """
-    try:
-        return asyncio.run(async_function)
-    except RuntimeError:
+    runner = get_runner()
+    if runner.in_runner_thread():
+        # Blocking the loop of the runner on itself would deadlock.
         with futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(asyncio.run, async_function)
-            return future.result()
+            run = functools.partial(
+                anyio.run, backend=runner.backend, backend_options=runner.backend_options
+            )
+            return executor.submit(run, _await, async_function).result()
+    return runner.run(_await, async_function)
 
 
 async def run_in_threadpool(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
@@ -28,32 +58,183 @@ async def run_in_threadpool(func: Callable[..., T], *args: Any, **kwargs: Any) -
     Make sure the callable is always async.
     """
     def_func = AsyncCallable(func)
-    return await def_func(*args, *kwargs)
+    return await def_func(*args, **kwargs)
 
 
-def enforce_async_callable(func: Callable[..., Any]) -> Callable[..., Awaitable[T]]:
+def enforce_async_callable(
+    func: Callable[..., Any],
+    limiter: Union[CapacityLimiter, None] = None,
+    executor: Executor = "thread",
+    cancellable: bool = False,
+) -> Callable[..., Awaitable[T]]:
     """
     Enforces the callable to be async by returning an AsyncCallable.
+
+    The `limiter` is used by the AsyncCallable to run the callable in the thread pool,
+    or in the process pool when the `executor` is "process". When `cancellable` is set,
+    cancelling the call doesn't wait for the blocking callable to finish.
     """
-    return func if is_async_callable(func) else AsyncCallable(func)
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Unknown executor {executor!r}, use 'thread' or 'process'.")
+
+    if is_async_callable(func):
+        if executor == "process":
+            raise ValueError("Only blocking callables can run in a process.")
+        return func
+
+    async_callable = AsyncCallable(func) if executor == "thread" else ProcessCallable(func)
+    async_callable.limiter = limiter
+    async_callable.cancellable = cancellable
+    return async_callable
 
 
 class AsyncCallable:
     """
     Creates an async callable and when called, runs in a thread pool.
+
+    By default the thread pool is limited by the default anyio limiter, shared with
+    the rest of the application. A dedicated `limiter` can be set to make sure the
+    background work doesn't starve other `to_thread` calls.
+
+    **Example**
+
+    ```python
+    from anyio import CapacityLimiter
+
+    from backgrounder.concurrency import AsyncCallable
+
+    async_callable = AsyncCallable(send_notification)
+    async_callable.limiter = CapacityLimiter(5)
+    ```
     """
 
-    __slots__ = ("_callable", "default_kwargs")
+    __slots__ = ("_callable", "default_kwargs", "limiter", "cancellable")
 
     def __init__(self, func: Callable[..., Any], **kwargs: Any) -> None:
         self._callable = func
         self.default_kwargs = kwargs
+        self.limiter: Union[CapacityLimiter, None] = None
+        # When cancelled, stops waiting for the thread instead of waiting for it to finish.
+        self.cancellable = False
 
     def __call__(self, *args: Any, **kwargs: Any) -> Awaitable[T]:
-        combined_kwargs = {**self.default_kwargs, **kwargs}
+        if self.default_kwargs:
+            kwargs = {**self.default_kwargs, **kwargs}
+        # The positional arguments go through to_thread, only the keyword ones need a partial.
+        func: Callable[..., T] = (
+            functools.partial(self._callable, **kwargs) if kwargs else self._callable
+        )
+        if instrumentation.instruments:
+            func = instrumentation.timed_in_thread(
+                func, instrumentation.callable_name(self._callable), time.monotonic()
+            )
         return anyio.to_thread.run_sync(
-            functools.partial(self._callable, **combined_kwargs), *args
+            func,
+            *args,
+            abandon_on_cancel=self.cancellable,
+            limiter=self.limiter,
         )
 
     async def run_in_threadpool(self, *args: Any, **kwargs: Any) -> T:
         return await self(*args, **kwargs)
+
+    def run_blocking(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Calls the callable in the current thread, used to run many calls in a single
+        trip to a worker thread.
+        """
+        if self.default_kwargs:
+            kwargs = {**self.default_kwargs, **kwargs}
+        return self._callable(*args, **kwargs)
+
+
+BlockingCall = Tuple[int, "AsyncCallable", Sequence[Any], Dict[str, Any]]
+"""
+A call of a chunk, its index in the results, the callable and its arguments.
+"""
+
+
+async def run_chunk(
+    calls: List[BlockingCall],
+    record: Callable[[int, Any, Union[Exception, None], float], None],
+    stop: threading.Event,
+    return_exceptions: bool = False,
+    limiter: Union[CapacityLimiter, None] = None,
+) -> None:
+    """
+    Runs blocking calls one after the other in a single trip to a worker thread, for
+    the many short calls where the thread hops cost more than the calls themselves.
+
+    `record` is called in the thread with the index of each call, its value or its
+    exception, and the moment it started. The first exception sets `stop` and is
+    raised, unless `return_exceptions` is set. The calls left are skipped once `stop`
+    is set, by a failure in another chunk of the same run or by its cancellation.
+    """
+
+    def run() -> Union[Exception, None]:
+        for index, func, args, kwargs in calls:
+            if stop.is_set():
+                return None
+            started = time.monotonic()
+            try:
+                value = func.run_blocking(*args, **kwargs)
+            except Exception as exc:
+                record(index, None, exc, started)
+                if not return_exceptions:
+                    stop.set()
+                    return exc
+            else:
+                record(index, value, None, started)
+        return None
+
+    exc = await anyio.to_thread.run_sync(run, limiter=limiter)
+    if exc is not None:
+        raise exc
+
+
+def _run_pickled(payload: bytes) -> Any:
+    func, args = pickle.loads(payload)
+    return func(*args)
+
+
+class ProcessCallable(AsyncCallable):
+    """
+    Creates an async callable and when called, runs in a worker process.
+
+    The worker processes are reused between calls (see `anyio.to_process`), which makes it
+    suitable for CPU bound work that would otherwise serialize on the GIL.
+
+    The callable and its arguments must be picklable, otherwise a `NotPicklableError`
+    is raised when called.
+
+    When `cancellable` is set, cancelling the call terminates the worker process.
+    """
+
+    __slots__ = ()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Awaitable[T]:
+        if self.default_kwargs:
+            kwargs = {**self.default_kwargs, **kwargs}
+        func = functools.partial(self._callable, **kwargs) if kwargs else self._callable
+        payload = self._pickle(func, args)
+        # Imported on first use, the process pool is optional.
+        import anyio.to_process
+
+        return anyio.to_process.run_sync(
+            _run_pickled, payload, cancellable=self.cancellable, limiter=self.limiter
+        )
+
+    def _pickle(self, func: Callable[..., Any], args: Tuple[Any, ...]) -> bytes:
+        try:
+            return pickle.dumps((func, args), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as exc:
+            try:
+                pickle.dumps(func, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                culprit = f"The callable {self._callable!r}"
+            else:
+                culprit = f"The arguments of {self._callable!r}"
+            raise NotPicklableError(
+                f"{culprit} cannot be sent to a worker process because it is not "
+                f"picklable: {exc}. Use module level functions and picklable arguments."
+            ) from exc
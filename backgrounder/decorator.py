@@ -1,35 +1,137 @@
 import functools
-from typing import Any, Callable
+from typing import Any, Callable, Dict, Hashable, Tuple, Union, overload
 
-import anyio.from_thread
-import anyio.to_thread
-import nest_asyncio
 import sniffio
 
-from backgrounder.concurrency import AsyncCallable, run_sync
+from backgrounder import instrumentation
+from backgrounder._compat import is_async_callable
+from backgrounder._internal._serialization import Unwrapped
+from backgrounder.batch import batched
+from backgrounder.concurrency import AsyncCallable, Executor, enforce_async_callable, run_sync
+from backgrounder.handle import TaskHandle
+from backgrounder.ratelimit import RateLimiter
+from backgrounder.runner import get_runner
+from backgrounder.singleflight import SingleFlight
 from backgrounder.tasks import Task
 
-nest_asyncio.apply()
 
+@overload
+def background(fn: Callable[..., Any]) -> Callable[..., Any]: ...
 
-def background(fn: Callable[..., Any]) -> Callable[..., Any]:
+
+@overload
+def background(
+    *,
+    wait: bool = True,
+    executor: Executor = "thread",
+    key: Union[Hashable, Callable[..., Hashable], None] = None,
+    single_flight: Union[SingleFlight, None] = None,
+    rate_limit: Union[RateLimiter, None] = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]: ...
+
+
+def background(
+    fn: Union[Callable[..., Any], None] = None,
+    *,
+    wait: bool = True,
+    executor: Executor = "thread",
+    key: Union[Hashable, Callable[..., Hashable], None] = None,
+    single_flight: Union[SingleFlight, None] = None,
+    rate_limit: Union[RateLimiter, None] = None,
+) -> Any:
     """
     Decorator used to run background tasks on the top
     of any function in async mode.
+
+    By default the caller waits for the function to finish. When `wait` is set
+    to False, the function is dispatched to the shared runner and a
+    [TaskHandle](./handle.md) is returned immediately.
+
+    Blocking functions run in a thread pool, unless `executor` is set to "process",
+    in which case they run in a reusable pool of worker processes. This is useful for
+    CPU bound work and requires the function to be defined at module level and its
+    arguments to be picklable.
+
+    With a `key`, the concurrent calls with the same key share one execution and its
+    result, see [single flight](./singleflight.md). The key is either a hashable value
+    or a function called with the arguments of the call.
+
+    With a `rate_limit`, every call waits for its turn in the given
+    [rate limiter](./ratelimit.md).
+
+    **Example**
+
+    ```python
+    from backgrounder import background
+
+    @background
+    def send_notification(message: str) -> None:
+        ...
+
+    @background(wait=False)
+    def send_email(message: str) -> None:
+        ...
+
+    @background(key=lambda tenant_id: tenant_id)
+    def rebuild_cache(tenant_id: int) -> None:
+        ...
+
+    send_notification("A notification")
+    handle = send_email("An email")
+    ```
     """
 
-    @functools.wraps(fn)
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
-        """
-        The wrapper covers for the decorator as individual as
-        well as coming from the classes.
-        """
-        task = Task(fn, *args, **kwargs)
-        try:
-            sniffio.current_async_library()
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        target = fn if executor == "thread" else Unwrapped(fn)
+        # Validates the executor and the callable upfront.
+        enforce_async_callable(target, executor=executor)
+
+        def make_task(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Task:
+            task = Task(target, *args, **kwargs)
+            if executor == "process":
+                task.with_options(executor=executor)
+            if key is not None:
+                task.with_options(key=key, single_flight=single_flight)
+            if rate_limit is not None:
+                task.with_options(rate_limit=rate_limit)
+            task._mark_submitted()
+            return task
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            """
+            The wrapper covers for the decorator as individual as
+            well as coming from the classes.
+            """
+            if not wait:
+                return TaskHandle(get_runner().submit(make_task(args, kwargs)))
+
+            try:
+                sniffio.current_async_library()
+            except sniffio.AsyncLibraryNotFoundError:
+                return get_runner().run(make_task(args, kwargs))
+
+            if (
+                executor == "process"
+                or key is not None
+                or rate_limit is not None
+                or instrumentation.instruments
+            ):
+                # A task applies the options and emits the events of the instruments.
+                task = make_task(args, kwargs)
+                if is_async_callable(fn):
+                    # Like the other coroutine functions, returns an awaitable.
+                    return task()
+                return run_sync(task())
+
             async_callable = AsyncCallable(fn)
             return run_sync(async_callable(*args, **kwargs))  # type: ignore
-        except sniffio.AsyncLibraryNotFoundError:
-            return anyio.run(task)
 
-    return wrapper
+        return wrapper
+
+    if fn is None:
+        return decorator
+    return decorator(fn)
+
+
+background.batched = batched  # type: ignore[attr-defined]
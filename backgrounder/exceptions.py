@@ -0,0 +1,30 @@
+from typing import Hashable, List
+
+
+class BackgrounderException(Exception):
+    """
+    Base exception for all the errors raised by Backgrounder.
+    """
+
+
+class NotPicklableError(BackgrounderException, TypeError):
+    """
+    Raised when a callable or its arguments cannot be sent to a worker process.
+    """
+
+
+class CycleError(BackgrounderException, ValueError):
+    """
+    Raised when the dependencies of a [TaskGraph](./graph.md) form a cycle.
+    """
+
+    def __init__(self, cycle: List[Hashable]) -> None:
+        self.cycle = cycle
+        super().__init__(f"The tasks {' -> '.join(map(repr, cycle))} form a cycle.")
+
+
+class DependencyError(BackgrounderException):
+    """
+    Stored as the exception of the tasks of a [TaskGraph](./graph.md) that did not run
+    because one of their dependencies failed.
+    """
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import copy
+import time
+from typing import Any, Dict, Hashable, Iterable, List, Union
+
+import anyio
+from anyio import CapacityLimiter
+from anyio.abc import TaskGroup
+from typing_extensions import Annotated, Doc
+
+from backgrounder import instrumentation
+from backgrounder.exceptions import CycleError, DependencyError
+from backgrounder.results import GroupResult, TaskResult
+from backgrounder.tasks import ResultStream, Task, Tasks
+
+
+class TaskGraph(Tasks):
+    """
+    Runs tasks following their dependencies, each task starting as soon as all of its
+    dependencies are done instead of waiting for a whole stage to finish.
+
+    By default, the results of the dependencies are appended to the positional arguments
+    of the task, in the order of `depends_on`.
+
+    **Example**
+
+    ```python
+    from backgrounder import Task
+    from backgrounder.graph import TaskGraph
+
+    async def fetch(source: str) -> list: ...
+    async def merge(a: list, b: list) -> list: ...
+    async def store(rows: list) -> None: ...
+    async def notify(rows: list) -> None: ...
+
+    graph = TaskGraph(max_concurrency=4)
+    a = graph.add(Task(fetch, "a"))
+    b = graph.add(Task(fetch, "b"))
+    merged = graph.add(Task(merge), depends_on=[a, b])
+    graph.add(Task(store), depends_on=[merged])
+    graph.add(Task(notify), depends_on=[merged])
+
+    result = await graph()
+    ```
+
+    The returned [GroupResult](./tasks.md#results) has the results in the order the tasks
+    were added.
+    """
+
+    __slots__ = ("_names", "_dependencies", "_pass_results")
+
+    def __init__(
+        self,
+        max_concurrency: Annotated[
+            Union[int, None],
+            Doc(
+                """
+                The maximum number of tasks running at the same time. Defaults to no limit.
+                """
+            ),
+        ] = None,
+        thread_limiter: Annotated[
+            Union[CapacityLimiter, None],
+            Doc(
+                """
+                An `anyio.CapacityLimiter` used to run the blocking callables of the graph
+                instead of the default thread pool.
+                """
+            ),
+        ] = None,
+        return_exceptions: Annotated[
+            bool,
+            Doc(
+                """
+                Boolean flag indicating if the exceptions raised by the tasks should be
+                collected instead of propagated.
+
+                When set to True, the tasks depending on a failed one do not run and get a
+                `DependencyError` as their exception, the other branches of the graph keep
+                running.
+                """
+            ),
+        ] = False,
+    ):
+        super().__init__(
+            as_group=True,
+            max_concurrency=max_concurrency,
+            thread_limiter=thread_limiter,
+            return_exceptions=return_exceptions,
+        )
+        self._names: Dict[Hashable, int] = {}
+        self._dependencies: List[List[Hashable]] = []
+        self._pass_results: List[bool] = []
+
+    def add(
+        self,
+        task: Task,
+        *,
+        name: Union[Hashable, None] = None,
+        depends_on: Iterable[Hashable] = (),
+        pass_results: bool = True,
+    ) -> Hashable:
+        """
+        Adds a task to the graph and returns its name, used in the `depends_on` of the
+        other tasks. The name defaults to the index of the task.
+
+        The dependencies can be added later on, they are checked when the graph runs.
+        With `pass_results` set to False, the results of the dependencies are not given
+        to the task.
+        """
+        if name is None:
+            name = len(self.tasks)
+        if name in self._names:
+            raise ValueError(f"A task named {name!r} is already in the graph.")
+
+        if self.thread_limiter is not None:
+            task._set_thread_limiter(self.thread_limiter)
+        if self._task_rate_limit is not None:
+            task._set_rate_limit(self._task_rate_limit)
+        self._names[name] = len(self.tasks)
+        self.tasks.append(task)
+        self._dependencies.append(list(depends_on))
+        self._pass_results.append(pass_results)
+        return name
+
+    def add_task(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("Use TaskGraph.add() to add a task with its dependencies.")
+
+    def as_completed(self) -> ResultStream:
+        raise TypeError("A TaskGraph runs its tasks following their dependencies, await it.")
+
+    def index(self, name: Hashable) -> int:
+        """
+        The index of the task in the results.
+        """
+        return self._names[name]
+
+    def _edges(self) -> List[List[int]]:
+        """
+        The indexes of the dependencies of every task, raising for the unknown ones.
+        """
+        edges = []
+        for index, dependencies in enumerate(self._dependencies):
+            try:
+                edges.append([self._names[name] for name in dependencies])
+            except KeyError as exc:
+                raise ValueError(f"Unknown dependency {exc.args[0]!r} of task {index}.") from None
+        return edges
+
+    def validate(self) -> None:
+        """
+        Raises a `CycleError` if the dependencies form a cycle and a `ValueError` if a
+        dependency is not in the graph.
+        """
+        edges = self._edges()
+        names = {index: name for name, index in self._names.items()}
+        # 0 is not visited, 1 is being visited, 2 is done.
+        state = [0] * len(edges)
+
+        for root in range(len(edges)):
+            if state[root]:
+                continue
+            stack = [(root, iter(edges[root]))]
+            state[root] = 1
+            while stack:
+                node, dependencies = stack[-1]
+                for dependency in dependencies:
+                    if state[dependency] == 1:
+                        path = [entry for entry, _ in stack]
+                        cycle = path[path.index(dependency) :] + [dependency]
+                        raise CycleError([names[entry] for entry in cycle])
+                    if state[dependency] == 0:
+                        state[dependency] = 1
+                        stack.append((dependency, iter(edges[dependency])))
+                        break
+                else:
+                    state[node] = 2
+                    stack.pop()
+
+    async def run_as_group(self) -> GroupResult:
+        self.validate()
+        edges = self._edges()
+        started = time.monotonic()
+        results: List[TaskResult] = [None] * len(self.tasks)
+
+        waiting = [len(dependencies) for dependencies in edges]
+        dependents: List[List[int]] = [[] for _ in self.tasks]
+        for index, dependencies in enumerate(edges):
+            for dependency in dependencies:
+                dependents[dependency].append(index)
+
+        limiter = None if self.max_concurrency is None else CapacityLimiter(self.max_concurrency)
+        names = {index: name for name, index in self._names.items()}
+
+        def skip(index: int, failed: int) -> None:
+            """
+            Fails the dependents of `failed` and theirs in turn, iteratively since a
+            chain can be deeper than the recursion limit.
+            """
+            stack = [(index, failed)]
+            while stack:
+                index, failed = stack.pop()
+                if results[index] is not None:
+                    continue
+                now = time.monotonic()
+                exc = DependencyError(
+                    f"The dependency {names[failed]!r} of the task {names[index]!r} failed."
+                )
+                results[index] = TaskResult(index, None, exc, now, now)
+                stack.extend((dependent, index) for dependent in dependents[index])
+
+        async def run_node(group: TaskGroup, index: int) -> None:
+            task = self.tasks[index]
+            if self._pass_results[index] and edges[index]:
+                task = copy.copy(task)
+                task.args = task.args + tuple(results[entry].value for entry in edges[index])
+
+            if limiter is None:
+                await self._run_task(index, task, results)
+            else:
+                async with limiter:
+                    await self._run_task(index, task, results)
+
+            if not results[index].ok:
+                for dependent in dependents[index]:
+                    skip(dependent, index)
+                return
+
+            for dependent in dependents[index]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0 and results[dependent] is None:
+                    start(group, dependent)
+
+        def start(group: TaskGroup, index: int) -> None:
+            if instrumentation.instruments:
+                self.tasks[index]._mark_submitted()
+            group.start_soon(run_node, group, index)
+
+        async with anyio.create_task_group() as group:
+            for index, count in enumerate(waiting):
+                if count == 0:
+                    start(group, index)
+        return GroupResult(results, started, time.monotonic())
+
+    async def run(self) -> GroupResult:
+        return await self.run_as_group()
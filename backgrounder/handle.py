@@ -0,0 +1,110 @@
+import asyncio
+from concurrent.futures import Future
+from typing import Any, Callable, Generator, Generic, TypeVar, Union
+
+import anyio
+import sniffio
+
+T = TypeVar("T")
+
+
+class TaskHandle(Generic[T]):
+    """
+    A lightweight handle for work dispatched to the background without waiting
+    for it to finish.
+
+    It can be used from blocking code via `result()` or awaited from async code.
+
+    **Example**
+
+    ```python
+    from backgrounder import background
+
+    @background(wait=False)
+    def send_notification(message: str) -> str:
+        ...
+
+    handle = send_notification("A notification")
+
+    # Blocking code
+    handle.result()
+
+    # Async code
+    await handle
+    ```
+    """
+
+    __slots__ = ("_future",)
+
+    def __init__(self, future: "Future[T]") -> None:
+        self._future = future
+
+    @property
+    def future(self) -> "Future[T]":
+        """
+        The underlying `concurrent.futures.Future`.
+        """
+        return self._future
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def cancelled(self) -> bool:
+        return self._future.cancelled()
+
+    def cancel(self) -> bool:
+        """
+        Cancels the work. Returns False if the work is already done.
+        """
+        return self._future.cancel()
+
+    def result(self, timeout: Union[float, None] = None) -> T:
+        """
+        Blocks until the work is done and returns its result or raises its exception.
+        """
+        return self._future.result(timeout)
+
+    def exception(self, timeout: Union[float, None] = None) -> Union[BaseException, None]:
+        return self._future.exception(timeout)
+
+    def add_done_callback(self, fn: Callable[["Future[T]"], Any]) -> None:
+        self._future.add_done_callback(fn)
+
+    async def wait(self) -> T:
+        """
+        Waits for the result without blocking the running event loop.
+
+        Cancelling the waiter does not cancel the work itself, use `cancel()` for that.
+        """
+        if sniffio.current_async_library() == "asyncio":
+            return await asyncio.shield(asyncio.wrap_future(self._future))
+
+        import trio
+
+        # Woken by the future instead of blocking a worker thread on it, the threads of
+        # the default limiter are shared with the rest of the application.
+        event = anyio.Event()
+        token = trio.lowlevel.current_trio_token()
+
+        def wake(future: "Future[T]") -> None:
+            try:
+                token.run_sync_soon(event.set)
+            except trio.RunFinishedError:
+                # The loop of the waiter is gone.
+                pass
+
+        self._future.add_done_callback(wake)
+        await event.wait()
+        return self._future.result()
+
+    def __await__(self) -> Generator[Any, None, T]:
+        return self.wait().__await__()
+
+    def __repr__(self) -> str:
+        if self._future.cancelled():
+            state = "cancelled"
+        elif self._future.done():
+            state = "finished"
+        else:
+            state = "pending"
+        return f"{self.__class__.__name__}({state})"
@@ -0,0 +1,307 @@
+import bisect
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+logger = logging.getLogger("backgrounder")
+
+
+class Instrument:
+    """
+    Base class of the instrumentation hooks. Subclass it and override the hooks needed.
+
+    Every timestamp comes from `time.monotonic()` and every duration is in seconds.
+    The hooks can be called from any thread, so they must be thread safe and fast.
+
+    **Example**
+
+    ```python
+    from backgrounder.instrumentation import Instrument, add_instrument
+
+    class SlowTasks(Instrument):
+        def on_finish(self, name: str, timestamp: float, duration: float) -> None:
+            if duration > 1:
+                print(f"{name} took {duration:.2f}s")
+
+    add_instrument(SlowTasks())
+    ```
+    """
+
+    def on_submit(self, name: str, timestamp: float) -> None:
+        """
+        A task was handed over to be executed later, by a group, a queue or the decorator.
+        """
+
+    def on_start(self, name: str, timestamp: float, wait: Union[float, None]) -> None:
+        """
+        A task started. `wait` is the time since it was submitted, if it was.
+        """
+
+    def on_thread_start(self, name: str, timestamp: float, wait: float) -> None:
+        """
+        A blocking callable started in the thread pool after waiting `wait` for a thread.
+        """
+
+    def on_finish(self, name: str, timestamp: float, duration: float) -> None:
+        """
+        A task finished successfully.
+        """
+
+    def on_error(
+        self, name: str, timestamp: float, duration: float, exception: BaseException
+    ) -> None:
+        """
+        A task raised an exception.
+        """
+
+
+instruments: List[Instrument] = []
+"""
+The active instruments. When empty, the instrumentation costs a single check per call.
+"""
+
+
+def add_instrument(instrument: Instrument) -> None:
+    """
+    Activates an instrument.
+    """
+    if instrument not in instruments:
+        instruments.append(instrument)
+
+
+def remove_instrument(instrument: Instrument) -> None:
+    """
+    Deactivates an instrument.
+    """
+    if instrument in instruments:
+        instruments.remove(instrument)
+
+
+def callable_name(func: Any) -> str:
+    """
+    The name used to report a callable, unwrapping partials and the internal wrappers.
+    """
+    func = getattr(func, "_callable", func)
+    while isinstance(func, functools.partial):
+        func = func.func
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None)
+    if name is None:
+        return type(func).__qualname__
+    module = getattr(func, "__module__", None)
+    return f"{module}.{name}" if module else name
+
+
+def _emit(hook: str, *args: Any) -> None:
+    for instrument in tuple(instruments):
+        try:
+            getattr(instrument, hook)(*args)
+        except Exception:
+            logger.exception("Error in the %s hook of %r.", hook, instrument)
+
+
+def emit_submit(name: str, timestamp: float) -> None:
+    _emit("on_submit", name, timestamp)
+
+
+def emit_start(name: str, timestamp: float, wait: Union[float, None]) -> None:
+    _emit("on_start", name, timestamp, wait)
+
+
+def emit_thread_start(name: str, timestamp: float, wait: float) -> None:
+    _emit("on_thread_start", name, timestamp, wait)
+
+
+def emit_finish(name: str, timestamp: float, duration: float) -> None:
+    _emit("on_finish", name, timestamp, duration)
+
+
+def emit_error(name: str, timestamp: float, duration: float, exception: BaseException) -> None:
+    _emit("on_error", name, timestamp, duration, exception)
+
+
+def _default_bounds() -> Tuple[float, ...]:
+    # From 10µs to ~5 minutes, doubling each bucket.
+    bounds = []
+    bound = 0.00001
+    while bound < 300:
+        bounds.append(bound)
+        bound *= 2
+    return tuple(bounds)
+
+
+_DEFAULT_BOUNDS = _default_bounds()
+
+
+class Histogram:
+    """
+    A fixed bucket histogram of durations, in seconds.
+
+    Recording a value is a binary search and a counter increment, the percentiles are
+    estimated from the upper bound of the buckets.
+    """
+
+    __slots__ = ("bounds", "buckets", "count", "total", "min", "max")
+
+    def __init__(self, bounds: Union[Tuple[float, ...], None] = None) -> None:
+        self.bounds = bounds or _DEFAULT_BOUNDS
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Estimates the given percentile, between 0 and 100.
+        """
+        if not self.count:
+            return 0.0
+        target = self.count * percentile / 100
+        seen = 0
+        for index, amount in enumerate(self.buckets):
+            seen += amount
+            if seen >= target and amount:
+                bound = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+
+class FunctionMetrics:
+    """
+    The metrics of the tasks of one function.
+    """
+
+    __slots__ = ("submitted", "started", "finished", "failed", "wait", "thread_wait", "duration")
+
+    def __init__(self) -> None:
+        self.submitted = 0
+        self.started = 0
+        self.finished = 0
+        self.failed = 0
+        self.wait = Histogram()
+        self.thread_wait = Histogram()
+        self.duration = Histogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "failed": self.failed,
+            "wait": self.wait.to_dict(),
+            "thread_wait": self.thread_wait.to_dict(),
+            "duration": self.duration.to_dict(),
+        }
+
+
+class MetricsCollector(Instrument):
+    """
+    An in-memory instrument aggregating counters and histograms per function name.
+
+    **Example**
+
+    ```python
+    from backgrounder.instrumentation import MetricsCollector, add_instrument
+
+    metrics = MetricsCollector()
+    add_instrument(metrics)
+
+    ...
+
+    metrics.snapshot()
+    # {"app.send_email": {"submitted": 10, "finished": 9, "failed": 1, "duration": {...}}}
+    ```
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, FunctionMetrics] = {}
+
+    def _get(self, name: str) -> FunctionMetrics:
+        metrics = self._metrics.get(name)
+        if metrics is None:
+            metrics = self._metrics[name] = FunctionMetrics()
+        return metrics
+
+    def on_submit(self, name: str, timestamp: float) -> None:
+        with self._lock:
+            self._get(name).submitted += 1
+
+    def on_start(self, name: str, timestamp: float, wait: Union[float, None]) -> None:
+        with self._lock:
+            metrics = self._get(name)
+            metrics.started += 1
+            if wait is not None:
+                metrics.wait.record(wait)
+
+    def on_thread_start(self, name: str, timestamp: float, wait: float) -> None:
+        with self._lock:
+            self._get(name).thread_wait.record(wait)
+
+    def on_finish(self, name: str, timestamp: float, duration: float) -> None:
+        with self._lock:
+            metrics = self._get(name)
+            metrics.finished += 1
+            metrics.duration.record(duration)
+
+    def on_error(
+        self, name: str, timestamp: float, duration: float, exception: BaseException
+    ) -> None:
+        with self._lock:
+            metrics = self._get(name)
+            metrics.failed += 1
+            metrics.duration.record(duration)
+
+    def get(self, name: str) -> Union[FunctionMetrics, None]:
+        return self._metrics.get(name)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns a copy of the metrics of every function as plain dictionaries.
+        """
+        with self._lock:
+            return {name: metrics.to_dict() for name, metrics in self._metrics.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+
+def timed_in_thread(func: Callable[..., Any], name: str, submitted: float) -> Callable[..., Any]:
+    """
+    Wraps a blocking callable to report how long it waited for a thread.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        now = time.monotonic()
+        emit_thread_start(name, now, now - submitted)
+        return func(*args, **kwargs)
+
+    return wrapper
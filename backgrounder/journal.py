@@ -0,0 +1,221 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Literal, Tuple, Union
+
+from backgrounder._internal._serialization import (
+    Unwrapped,
+    callable_path,
+    dumps,
+    import_callable,
+    loads,
+)
+from backgrounder.concurrency import AsyncCallable, ProcessCallable
+from backgrounder.tasks import Task, Tasks
+
+logger = logging.getLogger("backgrounder")
+
+Synchronous = Literal["OFF", "NORMAL", "FULL"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    priority INTEGER NOT NULL,
+    callable TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tasks_pending ON tasks (id) WHERE done = 0;
+"""
+
+
+def encode(task: Task) -> Tuple[str, bytes]:
+    """
+    Serializes a task as the import path of its callable and a pickled payload with
+    the arguments and the options that can be restored.
+    """
+    if isinstance(task, Tasks):
+        raise TypeError("Only a single Task can be journaled, not a group of Tasks.")
+
+    func: Any = task.func
+    executor = "process" if isinstance(func, ProcessCallable) else "thread"
+    if isinstance(func, AsyncCallable):
+        func = func._callable
+
+    path = callable_path(func)
+    options: Dict[str, Any] = {"executor": executor, "timeout": task.timeout, "retry": task.retry}
+    return path, dumps((task.args, task.kwargs, options), f"The arguments of {path}")
+
+
+def decode(path: str, payload: bytes) -> Task:
+    """
+    Rebuilds a task serialized by `encode()`.
+    """
+    func = import_callable(path)
+    args, kwargs, options = loads(payload)
+
+    if options["executor"] == "process":
+        task = Task(Unwrapped(func), *args, **kwargs).with_options(executor="process")
+    else:
+        task = Task(func, *args, **kwargs)
+    if options["timeout"] is not None:
+        task.with_options(timeout=options["timeout"])
+    task.retry = options["retry"]
+    return task
+
+
+class Journal:
+    """
+    A durable, append-only journal of tasks stored in a local SQLite database in WAL mode.
+
+    Each task is stored as the import path of its callable with its pickled arguments,
+    `timeout` and retry options. Limiters are runtime objects and are not stored.
+    Only module level callables can be journaled.
+
+    The entries are marked as done once executed and removed by `compact()`, which runs
+    automatically every `compact_every` completions. The pending entries are replayed
+    by `pending()`, usually when a [TaskQueue](./queue.md) using the journal starts.
+
+    With `synchronous="NORMAL"` (the default) a commit is never fsynced on its own, the
+    WAL is synced at checkpoints and survives a crash of the process but the last
+    commits can be lost on a power failure. Use `"FULL"` to fsync every commit and
+    `append_many()` to batch many tasks into one commit.
+
+    **Example**
+
+    ```python
+    from backgrounder import Task
+    from backgrounder.journal import Journal
+
+    with Journal("tasks.db") as journal:
+        entry = journal.append(Task(send_email, "user@example.com"))
+        ...
+        journal.complete(entry)
+    ```
+    """
+
+    __slots__ = ("path", "synchronous", "compact_every", "_connection", "_lock", "_completed")
+
+    def __init__(
+        self,
+        path: Union[str, "os.PathLike[str]"],
+        synchronous: Synchronous = "NORMAL",
+        compact_every: int = 1000,
+    ) -> None:
+        if synchronous not in ("OFF", "NORMAL", "FULL"):
+            raise ValueError(f"Unknown synchronous mode {synchronous!r}.")
+
+        self.path = os.fspath(path)
+        self.synchronous = synchronous
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._connection = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(f"PRAGMA synchronous={synchronous}")
+        self._connection.executescript(_SCHEMA)
+
+    def append(self, task: Task, priority: int = 0) -> int:
+        """
+        Stores the task and returns the id of its entry.
+        """
+        return self.append_many([task], priority)[0]
+
+    def append_many(self, tasks: Iterable[Task], priority: int = 0) -> List[int]:
+        """
+        Stores the tasks in a single commit and returns the ids of their entries.
+        """
+        return self._write([(priority, *encode(task)) for task in tasks], [])
+
+    def complete(self, *entries: int) -> None:
+        """
+        Marks the entries as done, they will not be replayed anymore.
+        """
+        self._write([], list(entries))
+
+    def _write(self, rows: List[Tuple[int, str, bytes]], completions: List[int]) -> List[int]:
+        """
+        Inserts the encoded `(priority, callable, payload)` rows and marks the
+        `completions` as done in a single commit, so a single fsync with "FULL".
+        """
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN")
+            try:
+                ids = []
+                for row in rows:
+                    cursor.execute(
+                        "INSERT INTO tasks (priority, callable, payload) VALUES (?, ?, ?)", row
+                    )
+                    ids.append(cursor.lastrowid)
+                if completions:
+                    cursor.executemany(
+                        "UPDATE tasks SET done = 1 WHERE id = ?",
+                        [(entry,) for entry in completions],
+                    )
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+            self._completed += len(completions)
+            if self.compact_every and self._completed >= self.compact_every:
+                self._compact()
+        return ids
+
+    def pending(self) -> List[Tuple[int, int, Task]]:
+        """
+        Returns the `(entry, priority, task)` of every entry not done yet, in the order
+        they were appended.
+
+        The entries that cannot be decoded anymore, for instance because the callable
+        was removed, are logged and skipped.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, priority, callable, payload FROM tasks WHERE done = 0 ORDER BY id"
+            ).fetchall()
+
+        entries = []
+        for entry, priority, path, payload in rows:
+            try:
+                entries.append((entry, priority, decode(path, payload)))
+            except Exception:
+                logger.exception("Cannot replay the journal entry %s of %s.", entry, path)
+        return entries
+
+    def compact(self) -> int:
+        """
+        Removes the done entries and truncates the WAL. Returns the number of removed entries.
+        """
+        with self._lock:
+            return self._compact()
+
+    def _compact(self) -> int:
+        removed = self._connection.execute("DELETE FROM tasks WHERE done = 1").rowcount
+        self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._completed = 0
+        return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM tasks WHERE done = 0"
+            ).fetchone()
+        return int(count)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r}, synchronous={self.synchronous!r})"
@@ -0,0 +1,386 @@
+import heapq
+import itertools
+import logging
+from collections import deque
+from types import TracebackType
+from typing import TYPE_CHECKING, Deque, Dict, Iterator, List, Tuple, Type, Union
+
+import anyio
+from anyio.abc import TaskGroup
+
+from backgrounder.tasks import Task
+
+if TYPE_CHECKING:
+    # sqlite3 is only imported by the queues using a journal.
+    from backgrounder.journal import Journal
+
+logger = logging.getLogger("backgrounder")
+
+
+def _wakeup_next(waiters: Deque[anyio.Event]) -> None:
+    while waiters:
+        event = waiters.popleft()
+        if not event.is_set():
+            event.set()
+            break
+
+
+class TaskQueue:
+    """
+    An in-process priority queue of [tasks](./tasks.md) drained by a pool of async workers.
+
+    Lower `priority` values run first and tasks with the same priority run in the order
+    they were added. Each task is executed via `await task()`, so any `Task` or `Tasks`
+    (including the ones running in a thread or process via `with_options(executor=...)`)
+    can be queued without changes.
+
+    When `maxsize` is greater than zero the queue is bounded and `put()` waits for a free
+    slot, applying backpressure to the producers.
+
+    **Example**
+
+    ```python
+    from backgrounder import Task
+    from backgrounder.queue import TaskQueue
+
+    async def send_email_notification(message: str):
+        ...
+
+    async with TaskQueue(workers=4, maxsize=1000) as queue:
+        await queue.put(Task(send_email_notification, "Account created"))
+        await queue.put(Task(send_email_notification, "Password reset"), priority=-1)
+
+        await queue.join()
+    ```
+
+    Leaving the context closes the queue, waiting for the pending tasks to run.
+
+    With a [journal](./journal.md), every queued task is stored on disk before being
+    queued and marked as done once executed, successfully or not. The entries left
+    pending by a crash, a cancellation or `close(drain=False)` are queued again when
+    the queue starts.
+
+    Once the queue is started, the journal writes are made in a worker thread, the
+    tasks and completions buffered while a write is in flight sharing the next
+    commit. `put()` returns once its task is stored, `put_nowait()` right away.
+    """
+
+    __slots__ = (
+        "workers",
+        "maxsize",
+        "_heap",
+        "_counter",
+        "_getters",
+        "_putters",
+        "_unfinished",
+        "_all_done",
+        "_closed",
+        "_group",
+        "journal",
+        "_entries",
+        "_appends",
+        "_completions",
+        "_dirty",
+        "_written",
+        "_flush_lock",
+    )
+
+    def __init__(
+        self, workers: int = 1, maxsize: int = 0, journal: Union["Journal", None] = None
+    ) -> None:
+        if workers < 1:
+            raise ValueError("The queue needs at least one worker.")
+
+        self.workers = workers
+        self.maxsize = maxsize
+        self._heap: List[Tuple[int, int, Task]] = []
+        self._counter: Iterator[int] = itertools.count()
+        self._getters: Deque[anyio.Event] = deque()
+        self._putters: Deque[anyio.Event] = deque()
+        self._unfinished = 0
+        self._all_done: Union[anyio.Event, None] = None
+        self._closed = False
+        self._group: Union[TaskGroup, None] = None
+        self.journal = journal
+        self._entries: Dict[int, List[int]] = {}
+        # The journal writes waiting for the flusher, once the queue is started.
+        self._appends: List[Tuple[int, str, bytes, Task]] = []
+        self._completions: List[int] = []
+        self._dirty: Union[anyio.Event, None] = None
+        self._written: Union[anyio.Event, None] = None
+        self._flush_lock = anyio.Lock()
+
+    def qsize(self) -> int:
+        return len(self._heap)
+
+    def empty(self) -> bool:
+        return not self._heap
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= len(self._heap) + len(self._appends)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def unfinished(self) -> int:
+        """
+        The number of tasks queued or running.
+        """
+        return self._unfinished
+
+    def put_nowait(self, task: Task, priority: int = 0) -> None:
+        """
+        Adds a task to the queue without waiting.
+
+        Raises `anyio.WouldBlock` if the queue is full and `anyio.ClosedResourceError`
+        if the queue is closed.
+        """
+        if self._closed:
+            raise anyio.ClosedResourceError("The queue is closed.")
+        if self.full():
+            raise anyio.WouldBlock
+
+        if self.journal is None:
+            self._push(task, priority)
+        elif self._dirty is None:
+            # Not started, there is no flusher to hand the write to.
+            self._entries.setdefault(id(task), []).append(self.journal.append(task, priority))
+            self._push(task, priority)
+        else:
+            from backgrounder.journal import encode
+
+            # Encoded here so a task that cannot be journaled raises to the caller.
+            self._appends.append((priority, *encode(task), task))
+            self._reserve()
+            self._dirty.set()
+
+    def _reserve(self) -> None:
+        if self._unfinished == 0:
+            self._all_done = anyio.Event()
+        self._unfinished += 1
+
+    def _enqueue(self, task: Task, priority: int) -> None:
+        task._mark_submitted()
+        heapq.heappush(self._heap, (priority, next(self._counter), task))
+        _wakeup_next(self._getters)
+
+    def _push(self, task: Task, priority: int) -> None:
+        self._reserve()
+        self._enqueue(task, priority)
+
+    async def put(self, task: Task, priority: int = 0) -> None:
+        """
+        Adds a task to the queue, waiting for a free slot if the queue is full.
+        """
+        while self.full() and not self._closed:
+            event = anyio.Event()
+            self._putters.append(event)
+            try:
+                await event.wait()
+            except BaseException:
+                self._discard(self._putters, event)
+                raise
+
+        written = self._written
+        self.put_nowait(task, priority)
+        if written is not None:
+            await written.wait()
+
+    async def get(self) -> Task:
+        """
+        Removes and returns the next task, waiting until one is available.
+
+        Used by the workers. Every task retrieved must be followed by a `task_done()` call.
+        """
+        while not self._heap:
+            event = anyio.Event()
+            self._getters.append(event)
+            try:
+                await event.wait()
+            except BaseException:
+                self._discard(self._getters, event)
+                raise
+
+        _, _, task = heapq.heappop(self._heap)
+        _wakeup_next(self._putters)
+        return task
+
+    def _discard(self, waiters: Deque[anyio.Event], event: anyio.Event) -> None:
+        if event.is_set():
+            # Woken up but cancelled, passes the turn to the next waiter.
+            _wakeup_next(waiters)
+        else:
+            waiters.remove(event)
+
+    def task_done(self) -> None:
+        """
+        Marks a retrieved task as done.
+        """
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times.")
+        self._unfinished -= 1
+        if self._unfinished == 0 and self._all_done is not None:
+            self._all_done.set()
+
+    async def join(self) -> None:
+        """
+        Waits until every queued task has been executed.
+        """
+        if self._unfinished and self._all_done is not None:
+            await self._all_done.wait()
+
+    async def drain(self) -> None:
+        """
+        Alias of `join()`, waits for the queue to be empty and every task to finish.
+        """
+        await self.join()
+
+    async def worker(self) -> None:
+        """
+        Runs the queued tasks forever. The errors raised by the tasks are logged and
+        do not stop the worker.
+        """
+        while True:
+            task = await self.get()
+            try:
+                try:
+                    await task()
+                except Exception:
+                    logger.exception("Error while running the task %r.", task)
+                self._complete(task)
+            finally:
+                self.task_done()
+
+    def _take_entry(self, task: Task) -> Union[int, None]:
+        entries = self._entries.get(id(task))
+        if not entries:
+            return None
+        entry = entries.pop()
+        if not entries:
+            del self._entries[id(task)]
+        return entry
+
+    def _complete(self, task: Task) -> None:
+        entry = self._take_entry(task)
+        if entry is None:
+            return
+        if self._dirty is None:
+            self.journal.complete(entry)
+        else:
+            self._completions.append(entry)
+            self._dirty.set()
+
+    async def _flush(self) -> None:
+        """
+        Writes the buffered tasks and completions in a single commit, in a worker
+        thread, then queues the tasks.
+        """
+        async with self._flush_lock:
+            appends, self._appends = self._appends, []
+            completions, self._completions = self._completions, []
+            written, self._written = self._written, anyio.Event()
+            if not appends and not completions:
+                written.set()
+                return
+
+            rows = [(priority, path, payload) for priority, path, payload, _ in appends]
+            try:
+                entries: List[Union[int, None]] = await anyio.to_thread.run_sync(
+                    self.journal._write, rows, completions
+                )
+            except Exception:
+                logger.exception("Cannot write %s tasks to the journal.", len(appends))
+                # Still run in this process, without being replayed.
+                entries = [None] * len(appends)
+
+            for entry, (priority, _, _, task) in zip(entries, appends):
+                if entry is not None:
+                    self._entries.setdefault(id(task), []).append(entry)
+                self._enqueue(task, priority)
+            written.set()
+
+    async def _flusher(self) -> None:
+        assert self._dirty is not None
+        while True:
+            await self._dirty.wait()
+            self._dirty = anyio.Event()
+            await self._flush()
+
+    async def _replay(self) -> None:
+        assert self.journal is not None
+        for entry, priority, task in await anyio.to_thread.run_sync(self.journal.pending):
+            self._entries.setdefault(id(task), []).append(entry)
+            self._push(task, priority)
+
+    async def start(self, group: TaskGroup) -> None:
+        """
+        Starts the workers in the given task group, after queueing the pending entries
+        of the journal.
+        """
+        if self.journal is not None:
+            await self._replay()
+            self._dirty = anyio.Event()
+            self._written = anyio.Event()
+            group.start_soon(self._flusher)
+        for _ in range(self.workers):
+            group.start_soon(self.worker)
+
+    async def close(self, drain: bool = True) -> None:
+        """
+        Stops accepting new tasks and stops the workers.
+
+        By default it waits for the pending tasks to run. With `drain=False`, the
+        pending tasks are discarded and only the running ones are awaited.
+        """
+        self._closed = True
+        while self._putters:
+            _wakeup_next(self._putters)
+
+        if self._dirty is not None:
+            # Queues the tasks still being written, to be run or left in the journal.
+            await self._flush()
+        if not drain:
+            while self._heap:
+                _, _, task = heapq.heappop(self._heap)
+                # Stays pending in the journal, to be replayed on the next start.
+                self._take_entry(task)
+                self.task_done()
+
+        await self.join()
+        if self._dirty is not None:
+            # The completions of the last tasks.
+            await self._flush()
+        if self._group is not None:
+            self._group.cancel_scope.cancel()
+
+    async def __aenter__(self) -> "TaskQueue":
+        self._group = anyio.create_task_group()
+        await self._group.__aenter__()
+        await self.start(self._group)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Union[Type[BaseException], None],
+        exc_value: Union[BaseException, None],
+        traceback: Union[TracebackType, None],
+    ) -> Union[bool, None]:
+        assert self._group is not None
+        if exc_type is None:
+            await self.close()
+        else:
+            self._closed = True
+            self._group.cancel_scope.cancel()
+        try:
+            return await self._group.__aexit__(exc_type, exc_value, traceback)
+        finally:
+            self._group = None
+            self._dirty = self._written = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(workers={self.workers}, maxsize={self.maxsize}, "
+            f"qsize={self.qsize()}, unfinished={self._unfinished})"
+        )
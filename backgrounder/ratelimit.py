@@ -0,0 +1,211 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Union
+
+import anyio
+
+
+class RateLimiter(ABC):
+    """
+    Base class of the rate limiters attached to tasks via `with_options(rate_limit=...)`.
+
+    The limiters are reservation based. Each call computes how long it has to wait
+    for its turn and sleeps exactly that long, no coroutine polls for a free slot.
+    They are thread safe, the same limiter can be shared by tasks running in different
+    event loops.
+    """
+
+    __slots__ = ("_lock",)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def reserve(self, now: Union[float, None] = None) -> float:
+        """
+        Reserves a call and returns the seconds to wait before making it. `now` is the
+        moment of the reservation on the `time.monotonic()` clock, the current one by
+        default.
+        """
+
+    def release(self, slot: float) -> None:
+        """
+        Gives back a reservation that was not used, `slot` being the moment it was
+        reserved for, `now` plus the delay returned by `reserve()`. The reservations are
+        kept by default.
+        """
+        return None
+
+    async def acquire(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Waits for the turn of a call. The arguments are the ones of the task, used by the
+        keyed limiters.
+        """
+        now = time.monotonic()
+        delay = self.reserve(now)
+        if delay <= 0:
+            return
+        try:
+            await anyio.sleep(delay)
+        except BaseException:
+            self.release(now + delay)
+            raise
+
+
+class TokenBucket(RateLimiter):
+    """
+    Allows `rate` calls every `per` seconds on average, with bursts of up to `burst`
+    calls (by default `rate`) after a quiet period.
+
+    **Example**
+
+    ```python
+    from backgrounder import Task
+    from backgrounder.ratelimit import TokenBucket
+
+    # 10 calls per second with bursts of 20.
+    limiter = TokenBucket(10, burst=20)
+
+    task = Task(call_api, payload).with_options(rate_limit=limiter)
+    ```
+    """
+
+    __slots__ = ("rate", "per", "burst", "_tokens", "_updated")
+
+    def __init__(self, rate: float, per: float = 1.0, burst: Union[int, None] = None) -> None:
+        if rate <= 0 or per <= 0:
+            raise ValueError("The rate and the period must be positive.")
+        if burst is not None and burst < 1:
+            raise ValueError("The burst must be at least 1.")
+
+        super().__init__()
+        self.rate = rate
+        self.per = per
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def reserve(self, now: Union[float, None] = None) -> float:
+        with self._lock:
+            if now is None:
+                now = time.monotonic()
+            refill = (now - self._updated) * self.rate / self.per
+            self._tokens = min(self.burst, self._tokens + refill) - 1
+            self._updated = now
+            if self._tokens >= 0:
+                return 0.0
+            # The missing tokens are a debt paid by the following calls.
+            return -self._tokens * self.per / self.rate
+
+    def release(self, slot: float) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(rate={self.rate}, per={self.per}, burst={self.burst})"
+
+
+class LeakyBucket(RateLimiter):
+    """
+    Spaces the calls evenly, one every `per / rate` seconds, without bursts.
+
+    **Example**
+
+    ```python
+    from backgrounder.ratelimit import LeakyBucket
+
+    # One call every 200ms.
+    limiter = LeakyBucket(5)
+    ```
+    """
+
+    __slots__ = ("rate", "per", "_interval", "_next")
+
+    def __init__(self, rate: float, per: float = 1.0) -> None:
+        if rate <= 0 or per <= 0:
+            raise ValueError("The rate and the period must be positive.")
+
+        super().__init__()
+        self.rate = rate
+        self.per = per
+        self._interval = per / rate
+        self._next = 0.0
+
+    def reserve(self, now: Union[float, None] = None) -> float:
+        with self._lock:
+            if now is None:
+                now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self._interval
+            return slot - now
+
+    def release(self, slot: float) -> None:
+        with self._lock:
+            last = self._next - self._interval
+            # Only the last reservation can be given back without handing the slot of
+            # another waiter to a new call. The slots are an interval apart, the margin
+            # absorbs the rounding of `now + delay`.
+            if abs(slot - last) < self._interval / 2:
+                self._next = last
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(rate={self.rate}, per={self.per})"
+
+
+class KeyedRateLimiter(RateLimiter):
+    """
+    One rate limiter per key, the key being extracted from the arguments of the task.
+
+    The `maxsize` most recently used keys are kept, the others are dropped and start
+    from a fresh limiter when they come back.
+
+    **Example**
+
+    ```python
+    from backgrounder import background
+    from backgrounder.ratelimit import KeyedRateLimiter, TokenBucket
+
+    # 5 calls per second per tenant.
+    limiter = KeyedRateLimiter(lambda: TokenBucket(5), key=lambda tenant_id, **kwargs: tenant_id)
+
+    @background(rate_limit=limiter)
+    def sync_tenant(tenant_id: int, full: bool = False) -> None:
+        ...
+    ```
+    """
+
+    __slots__ = ("factory", "key", "maxsize", "_limiters")
+
+    def __init__(
+        self,
+        factory: Callable[[], RateLimiter],
+        key: Callable[..., Hashable],
+        maxsize: int = 10_000,
+    ) -> None:
+        super().__init__()
+        self.factory = factory
+        self.key = key
+        self.maxsize = maxsize
+        self._limiters: "OrderedDict[Hashable, RateLimiter]" = OrderedDict()
+
+    def get(self, key: Hashable) -> RateLimiter:
+        """
+        The limiter of the given key.
+        """
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = self._limiters[key] = self.factory()
+                while len(self._limiters) > self.maxsize:
+                    self._limiters.popitem(last=False)
+            else:
+                self._limiters.move_to_end(key)
+            return limiter
+
+    def reserve(self, now: Union[float, None] = None) -> float:
+        raise TypeError("A keyed rate limiter needs the arguments of the call, use acquire().")
+
+    async def acquire(self, *args: Any, **kwargs: Any) -> None:
+        await self.get(self.key(*args, **kwargs)).acquire()
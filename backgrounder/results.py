@@ -0,0 +1,112 @@
+from typing import Any, List, Union
+
+from backgrounder._internal import Repr
+
+
+class TaskResult(Repr):
+    """
+    The outcome of one task of a [Tasks](./tasks.md#tasks) group.
+
+    The `started` and `finished` attributes are `time.monotonic()` timestamps.
+    """
+
+    __slots__ = ("index", "value", "exception", "started", "finished")
+
+    def __init__(
+        self,
+        index: int,
+        value: Any = None,
+        exception: Union[BaseException, None] = None,
+        started: float = 0.0,
+        finished: float = 0.0,
+    ) -> None:
+        self.index = index
+        self.value = value
+        self.exception = exception
+        self.started = started
+        self.finished = finished
+
+    @property
+    def ok(self) -> bool:
+        return self.exception is None
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+    def unwrap(self) -> Any:
+        """
+        Returns the value or raises the exception of the task.
+        """
+        if self.exception is not None:
+            raise self.exception
+        return self.value
+
+
+class GroupResult(Repr):
+    """
+    The outcome of a [Tasks](./tasks.md#tasks) group, with one `TaskResult` per task in
+    the same order as the tasks.
+
+    **Example**
+
+    ```python
+    from backgrounder import Task, Tasks
+
+    tasks = Tasks([Task(fetch, url) for url in urls], as_group=True, return_exceptions=True)
+    result = await tasks()
+
+    for task_result in result.failed:
+        print(task_result.index, task_result.exception)
+
+    print(result.values, result.duration)
+    ```
+    """
+
+    __slots__ = ("results", "started", "finished")
+
+    def __init__(self, results: List[TaskResult], started: float, finished: float) -> None:
+        self.results = results
+        self.started = started
+        self.finished = finished
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+    @property
+    def values(self) -> List[Any]:
+        """
+        The values of the tasks in order, None for the failed ones.
+        """
+        return [result.value for result in self.results]
+
+    @property
+    def exceptions(self) -> List[BaseException]:
+        return [result.exception for result in self.results if result.exception is not None]
+
+    @property
+    def succeeded(self) -> List[TaskResult]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[TaskResult]:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    def raise_for_exceptions(self) -> None:
+        """
+        Raises the first exception of the group, if any.
+        """
+        for result in self.results:
+            if result.exception is not None:
+                raise result.exception
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __getitem__(self, index: int) -> TaskResult:
+        return self.results[index]
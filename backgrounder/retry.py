@@ -0,0 +1,51 @@
+import random
+from typing import Tuple, Type
+
+from backgrounder._internal import Repr
+
+
+class Retry(Repr):
+    """
+    The retry policy of a [Task](./tasks.md#task), configured via `Task.with_options()`.
+
+    After a failure matching `retry_on`, the task waits an exponential backoff,
+    `backoff * 2 ** attempt` capped at `max_backoff`, before running again.
+
+    With `jitter`, the wait is a random value between zero and the backoff, spreading
+    the retries of tasks that failed at the same time.
+    """
+
+    __slots__ = ("retries", "backoff", "max_backoff", "jitter", "retry_on")
+
+    def __init__(
+        self,
+        retries: int = 0,
+        backoff: float = 0.0,
+        max_backoff: float = 60.0,
+        jitter: bool = True,
+        retry_on: Tuple[Type[Exception], ...] = (Exception,),
+    ) -> None:
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_on = retry_on
+        self.validate()
+
+    def validate(self) -> None:
+        if self.retries < 0:
+            raise ValueError("retries cannot be negative.")
+        if self.backoff < 0 or self.max_backoff < 0:
+            raise ValueError("The backoff cannot be negative.")
+        for exception in self.retry_on:
+            if not issubclass(exception, Exception):
+                raise ValueError(f"{exception!r} cannot be retried, only Exception subclasses.")
+
+    def delay(self, attempt: int) -> float:
+        """
+        The seconds to wait before the retry following the given attempt, starting at zero.
+        """
+        delay: float = min(self.max_backoff, self.backoff * 2 ** min(attempt, 64))
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
@@ -0,0 +1,286 @@
+import atexit
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Literal, Set, TypeVar, Union
+
+from anyio.from_thread import BlockingPortal, start_blocking_portal
+
+T = TypeVar("T")
+
+Backend = Literal["asyncio", "trio"]
+
+
+class Runner:
+    """
+    A long lived pool of event loops, each one running in its own dedicated thread.
+
+    Instead of creating a brand new event loop (and sometimes a brand new thread) per call,
+    the work is handed over to one of the loops of the runner, making the per call overhead
+    a simple queue handoff.
+
+    The loops are lazily started on the first submission and stopped via `shutdown()`.
+
+    The `backend` and the `backend_options` are given to AnyIO for every loop the runner
+    creates, for instance `backend_options={"use_uvloop": True}` to run asyncio on uvloop.
+
+    **Example**
+
+    ```python
+    from backgrounder.runner import Runner
+
+    async def send_notification(message: str) -> str:
+        ...
+
+    runner = Runner(workers=2)
+    future = runner.submit(send_notification, "A notification")
+    future.result()
+
+    runner.shutdown()
+    ```
+    """
+
+    __slots__ = (
+        "workers",
+        "backend",
+        "backend_options",
+        "_lock",
+        "_stack",
+        "_portals",
+        "_thread_ids",
+        "_cycle",
+        "_handoff",
+    )
+
+    def __init__(
+        self,
+        workers: int = 1,
+        backend: Backend = "asyncio",
+        backend_options: Union[Dict[str, Any], None] = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("The runner needs at least one worker.")
+        if backend not in ("asyncio", "trio"):
+            raise ValueError(f"Unknown backend {backend!r}, use 'asyncio' or 'trio'.")
+        self.workers = workers
+        self.backend = backend
+        self.backend_options = backend_options
+        self._lock = threading.Lock()
+        self._stack: Union[ExitStack, None] = None
+        self._portals: List[BlockingPortal] = []
+        self._thread_ids: Set[int] = set()
+        self._cycle: Union[Iterator[BlockingPortal], None] = None
+        self._handoff: Union[ThreadPoolExecutor, None] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._stack is not None
+
+    def start(self) -> None:
+        """
+        Starts the event loop threads if they are not running yet.
+        """
+        if not self.is_running:
+            self._start()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self.is_running:
+                return
+
+            stack = ExitStack()
+            try:
+                for _ in range(self.workers):
+                    portal = stack.enter_context(
+                        start_blocking_portal(self.backend, self.backend_options)
+                    )
+                    self._thread_ids.add(portal.call(threading.get_ident))
+                    self._portals.append(portal)
+            except BaseException:
+                stack.close()
+                self._portals.clear()
+                self._thread_ids.clear()
+                raise
+
+            self._cycle = itertools.cycle(self._portals)
+            self._stack = stack
+
+    def get_portal(self) -> BlockingPortal:
+        """
+        Returns the next portal of the pool, starting the runner if needed.
+        """
+        self.start()
+        return next(self._cycle)
+
+    def in_runner_thread(self) -> bool:
+        """
+        Checks if the current thread is one of the event loop threads of the runner.
+        """
+        return threading.get_ident() in self._thread_ids
+
+    def submit(self, func: Callable[..., Awaitable[T]], *args: Any) -> "Future[T]":
+        """
+        Schedules the async callable in one of the loops and returns a
+        `concurrent.futures.Future` for its result.
+        """
+        if self.in_runner_thread():
+            return self._submit_from_runner_thread(func, *args)
+        return self.get_portal().start_task_soon(func, *args)
+
+    def _submit_from_runner_thread(
+        self, func: Callable[..., Awaitable[T]], *args: Any
+    ) -> "Future[T]":
+        """
+        A portal cannot schedule work from its own loop thread without blocking it,
+        so the scheduling is handed to a helper thread and the futures are chained.
+        """
+        if self._handoff is None:
+            with self._lock:
+                if self._handoff is None:
+                    self._handoff = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="backgrounder-handoff"
+                    )
+
+        future: "Future[T]" = Future()
+
+        def copy_outcome(inner: "Future[T]") -> None:
+            if future.done():
+                return
+            if inner.cancelled():
+                future.cancel()
+            elif inner.exception() is not None:
+                future.set_exception(inner.exception())
+            else:
+                future.set_result(inner.result())
+
+        def schedule() -> None:
+            if future.done():
+                return
+            try:
+                inner = self.get_portal().start_task_soon(func, *args)
+            except BaseException as exc:
+                future.set_exception(exc)
+                return
+            future.add_done_callback(lambda f: f.cancelled() and inner.cancel())
+            inner.add_done_callback(copy_outcome)
+
+        self._handoff.submit(schedule)
+        return future
+
+    def run(self, func: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """
+        Runs the async callable in one of the loops and blocks until the result
+        is available.
+        """
+        if self.in_runner_thread():
+            raise RuntimeError(
+                "Cannot block on the runner from inside one of its own event loop threads."
+            )
+        return self.submit(func, *args).result()
+
+    def shutdown(self, cancel_pending: bool = False) -> None:
+        """
+        Stops the event loops. By default it waits for the pending work to finish,
+        unless `cancel_pending` is set to True.
+
+        The runner can be started again afterwards.
+        """
+        with self._lock:
+            handoff, self._handoff = self._handoff, None
+
+        if handoff is not None:
+            handoff.shutdown(wait=True)
+
+        with self._lock:
+            if self._stack is None:
+                return
+
+            stack, portals = self._stack, self._portals
+            self._stack = None
+            self._portals = []
+            self._thread_ids = set()
+            self._cycle = None
+
+        if cancel_pending:
+            for portal in portals:
+                try:
+                    portal.call(portal.stop, True)
+                except RuntimeError:  # pragma: no cover
+                    pass
+        stack.close()
+
+
+_runner = Runner()
+
+
+def get_runner() -> Runner:
+    """
+    Returns the runner shared by the `background` decorator and `run_sync`.
+    """
+    return _runner
+
+
+def set_runner(runner: Runner) -> None:
+    """
+    Replaces the shared runner, for instance with a pool of more workers.
+
+    **Example**
+
+    ```python
+    from backgrounder.runner import Runner, set_runner
+
+    set_runner(Runner(workers=4))
+    set_runner(Runner(backend="asyncio", backend_options={"use_uvloop": True}))
+    ```
+    """
+    global _runner
+
+    previous, _runner = _runner, runner
+    if previous is not runner:
+        previous.shutdown()
+
+
+@contextmanager
+def portal(
+    workers: int = 1,
+    backend: Backend = "asyncio",
+    backend_options: Union[Dict[str, Any], None] = None,
+) -> Iterator[Runner]:
+    """
+    Keeps a dedicated runner alive for the duration of the block, for blocking code
+    submitting many tasks at once.
+
+    Each `submit()` returns a `concurrent.futures.Future`. Leaving the block waits for
+    the pending work, unless it is left with an exception, cancelling it instead.
+
+    **Example**
+
+    ```python
+    import backgrounder
+    from backgrounder import Task
+
+    with backgrounder.portal() as portal:
+        futures = [portal.submit(Task(send_email, user)) for user in users]
+
+    results = [future.result() for future in futures]
+    ```
+    """
+    runner = Runner(workers=workers, backend=backend, backend_options=backend_options)
+    runner.start()
+    try:
+        yield runner
+    except BaseException:
+        runner.shutdown(cancel_pending=True)
+        raise
+    runner.shutdown()
+
+
+def shutdown(cancel_pending: bool = False) -> None:
+    """
+    Stops the shared runner. This is automatically called when the interpreter exits.
+    """
+    _runner.shutdown(cancel_pending=cancel_pending)
+
+
+atexit.register(shutdown)
@@ -0,0 +1,377 @@
+import heapq
+import itertools
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from types import TracebackType
+from typing import FrozenSet, Iterator, List, Literal, Set, Tuple, Type, Union
+
+import anyio
+from anyio import CapacityLimiter
+from anyio.abc import TaskGroup
+
+from backgrounder._internal import Repr
+from backgrounder.tasks import Task
+
+logger = logging.getLogger("backgrounder")
+
+Misfire = Literal["run_once", "run_all", "skip"]
+
+_CRON_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+)
+
+
+def _parse_field(value: str, name: str, low: int, high: int) -> FrozenSet[int]:
+    result: Set[int] = set()
+    for part in value.split(","):
+        expression, _, step_value = part.partition("/")
+        step = int(step_value) if step_value else 1
+        if expression == "*":
+            start, end = low, high
+        elif "-" in expression:
+            start_value, _, end_value = expression.partition("-")
+            start, end = int(start_value), int(end_value)
+        else:
+            start = int(expression)
+            end = high if step_value else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Invalid cron {name} field {value!r}.")
+        result.update(range(start, end + 1, step))
+    return frozenset(result)
+
+
+class Cron(Repr):
+    """
+    A cron expression with the five classic fields, `minute hour day month weekday`.
+
+    Each field accepts `*`, single values, ranges `a-b`, steps `*/n` or `a-b/n` and lists
+    separated by commas. Sunday is `0` or `7`. As in cron, when both the day of the
+    month and the day of the week are restricted, a date matching either one matches.
+
+    **Example**
+
+    ```python
+    Cron("*/5 * * * *")  # every 5 minutes
+    Cron("30 2 * * 1-5")  # at 02:30 from Monday to Friday
+    ```
+    """
+
+    __slots__ = ("expression", "_minutes", "_hours", "_days", "_months", "_weekdays", "_any_day")
+
+    def __init__(self, expression: str) -> None:
+        values = expression.split()
+        if len(values) != len(_CRON_FIELDS):
+            raise ValueError(f"A cron expression needs 5 fields, got {expression!r}.")
+
+        self.expression = expression
+        self._minutes, self._hours, self._days, self._months, weekdays = (
+            _parse_field(value, name, low, high)
+            for value, (name, low, high) in zip(values, _CRON_FIELDS)
+        )
+        self._weekdays = frozenset(day % 7 for day in weekdays)
+        self._any_day = (values[2] == "*", values[4] == "*")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        any_day, any_weekday = self._any_day
+        day = moment.day in self._days
+        # Python counts the weekdays from Monday, cron from Sunday.
+        weekday = (moment.weekday() + 1) % 7 in self._weekdays
+        if any_day or any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next(self, after: datetime) -> datetime:
+        """
+        The first moment matching the expression strictly after the given one.
+        """
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self._months:
+                year, month = divmod(moment.month, 12)
+                moment = moment.replace(year=moment.year + year, month=month + 1, day=1)
+                moment = moment.replace(hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self._hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self._minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"The cron expression {self.expression!r} never matches.")
+
+
+class ScheduledTask(Repr):
+    """
+    A task registered in a [Scheduler](./scheduler.md), returned by `schedule_at()`,
+    `schedule_in()` and `every()`.
+    """
+
+    __slots__ = (
+        "task",
+        "interval",
+        "cron",
+        "misfire",
+        "grace",
+        "runs",
+        "cancelled",
+        "_scheduler",
+        "_queued",
+    )
+
+    def __init__(
+        self,
+        scheduler: "Scheduler",
+        task: Task,
+        interval: Union[float, None] = None,
+        cron: Union[Cron, None] = None,
+        misfire: Misfire = "run_once",
+        grace: float = 1.0,
+    ) -> None:
+        if misfire not in ("run_once", "run_all", "skip"):
+            raise ValueError(f"Unknown misfire policy {misfire!r}.")
+        if interval is not None and interval <= 0:
+            raise ValueError("The interval must be positive.")
+
+        self.task = task
+        self.interval = interval
+        self.cron = cron
+        self.misfire = misfire
+        self.grace = grace
+        self.runs = 0
+        self.cancelled = False
+        self._scheduler = scheduler
+        self._queued = False
+
+    @property
+    def periodic(self) -> bool:
+        return self.interval is not None or self.cron is not None
+
+    def cancel(self) -> None:
+        """
+        Removes the task from the scheduler. A run already started is not interrupted.
+        """
+        if not self.cancelled:
+            self.cancelled = True
+            if self._queued:
+                self._scheduler._discard()
+
+    def _next_deadline(self, deadline: float, now: float) -> Union[float, None]:
+        """
+        The deadline of the run following the one due at `deadline`, given the current
+        `now`. Both are `time.monotonic()` values.
+        """
+        if self.interval is not None:
+            if self.misfire == "run_all":
+                return deadline + self.interval
+            return deadline + self.interval * (math.floor((now - deadline) / self.interval) + 1)
+
+        if self.cron is not None:
+            offset = time.time() - time.monotonic()
+            after = deadline if self.misfire == "run_all" else now
+            moment = self.cron.next(datetime.fromtimestamp(after + offset))
+            return moment.timestamp() - offset
+        return None
+
+
+class Scheduler:
+    """
+    Runs tasks at a given moment, after a delay or periodically.
+
+    Every pending run is an entry of a min-heap ordered by deadline and a single timer
+    coroutine sleeps until the earliest one, so thousands of timers cost one sleeping
+    coroutine. The due tasks run concurrently, with at most `max_concurrency` at once
+    when given, and their errors are logged in the `backgrounder` logger.
+
+    A run is late when the scheduler could not start it on time, for instance because
+    the loop was blocked or the scheduler was not running yet. The `misfire` policy
+    decides what happens to the runs late by more than `grace` seconds:
+
+    * `"run_once"` runs the task once and skips the other missed runs of a periodic task.
+    * `"run_all"` runs the task once per missed run.
+    * `"skip"` does not run the late run, a periodic task waits for the next one.
+
+    **Example**
+
+    ```python
+    from backgrounder import Task
+    from backgrounder.scheduler import Scheduler
+
+    async with Scheduler() as scheduler:
+        scheduler.schedule_in(Task(send_reminder, user), 30)
+        scheduler.every(Task(refresh_cache), 300)
+        scheduler.every(Task(send_report), "0 8 * * 1-5")
+        ...
+    ```
+
+    The scheduler is not thread safe, the tasks must be scheduled from its event loop.
+    """
+
+    __slots__ = ("max_concurrency", "_heap", "_counter", "_cancelled", "_wakeup", "_group")
+
+    def __init__(self, max_concurrency: Union[int, None] = None) -> None:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        self.max_concurrency = max_concurrency
+        self._heap: List[Tuple[float, int, ScheduledTask]] = []
+        self._counter: Iterator[int] = itertools.count()
+        self._cancelled = 0
+        self._wakeup: Union[anyio.Event, None] = None
+        self._group: Union[TaskGroup, None] = None
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    def schedule_at(
+        self,
+        task: Task,
+        when: Union[datetime, float],
+        *,
+        misfire: Misfire = "run_once",
+        grace: float = 1.0,
+    ) -> ScheduledTask:
+        """
+        Runs the task once at the given datetime or `time.time()` timestamp.
+        """
+        timestamp = when.timestamp() if isinstance(when, datetime) else when
+        deadline = time.monotonic() + timestamp - time.time()
+        return self._schedule(ScheduledTask(self, task, misfire=misfire, grace=grace), deadline)
+
+    def schedule_in(
+        self,
+        task: Task,
+        delay: Union[timedelta, float],
+        *,
+        misfire: Misfire = "run_once",
+        grace: float = 1.0,
+    ) -> ScheduledTask:
+        """
+        Runs the task once after the given delay, in seconds.
+        """
+        if isinstance(delay, timedelta):
+            delay = delay.total_seconds()
+        scheduled = ScheduledTask(self, task, misfire=misfire, grace=grace)
+        return self._schedule(scheduled, time.monotonic() + delay)
+
+    def every(
+        self,
+        task: Task,
+        interval: Union[timedelta, float, str],
+        *,
+        first_in: Union[timedelta, float, None] = None,
+        misfire: Misfire = "run_once",
+        grace: float = 1.0,
+    ) -> ScheduledTask:
+        """
+        Runs the task periodically, every `interval` seconds or following a cron
+        expression given as a string.
+
+        The first run of an interval happens after `first_in` seconds, one interval by
+        default. The first run of a cron expression is its next match.
+        """
+        if isinstance(interval, str):
+            scheduled = ScheduledTask(
+                self, task, cron=Cron(interval), misfire=misfire, grace=grace
+            )
+            now = time.monotonic()
+            deadline = scheduled._next_deadline(now, now)
+            return self._schedule(scheduled, deadline)
+
+        if isinstance(interval, timedelta):
+            interval = interval.total_seconds()
+        if isinstance(first_in, timedelta):
+            first_in = first_in.total_seconds()
+
+        scheduled = ScheduledTask(self, task, interval=interval, misfire=misfire, grace=grace)
+        delay = interval if first_in is None else first_in
+        return self._schedule(scheduled, time.monotonic() + delay)
+
+    def _push(self, scheduled: ScheduledTask, deadline: float) -> None:
+        scheduled._queued = True
+        heapq.heappush(self._heap, (deadline, next(self._counter), scheduled))
+
+    def _schedule(self, scheduled: ScheduledTask, deadline: float) -> ScheduledTask:
+        self._push(scheduled, deadline)
+        if self._heap[0][2] is scheduled and self._wakeup is not None:
+            # The timer sleeps until a later deadline.
+            self._wakeup.set()
+        return scheduled
+
+    def _discard(self) -> None:
+        self._cancelled += 1
+        if self._cancelled > 64 and self._cancelled > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    async def _execute(
+        self, scheduled: ScheduledTask, limiter: Union[CapacityLimiter, None]
+    ) -> None:
+        try:
+            if limiter is None:
+                await scheduled.task()
+            else:
+                async with limiter:
+                    await scheduled.task()
+        except Exception:
+            logger.exception("Error while running the scheduled task %r.", scheduled.task)
+
+    async def run(self) -> None:
+        """
+        Runs the timer forever, until cancelled.
+        """
+        limiter = None if self.max_concurrency is None else CapacityLimiter(self.max_concurrency)
+
+        async with anyio.create_task_group() as group:
+            while True:
+                self._wakeup = anyio.Event()
+                now = time.monotonic()
+                while self._heap and (self._heap[0][2].cancelled or self._heap[0][0] <= now):
+                    deadline, _, scheduled = heapq.heappop(self._heap)
+                    scheduled._queued = False
+                    if scheduled.cancelled:
+                        self._cancelled -= 1
+                        continue
+
+                    if scheduled.misfire != "skip" or now - deadline <= scheduled.grace:
+                        scheduled.runs += 1
+                        group.start_soon(self._execute, scheduled, limiter)
+
+                    next_deadline = scheduled._next_deadline(deadline, now)
+                    if next_deadline is not None:
+                        self._push(scheduled, next_deadline)
+
+                delay = self._heap[0][0] - now if self._heap else math.inf
+                with anyio.move_on_after(delay):
+                    await self._wakeup.wait()
+
+    async def __aenter__(self) -> "Scheduler":
+        self._group = anyio.create_task_group()
+        await self._group.__aenter__()
+        self._group.start_soon(self.run)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Union[Type[BaseException], None],
+        exc_value: Union[BaseException, None],
+        traceback: Union[TracebackType, None],
+    ) -> Union[bool, None]:
+        assert self._group is not None
+        self._group.cancel_scope.cancel()
+        try:
+            return await self._group.__aexit__(exc_type, exc_value, traceback)
+        finally:
+            self._group = None
+            self._wakeup = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(pending={len(self)})"
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from backgrounder.handle import TaskHandle
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent executions sharing the same key.
+
+    The first caller of a key runs the work, the callers arriving while it is in flight
+    wait for it and receive the same result or exception. It works across event loops
+    and threads, so the runner, the decorator and the application loop share the same
+    flights.
+
+    With a `ttl`, the results are also cached for that many seconds, keeping the
+    `maxsize` most recently used keys. Exceptions are never cached.
+
+    **Example**
+
+    ```python
+    from backgrounder import Task
+    from backgrounder.singleflight import SingleFlight
+
+    cache = SingleFlight(ttl=60, maxsize=1000)
+
+    task = Task(rebuild_cache, tenant_id=42).with_options(key="tenant-42", single_flight=cache)
+    ```
+    """
+
+    __slots__ = ("ttl", "maxsize", "_lock", "_flights", "_cache")
+
+    def __init__(self, ttl: float = 0, maxsize: int = 1024) -> None:
+        if ttl < 0:
+            raise ValueError("The ttl cannot be negative.")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, "Future[Any]"] = {}
+        self._cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """
+        The number of executions in flight.
+        """
+        return len(self._flights)
+
+    def _cached(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._cache[key]
+            return False, None
+        self._cache.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._cache[key] = (time.monotonic() + self.ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `func` unless an execution with the same key is in flight or cached.
+        """
+        while True:
+            with self._lock:
+                if self.ttl:
+                    hit, value = self._cached(key)
+                    if hit:
+                        return value  # type: ignore[no-any-return]
+
+                future = self._flights.get(key)
+                if future is None:
+                    future = self._flights[key] = Future()
+                    break
+
+            try:
+                result: T = await TaskHandle(future).wait()
+                return result
+            except BaseException:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled, one of the waiters takes over.
+
+        try:
+            value = await func()
+        except BaseException as exc:
+            with self._lock:
+                del self._flights[key]
+            if isinstance(exc, Exception):
+                future.set_exception(exc)
+            else:
+                future.cancel()
+            raise
+
+        with self._lock:
+            del self._flights[key]
+            if self.ttl:
+                self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Empties the cache of results. The executions in flight are not affected.
+        """
+        with self._lock:
+            self._cache.clear()
+
+
+default_single_flight = SingleFlight()
+"""
+The group used by the tasks with a `key` and no `single_flight` of their own.
+"""
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import threading
+from array import array
+from typing import Any, Callable, Iterable, List, Sequence, Union
+
+import anyio
+from anyio import CapacityLimiter
+from typing_extensions import Annotated, Doc
+
+from backgrounder.concurrency import AsyncCallable, BlockingCall, run_chunk
+from backgrounder.ratelimit import RateLimiter
+from backgrounder.retry import Retry
+from backgrounder.tasks import Task
+
+Column = Union["array[Any]", List[Any]]
+
+_TYPES = {"q": int, "d": float}
+_TYPECODES = {int: "q", float: "d"}
+
+# Below this, compacting the columns is not worth the copy.
+_COMPACT_THRESHOLD = 4096
+
+
+def _new_column(value: Any) -> Column:
+    typecode = _TYPECODES.get(type(value))
+    if typecode is not None:
+        try:
+            return array(typecode, [value])
+        except OverflowError:
+            pass
+    return [value]
+
+
+def _append(column: Column, value: Any) -> Column:
+    """
+    Appends a value to a column, turning an array into a list for the values it cannot
+    hold.
+    """
+    if isinstance(column, array):
+        # An array converts the values silently, True would come back as 1.
+        if type(value) is _TYPES[column.typecode]:
+            try:
+                column.append(value)
+                return column
+            except OverflowError:
+                pass
+        column = list(column)
+    column.append(value)
+    return column
+
+
+class TaskBatch(Task):
+    """
+    Runs the same callable with many sets of positional arguments, for the "one call per
+    row" work where a `Tasks` of millions of `Task` objects would not fit in memory.
+
+    The callable is stored once and the arguments column by column, the columns of
+    `int` and `float` values in arrays of machine values and the others in lists. No
+    task is built, each call is made from its row when a worker takes it and the row
+    is released as soon as it is taken.
+
+    **Example**
+
+    ```python
+    from backgrounder.taskbatch import TaskBatch
+
+    async def send_newsletter(user_id: int, email: str) -> None:
+        ...
+
+    batch = TaskBatch(send_newsletter, max_concurrency=50)
+    batch.extend(database.fetch_all("SELECT id, email FROM users"))
+
+    await batch()
+    ```
+
+    Awaiting the batch returns the values of the calls, in the order the rows were
+    added. The rows are consumed by the run, a batch runs the rows added since its
+    last run and the rows taken by a cancelled run are not given back.
+
+    The [options](./tasks.md) apply to the batch as a whole, as for `Tasks`, except
+    `rate_limit`, `executor`, `thread_limiter` and the retry options that apply to
+    every call. A batch cannot be deduplicated with a `key`.
+    """
+
+    __slots__ = (
+        "max_concurrency",
+        "return_exceptions",
+        "chunk_size",
+        "_columns",
+        "_arity",
+        "_start",
+        "_size",
+        "_running",
+        "_call_rate_limit",
+        "_call_retry",
+    )
+
+    def __init__(
+        self,
+        func: Annotated[
+            Callable[..., Any],
+            Doc(
+                """
+                The callable called with every row, sync or async. The keyword arguments
+                shared by all the calls can be bound with `functools.partial`.
+                """
+            ),
+        ],
+        rows: Annotated[
+            Union[Iterable[Sequence[Any]], None],
+            Doc(
+                """
+                The first rows of positional arguments, see `extend()`.
+                """
+            ),
+        ] = None,
+        *,
+        max_concurrency: Annotated[
+            int,
+            Doc(
+                """
+                The number of calls running at the same time. Unlike `Tasks`, there is
+                always a limit, the batch is meant for more rows than there should be
+                coroutines.
+                """
+            ),
+        ] = 100,
+        thread_limiter: Annotated[
+            Union[CapacityLimiter, None],
+            Doc(
+                """
+                An `anyio.CapacityLimiter` used to run a blocking callable instead of the
+                default thread pool.
+                """
+            ),
+        ] = None,
+        return_exceptions: Annotated[
+            bool,
+            Doc(
+                """
+                Boolean flag indicating if the exceptions raised by the calls should take
+                the place of their values instead of being propagated.
+                """
+            ),
+        ] = False,
+        chunk_size: Annotated[
+            Union[int, None],
+            Doc(
+                """
+                Runs the calls of a blocking callable in chunks of up to `chunk_size`
+                rows, each chunk in a single trip to a worker thread. See the
+                `chunk_size` of [Tasks](./tasks.md#chunking-blocking-tasks).
+                """
+            ),
+        ] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than zero.")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("chunk_size must be greater than zero.")
+
+        super().__init__(func)
+        self.max_concurrency = max_concurrency
+        self.return_exceptions = return_exceptions
+        self.chunk_size = chunk_size
+        self._columns: List[Column] = []
+        self._arity: Union[int, None] = None
+        # The rows before _start are consumed, the ones up to _size pending.
+        self._start = 0
+        self._size = 0
+        self._running = False
+        self._call_rate_limit: Union[RateLimiter, None] = None
+        self._call_retry: Union[Retry, None] = None
+
+        if thread_limiter is not None:
+            self._set_thread_limiter(thread_limiter)
+        if rows is not None:
+            self.extend(rows)
+
+    def __len__(self) -> int:
+        """
+        The number of rows waiting to run.
+        """
+        return self._size - self._start
+
+    def with_options(self, **options: Any) -> Task:
+        if options.get("key") is not None or options.get("single_flight") is not None:
+            raise TypeError("A TaskBatch cannot be deduplicated, its rows are consumed.")
+
+        self.retry = self._call_retry
+        super().with_options(**options)
+        # Retries each call, a retry of the batch would only run the rows not taken yet.
+        self._call_retry, self.retry = self.retry, None
+        return self
+
+    def _set_rate_limit(self, rate_limit: RateLimiter) -> None:
+        # Limits each call rather than the batch as a whole.
+        self._call_rate_limit = rate_limit
+
+    def append(self, *args: Any) -> None:
+        """
+        Adds a row, the positional arguments of one call. Every row of a batch has the
+        same number of arguments.
+        """
+        if self._running:
+            raise RuntimeError("Rows cannot be added while the batch is running.")
+        if self._arity is None:
+            self._arity = len(args)
+            self._columns = [_new_column(value) for value in args]
+        elif len(args) != self._arity:
+            raise ValueError(f"Expected {self._arity} arguments per row, got {len(args)}.")
+        else:
+            columns = self._columns
+            for position, value in enumerate(args):
+                columns[position] = _append(columns[position], value)
+        self._size += 1
+
+    def extend(self, rows: Iterable[Sequence[Any]]) -> None:
+        """
+        Adds many rows, consuming `rows` lazily so a generator never has to be held in
+        memory.
+        """
+        for row in rows:
+            self.append(*row)
+
+    def _pop(self) -> List[Any]:
+        """
+        Takes the next row, releasing its values.
+        """
+        start = self._start
+        row = []
+        for column in self._columns:
+            row.append(column[start])
+            if type(column) is list:
+                column[start] = None
+        self._start = start + 1
+
+        if self._start == self._size:
+            self._columns, self._arity, self._start, self._size = [], None, 0, 0
+        elif self._start >= _COMPACT_THRESHOLD and self._start * 2 >= self._size:
+            # Gives the memory of the consumed rows back, in amortized constant time.
+            for column in self._columns:
+                del column[: self._start]
+            self._size -= self._start
+            self._start = 0
+        return row
+
+    def _chunked(self) -> bool:
+        # ProcessCallable is a subclass, the exact type keeps the process calls apart.
+        return (
+            self.chunk_size is not None
+            and type(self.func) is AsyncCallable
+            and self._call_rate_limit is None
+            and self._call_retry is None
+        )
+
+    async def run(self) -> List[Any]:
+        """
+        Runs the pending rows without applying the options of the batch.
+        """
+        if self._running:
+            raise RuntimeError("The batch is already running.")
+
+        count = len(self)
+        results: List[Any] = [None] * count
+        func, kwargs = self.func, self.kwargs
+        rate_limit, retry = self._call_rate_limit, self._call_retry
+        taken = 0
+        stop = threading.Event()
+
+        async def call(row: List[Any]) -> Any:
+            if rate_limit is not None:
+                await rate_limit.acquire(*row, **kwargs)
+            return await func(*row, **kwargs)
+
+        async def call_with_retries(row: List[Any]) -> Any:
+            assert retry is not None
+            attempt = 0
+            while True:
+                try:
+                    return await call(row)
+                except retry.retry_on:
+                    if attempt >= retry.retries:
+                        raise
+                await anyio.sleep(retry.delay(attempt))
+                attempt += 1
+
+        run_call = call if retry is None else call_with_retries
+
+        async def worker() -> None:
+            nonlocal taken
+            while taken < count:
+                index = taken
+                taken += 1
+                row = self._pop()
+                try:
+                    results[index] = await run_call(row)
+                except Exception as exc:
+                    if not self.return_exceptions:
+                        raise
+                    results[index] = exc
+
+        def record(index: int, value: Any, exc: Union[Exception, None], started: float) -> None:
+            results[index] = value if exc is None else exc
+
+        async def chunk_worker() -> None:
+            nonlocal taken
+            while taken < count:
+                size = min(self.chunk_size, count - taken)
+                calls: List[BlockingCall] = [
+                    (index, func, self._pop(), kwargs)  # type: ignore[misc]
+                    for index in range(taken, taken + size)
+                ]
+                taken += size
+                await run_chunk(
+                    calls, record, stop, self.return_exceptions, func.limiter  # type: ignore[attr-defined]
+                )
+
+        target = chunk_worker if self._chunked() else worker
+        self._running = True
+        try:
+            async with anyio.create_task_group() as group:
+                for _ in range(min(self.max_concurrency, count)):
+                    group.start_soon(target)
+        finally:
+            self._running = False
+            # Stops the chunks still running in a thread when the batch is cancelled.
+            stop.set()
+        return results
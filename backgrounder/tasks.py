@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import sys
 
 if sys.version_info >= (3, 10):  # pragma: no cover
@@ -5,16 +7,49 @@ if sys.version_info >= (3, 10):  # pragma: no cover
 else:  # pragma: no cover
     from typing_extensions import ParamSpec
 
-from typing import Any, Callable, Sequence, Union
+import threading
+import time
+from types import TracebackType
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 import anyio
+from anyio import CapacityLimiter
+from anyio.abc import TaskGroup
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from typing_extensions import Annotated, Doc
 
+from backgrounder import instrumentation
 from backgrounder._internal import Repr
-from backgrounder.concurrency import enforce_async_callable
+from backgrounder.concurrency import (
+    AsyncCallable,
+    BlockingCall,
+    Executor,
+    enforce_async_callable,
+    run_chunk,
+)
+from backgrounder.ratelimit import RateLimiter
+from backgrounder.results import GroupResult, TaskResult
+from backgrounder.retry import Retry
+from backgrounder.singleflight import SingleFlight, default_single_flight
 
 P = ParamSpec("P")
 
+_Unit = Union[Tuple[int, "Task"], List[Tuple[int, "Task"]]]
+
 
 class Task(Repr):
     """
@@ -35,7 +70,18 @@ class Task(Repr):
     ```
     """
 
-    __slots__ = ("func", "args", "kwargs")
+    __slots__ = (
+        "func",
+        "args",
+        "kwargs",
+        "limiter",
+        "timeout",
+        "retry",
+        "key",
+        "single_flight",
+        "rate_limit",
+        "_submitted",
+    )
 
     def __init__(
         self,
@@ -130,9 +176,351 @@ class Task(Repr):
         self.func = enforce_async_callable(func)
         self.args = args
         self.kwargs = kwargs
+        self._init_options()
+
+    def _init_options(self) -> None:
+        self.limiter: Union[AsyncContextManager[Any], None] = None
+        self.timeout: Union[float, None] = None
+        self.retry: Union[Retry, None] = None
+        self.key: Union[Hashable, Callable[..., Hashable], None] = None
+        self.single_flight: Union[SingleFlight, None] = None
+        self.rate_limit: Union[RateLimiter, None] = None
+        self._submitted: Union[float, None] = None
+
+    def with_options(
+        self,
+        *,
+        limiter: Union[AsyncContextManager[Any], None] = None,
+        thread_limiter: Union[CapacityLimiter, None] = None,
+        executor: Union[Executor, None] = None,
+        timeout: Union[float, None] = None,
+        retries: Union[int, None] = None,
+        backoff: Union[float, None] = None,
+        max_backoff: Union[float, None] = None,
+        jitter: Union[bool, None] = None,
+        retry_on: Union[Tuple[Type[Exception], ...], None] = None,
+        key: Union[Hashable, Callable[..., Hashable], None] = None,
+        single_flight: Union[SingleFlight, None] = None,
+        rate_limit: Union[RateLimiter, None] = None,
+    ) -> "Task":
+        """
+        Configures how the task runs and returns the task itself.
+
+        The options are set apart from the arguments of the callable to avoid clashing
+        with its keyword arguments.
+
+        - `limiter` - An `anyio.CapacityLimiter` or `anyio.Semaphore` acquired while the
+            task runs. Sharing the same limiter between tasks bounds how many of them run
+            at the same time.
+        - `thread_limiter` - An `anyio.CapacityLimiter` used to run blocking callables in
+            the thread pool instead of the default one, shared with the rest of the application.
+            When the executor is "process", it limits the process pool instead.
+        - `executor` - Where blocking callables run, "thread" (the default) or "process".
+            The "process" executor dispatches the callable to a reusable pool of worker
+            processes, useful for CPU bound work. The callable and its arguments must be
+            picklable.
+        - `timeout` - The maximum seconds each attempt can take before raising a
+            `TimeoutError`. Blocking callables are abandoned in their thread (or their
+            worker process is terminated) instead of holding the task.
+        - `retries` - How many times the task runs again after failing. Defaults to 0.
+        - `backoff` - The seconds to wait before the first retry, doubled for every
+            retry after it. Defaults to 0.
+        - `max_backoff` - The maximum seconds to wait between retries. Defaults to 60.
+        - `jitter` - Waits a random value between zero and the backoff, to avoid many
+            tasks retrying at the same time. Defaults to True.
+        - `retry_on` - The exceptions that trigger a retry. Defaults to `(Exception,)`.
+            Timeouts are retried as well unless `TimeoutError` is excluded.
+        - `key` - Deduplicates the concurrent executions of the same callable with the same
+            key, the duplicates wait for the one in flight and receive its result. Either a
+            hashable value or a function called with the arguments of the task returning one.
+        - `single_flight` - The `SingleFlight` tracking the keys, for instance one caching
+            the results for a while. Defaults to a shared one without cache.
+        - `rate_limit` - A [rate limiter](./ratelimit.md) waited for before every attempt,
+            shared between the tasks calling the same quota. On a `Tasks` group, it applies
+            to each one of its tasks.
+
+        **Example**
+
+        ```python
+        from anyio import CapacityLimiter
+
+        from backgrounder import Task
+
+        def send_notification(message: str) -> None:
+            ...
 
-    async def __call__(self) -> None:
-        await self.func(*self.args, **self.kwargs)
+        limiter = CapacityLimiter(10)
+        task = Task(send_notification, "A notification").with_options(thread_limiter=limiter)
+        await task()
+
+        task = Task(send_notification, "A notification").with_options(
+            timeout=5, retries=3, backoff=0.5, retry_on=(ConnectionError, TimeoutError)
+        )
+        await task()
+
+        task = Task(rebuild_cache, tenant_id=42).with_options(
+            key=lambda tenant_id: tenant_id
+        )
+        await task()
+        ```
+        """
+        if limiter is not None:
+            self.limiter = limiter
+        if executor is not None:
+            self._set_executor(executor)
+        if thread_limiter is not None:
+            self._set_thread_limiter(thread_limiter)
+        if timeout is not None:
+            self._set_timeout(timeout)
+        if key is not None:
+            self.key = key
+        if single_flight is not None:
+            self.single_flight = single_flight
+        if rate_limit is not None:
+            self._set_rate_limit(rate_limit)
+
+        retry_options = {
+            "retries": retries,
+            "backoff": backoff,
+            "max_backoff": max_backoff,
+            "jitter": jitter,
+            "retry_on": retry_on,
+        }
+        if any(value is not None for value in retry_options.values()):
+            retry = self.retry or Retry()
+            for name, value in retry_options.items():
+                if value is not None:
+                    setattr(retry, name, value)
+            retry.validate()
+            self.retry = retry
+        return self
+
+    def _set_rate_limit(self, rate_limit: RateLimiter) -> None:
+        self.rate_limit = rate_limit
+
+    def _set_timeout(self, timeout: float) -> None:
+        self.timeout = timeout
+        self._set_cancellable()
+
+    def _set_cancellable(self) -> None:
+        if isinstance(self.func, AsyncCallable):
+            self.func.cancellable = True
+
+    def _set_thread_limiter(self, limiter: CapacityLimiter) -> None:
+        if isinstance(self.func, AsyncCallable):
+            self.func.limiter = limiter
+
+    def _set_executor(self, executor: Executor) -> None:
+        if isinstance(self.func, AsyncCallable):
+            self.func = enforce_async_callable(
+                self.func._callable, self.func.limiter, executor, self.func.cancellable
+            )
+        else:
+            enforce_async_callable(self.func, executor=executor)
+
+    async def run(self) -> Any:
+        """
+        Runs the callable without applying any of the options.
+        """
+        return await self.func(*self.args, **self.kwargs)
+
+    async def _run_with_timeout(self) -> Any:
+        if self.timeout is None:
+            return await self.run()
+        with anyio.fail_after(self.timeout):
+            return await self.run()
+
+    async def _attempt(self) -> Any:
+        if self.rate_limit is not None:
+            await self.rate_limit.acquire(*self.args, **self.kwargs)
+        if self.limiter is None:
+            return await self._run_with_timeout()
+        async with self.limiter:
+            return await self._run_with_timeout()
+
+    @property
+    def name(self) -> str:
+        """
+        The name of the callable, used by the [instrumentation](./instrumentation.md).
+        """
+        return instrumentation.callable_name(self.func)
+
+    def _mark_submitted(self) -> None:
+        """
+        Records the moment the task was handed over to run later, when instrumented.
+        """
+        if instrumentation.instruments:
+            self._submitted = time.monotonic()
+            instrumentation.emit_submit(self.name, self._submitted)
+
+    async def __call__(self) -> Any:
+        if not instrumentation.instruments:
+            return await self._call()
+
+        name = self.name
+        started = time.monotonic()
+        submitted, self._submitted = self._submitted, None
+        instrumentation.emit_start(
+            name, started, None if submitted is None else started - submitted
+        )
+        try:
+            result = await self._call()
+        except BaseException as exc:
+            finished = time.monotonic()
+            instrumentation.emit_error(name, finished, finished - started, exc)
+            raise
+
+        finished = time.monotonic()
+        instrumentation.emit_finish(name, finished, finished - started)
+        return result
+
+    def _flight_key(self) -> Hashable:
+        key = self.key(*self.args, **self.kwargs) if callable(self.key) else self.key
+        return (getattr(self.func, "_callable", self.func), key)
+
+    async def _call(self) -> Any:
+        if self.key is None:
+            if (
+                self.retry is None
+                and self.rate_limit is None
+                and self.limiter is None
+                and self.timeout is None
+            ):
+                # Without options, skips the coroutines applying them.
+                return await self.run()
+            return await self._run_with_retries()
+        single_flight = self.single_flight
+        if single_flight is None:
+            single_flight = default_single_flight
+        return await single_flight.run(self._flight_key(), self._run_with_retries)
+
+    async def _run_with_retries(self) -> Any:
+        if self.retry is None:
+            return await self._attempt()
+
+        attempt = 0
+        while True:
+            try:
+                return await self._attempt()
+            except self.retry.retry_on:
+                if attempt >= self.retry.retries:
+                    raise
+            await anyio.sleep(self.retry.delay(attempt))
+            attempt += 1
+
+
+class ResultStream:
+    """
+    The results of tasks running in the background of an `async with` block, yielded
+    as they complete. Returned by [Tasks.as_completed()](./tasks.md#streaming-the-results)
+    and `Tasks.map()`.
+
+    The tasks start when entering the block and leaving it cancels the ones still
+    running, so breaking out of the loop or a timeout around the block never leaves
+    them behind.
+    """
+
+    __slots__ = ("_tasks", "_concurrency", "_return_exceptions", "_lock", "_group", "_receive")
+
+    def __init__(
+        self,
+        tasks: Union[Iterator[Tuple[int, Task]], AsyncIterator[Tuple[int, Task]]],
+        concurrency: int,
+        return_exceptions: bool = False,
+    ) -> None:
+        self._tasks = tasks
+        self._concurrency = concurrency
+        self._return_exceptions = return_exceptions
+        self._lock: Union[anyio.Lock, None] = None
+        self._group: Union[TaskGroup, None] = None
+        self._receive: Union[MemoryObjectReceiveStream[TaskResult], None] = None
+
+    async def _next_task(self) -> Union[Tuple[int, Task], None]:
+        tasks = self._tasks
+        if isinstance(tasks, AsyncIterator):
+            # An async generator cannot be advanced by two workers at once.
+            assert self._lock is not None
+            async with self._lock:
+                try:
+                    return await tasks.__anext__()
+                except StopAsyncIteration:
+                    return None
+        return next(tasks, None)
+
+    async def _worker(self, send: MemoryObjectSendStream[TaskResult]) -> None:
+        async with send:
+            while True:
+                pulled = await self._next_task()
+                if pulled is None:
+                    return
+                index, task = pulled
+                if instrumentation.instruments:
+                    task._mark_submitted()
+
+                started = time.monotonic()
+                try:
+                    value = await task()
+                except Exception as exc:
+                    result = TaskResult(index, None, exc, started, time.monotonic())
+                else:
+                    result = TaskResult(index, value, None, started, time.monotonic())
+                await send.send(result)
+
+    async def __aenter__(self) -> ResultStream:
+        if self._group is not None:
+            raise RuntimeError("The stream is already open.")
+        self._lock = anyio.Lock()
+        send, self._receive = anyio.create_memory_object_stream[TaskResult](self._concurrency)
+        self._group = anyio.create_task_group()
+        await self._group.__aenter__()
+        async with send:
+            for _ in range(self._concurrency):
+                self._group.start_soon(self._worker, send.clone())
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Union[Type[BaseException], None],
+        exc_value: Union[BaseException, None],
+        traceback: Union[TracebackType, None],
+    ) -> Union[bool, None]:
+        assert self._group is not None and self._receive is not None
+        group, receive = self._group, self._receive
+        self._group = self._receive = None
+        # The tasks not consumed are cancelled with the block.
+        group.cancel_scope.cancel()
+        try:
+            if isinstance(exc_value, Exception):
+                # Raised as is rather than in an exception group, the workers only
+                # ever end cancelled.
+                await group.__aexit__(None, None, None)
+                return None
+            return await group.__aexit__(exc_type, exc_value, traceback)
+        finally:
+            receive.close()
+
+    def __aiter__(self) -> ResultStream:
+        return self
+
+    async def __anext__(self) -> TaskResult:
+        if self._receive is None:
+            raise RuntimeError("Iterate over the results inside `async with`.")
+        # Takes the buffered results without a trip through the event loop for each one.
+        try:
+            result = self._receive.receive_nowait()
+        except anyio.WouldBlock:
+            try:
+                result = await self._receive.receive()
+            except anyio.EndOfStream:
+                raise StopAsyncIteration from None
+        except anyio.EndOfStream:
+            raise StopAsyncIteration from None
+
+        if result.exception is not None and not self._return_exceptions:
+            assert self._group is not None
+            self._group.cancel_scope.cancel()
+            raise result.exception
+        return result
 
 
 class Tasks(Task):
@@ -199,7 +587,15 @@ class Tasks(Task):
     ```
     """
 
-    __slots__ = ("tasks", "as_group")
+    __slots__ = (
+        "tasks",
+        "as_group",
+        "max_concurrency",
+        "thread_limiter",
+        "return_exceptions",
+        "chunk_size",
+        "_task_rate_limit",
+    )
 
     def __init__(
         self,
@@ -276,9 +672,181 @@ class Tasks(Task):
                 """
             ),
         ] = False,
+        max_concurrency: Annotated[
+            Union[int, None],
+            Doc(
+                """
+                The maximum number of tasks running at the same time when `as_group`
+                is True. By default there is no limit.
+
+                Only `max_concurrency` workers are started, pulling the tasks one by one,
+                instead of one coroutine per task.
+
+                **Example**
+
+                ```python
+                from backgrounder import Task, Tasks
+
+                async def send_email_notification(message: str):
+                    '''
+                    Sends an email notification
+                    '''
+                    send_notification(message)
+
+                tasks = Tasks(
+                    [Task(send_email_notification, f"Message {i}") for i in range(10_000)],
+                    as_group=True,
+                    max_concurrency=100,
+                )
+
+                await tasks()
+                ```
+                """
+            ),
+        ] = None,
+        thread_limiter: Annotated[
+            Union[CapacityLimiter, None],
+            Doc(
+                """
+                An `anyio.CapacityLimiter` used to run the blocking callables of the tasks
+                in the thread pool instead of the default one, shared with the rest of the
+                application.
+
+                **Example**
+
+                ```python
+                from anyio import CapacityLimiter
+
+                from backgrounder import Task, Tasks
+
+                def write_in_file():
+                    ...
+
+                tasks = Tasks(
+                    [Task(write_in_file), Task(write_in_file)],
+                    as_group=True,
+                    thread_limiter=CapacityLimiter(2),
+                )
+
+                await tasks()
+                ```
+                """
+            ),
+        ] = None,
+        return_exceptions: Annotated[
+            bool,
+            Doc(
+                """
+                Boolean flag indicating if the exceptions raised by the tasks should be
+                collected instead of propagated.
+
+                By default, the first exception stops the execution (and cancels the other
+                tasks of the group). When set to True, every task runs to completion and the
+                exceptions are collected in the returned
+                [GroupResult](./tasks.md#results), in the same order as the tasks.
+
+                **Example**
+
+                ```python
+                from backgrounder import Task, Tasks
+
+                async def fetch(url: str) -> bytes:
+                    ...
+
+                tasks = Tasks(
+                    [Task(fetch, url) for url in urls],
+                    as_group=True,
+                    return_exceptions=True,
+                )
+
+                result = await tasks()
+                for task_result in result.failed:
+                    print(task_result.index, task_result.exception)
+                ```
+                """
+            ),
+        ] = False,
+        chunk_size: Annotated[
+            Union[int, None],
+            Doc(
+                """
+                Runs the consecutive blocking tasks in chunks of up to `chunk_size`, each
+                chunk in a single trip to a worker thread instead of one trip per task.
+
+                Worth it for many short blocking calls, where the thread hops cost more
+                than the calls themselves. The tasks of a chunk run one after the other,
+                so `max_concurrency` limits the number of chunks running at once.
+
+                Only the blocking tasks without a `limiter`, `timeout`, retries, `key`
+                or `rate_limit` are chunked, the others run on their own as usual, and
+                nothing is chunked while [instruments](./instrumentation.md) are
+                registered. A chunk only holds tasks with the same `thread_limiter`
+                and takes a token of it for its trip to the thread.
+
+                **Example**
+
+                ```python
+                from backgrounder import Task, Tasks
+
+                def resize(path: str) -> None:
+                    ...
+
+                tasks = Tasks(
+                    [Task(resize, path) for path in paths],
+                    as_group=True,
+                    max_concurrency=4,
+                    chunk_size=100,
+                )
+
+                await tasks()
+                ```
+                """
+            ),
+        ] = None,
     ):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than zero.")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("chunk_size must be greater than zero.")
+
         self.tasks = list(tasks) if tasks else []
         self.as_group = as_group
+        self.max_concurrency = max_concurrency
+        self.thread_limiter: Union[CapacityLimiter, None] = None
+        self.return_exceptions = return_exceptions
+        self.chunk_size = chunk_size
+        self._task_rate_limit: Union[RateLimiter, None] = None
+        self._init_options()
+
+        if thread_limiter is not None:
+            self._set_thread_limiter(thread_limiter)
+
+    def _set_thread_limiter(self, limiter: CapacityLimiter) -> None:
+        self.thread_limiter = limiter
+        for task in self.tasks:
+            task._set_thread_limiter(limiter)
+
+    def _set_rate_limit(self, rate_limit: RateLimiter) -> None:
+        # Limits each task of the group rather than the group as a whole.
+        self._task_rate_limit = rate_limit
+        for task in self.tasks:
+            task._set_rate_limit(rate_limit)
+
+    @property
+    def name(self) -> str:
+        return self.__class__.__qualname__
+
+    def _flight_key(self) -> Hashable:
+        return (self.__class__, self.key() if callable(self.key) else self.key)
+
+    def _set_cancellable(self) -> None:
+        for task in self.tasks:
+            task._set_cancellable()
+
+    def _set_executor(self, executor: Executor) -> None:
+        for task in self.tasks:
+            if isinstance(task, Tasks) or isinstance(task.func, AsyncCallable):
+                task._set_executor(executor)
 
     def add_task(self, func: Callable[P, Any], *args: P.args, **kwargs: P.kwargs) -> None:
         """
@@ -341,19 +909,207 @@ class Tasks(Task):
         ```
         """
         task = Task(func, *args, **kwargs)
+        if self.thread_limiter is not None:
+            task._set_thread_limiter(self.thread_limiter)
+        if self._task_rate_limit is not None:
+            task._set_rate_limit(self._task_rate_limit)
         self.tasks.append(task)
 
-    async def run_single(self) -> None:
-        for task in self.tasks:
-            await task()
+    async def _run_task(self, index: int, task: Task, results: List[TaskResult]) -> None:
+        started = time.monotonic()
+        try:
+            value = await task()
+        except Exception as exc:
+            if not self.return_exceptions:
+                raise
+            results[index] = TaskResult(index, None, exc, started, time.monotonic())
+        else:
+            results[index] = TaskResult(index, value, None, started, time.monotonic())
+
+    @staticmethod
+    def _chunkable(task: Task) -> bool:
+        # ProcessCallable is a subclass, the exact type keeps the process tasks apart.
+        return (
+            type(task) is Task
+            and type(task.func) is AsyncCallable
+            and task.limiter is None
+            and task.timeout is None
+            and task.retry is None
+            and task.key is None
+            and task.rate_limit is None
+        )
+
+    def _units(self) -> List[_Unit]:
+        """
+        The tasks with their index, the consecutive chunkable ones grouped in chunks.
+        """
+        if self.chunk_size is None or instrumentation.instruments:
+            return list(enumerate(self.tasks))
+
+        units: List[_Unit] = []
+        chunk: List[Tuple[int, Task]] = []
+        for index, task in enumerate(self.tasks):
+            if not self._chunkable(task):
+                if chunk:
+                    units.append(chunk)
+                    chunk = []
+                units.append((index, task))
+                continue
+            if chunk and chunk[0][1].func.limiter is not task.func.limiter:  # type: ignore[attr-defined]
+                # A chunk runs under the thread limiter of its tasks.
+                units.append(chunk)
+                chunk = []
+            chunk.append((index, task))
+            if len(chunk) == self.chunk_size:
+                units.append(chunk)
+                chunk = []
+        if chunk:
+            units.append(chunk)
+        return units
+
+    async def _run_chunk(
+        self, chunk: List[Tuple[int, Task]], results: List[TaskResult], stop: threading.Event
+    ) -> None:
+        def record(index: int, value: Any, exc: Union[Exception, None], started: float) -> None:
+            results[index] = TaskResult(index, value, exc, started, time.monotonic())
 
-    async def run_as_group(self) -> None:
-        async with anyio.create_task_group() as group:
-            for task in self.tasks:
-                group.start_soon(task)
+        calls: List[BlockingCall] = [
+            (index, task.func, task.args, task.kwargs) for index, task in chunk  # type: ignore[misc]
+        ]
+        limiter = chunk[0][1].func.limiter  # type: ignore[attr-defined]
+        await run_chunk(calls, record, stop, self.return_exceptions, limiter)
 
-    async def __call__(self) -> None:
-        if not self.as_group:
-            await self.run_single()
+    async def _run_unit(
+        self, unit: _Unit, results: List[TaskResult], stop: threading.Event
+    ) -> None:
+        if isinstance(unit, list):
+            await self._run_chunk(unit, results, stop)
         else:
-            await self.run_as_group()
+            await self._run_task(unit[0], unit[1], results)
+
+    async def run_single(self) -> GroupResult:
+        started = time.monotonic()
+        results: List[TaskResult] = [None] * len(self.tasks)
+        stop = threading.Event()
+        for unit in self._units():
+            await self._run_unit(unit, results, stop)
+        return GroupResult(results, started, time.monotonic())
+
+    async def run_as_group(self) -> GroupResult:
+        started = time.monotonic()
+        results: List[TaskResult] = [None] * len(self.tasks)
+        stop = threading.Event()
+
+        if instrumentation.instruments:
+            for task in self.tasks:
+                task._mark_submitted()
+
+        units = self._units()
+        try:
+            if self.max_concurrency is None or len(units) <= self.max_concurrency:
+                async with anyio.create_task_group() as group:
+                    for unit in units:
+                        group.start_soon(self._run_unit, unit, results, stop)
+                return GroupResult(results, started, time.monotonic())
+
+            pending = iter(units)
+
+            async def worker() -> None:
+                for unit in pending:
+                    await self._run_unit(unit, results, stop)
+
+            async with anyio.create_task_group() as group:
+                for _ in range(self.max_concurrency):
+                    group.start_soon(worker)
+            return GroupResult(results, started, time.monotonic())
+        finally:
+            # Stops the chunks still running in a thread when the group is cancelled.
+            stop.set()
+
+    async def run(self) -> GroupResult:
+        if not self.as_group:
+            return await self.run_single()
+        return await self.run_as_group()
+
+    def as_completed(self) -> ResultStream:
+        """
+        Runs the tasks and yields their `TaskResult` as soon as each one finishes,
+        instead of waiting for the whole group. At most `max_concurrency` tasks run at
+        the same time and the results are not kept, the `index` of each result tells
+        which task it belongs to.
+
+        The tasks run inside an `async with` block, leaving it cancels the ones not
+        done yet. When `return_exceptions` is False, the first exception cancels the
+        other tasks and is raised by the iteration.
+
+        **Example**
+
+        ```python
+        from backgrounder import Task, Tasks
+
+        tasks = Tasks([Task(fetch, url) for url in urls], max_concurrency=10)
+
+        async with tasks.as_completed() as results:
+            async for result in results:
+                print(urls[result.index], result.value)
+        ```
+        """
+        concurrency = self.max_concurrency or max(len(self.tasks), 1)
+        return ResultStream(enumerate(self.tasks), concurrency, self.return_exceptions)
+
+    @classmethod
+    def map(
+        cls,
+        func: Callable[[Any], Any],
+        items: Union[Iterable[Any], AsyncIterable[Any]],
+        *,
+        concurrency: int = 100,
+        return_exceptions: bool = False,
+        **options: Any,
+    ) -> ResultStream:
+        """
+        Calls `func` with every item of an iterable or an async iterable and yields the
+        `TaskResult` of each call as soon as it finishes, in completion order.
+
+        The items are pulled lazily, only when one of the `concurrency` workers is free,
+        so a generator of millions of items runs with a flat memory usage. The `index`
+        of each result is the position of its item. The other keyword arguments are
+        the options of [Task.with_options()](./tasks.md), such as `timeout` or
+        `rate_limit`, applied to every call.
+
+        **Example**
+
+        ```python
+        from backgrounder import Tasks
+
+        async def rows():
+            async for row in database.iterate("SELECT * FROM users"):
+                yield row
+
+        async with Tasks.map(send_newsletter, rows(), concurrency=50) as results:
+            async for result in results:
+                ...
+        ```
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be greater than zero.")
+
+        def make_task(item: Any) -> Task:
+            task = Task(func, item)
+            if options:
+                task.with_options(**options)
+            return task
+
+        async def tasks() -> AsyncIterator[Tuple[int, Task]]:
+            index = 0
+            async for item in items:  # type: ignore[union-attr]
+                yield index, make_task(item)
+                index += 1
+
+        if isinstance(items, AsyncIterable):
+            return ResultStream(tasks(), concurrency, return_exceptions)
+        return ResultStream(
+            ((index, make_task(item)) for index, item in enumerate(items)),
+            concurrency,
+            return_exceptions,
+        )
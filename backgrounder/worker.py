@@ -0,0 +1,287 @@
+import logging
+import math
+import multiprocessing
+import signal
+import threading
+import time
+from multiprocessing.process import BaseProcess
+from typing import Any, Dict, List, Union
+
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+
+from backgrounder.broker import Broker, Message
+from backgrounder.journal import decode
+from backgrounder.runner import Backend
+
+logger = logging.getLogger("backgrounder")
+
+
+class Worker:
+    """
+    Runs the tasks consumed from a [broker](./worker.md#brokers) in the current process,
+    with up to `concurrency` tasks at once.
+
+    Besides the running tasks, up to `prefetch` messages (by default `concurrency`) are
+    taken in advance so the next tasks start without a round trip to the broker. A
+    prefetch of 0 only takes a message once a task slot is free, leaving the queue to
+    the other workers.
+
+    `stop()` drains the worker: it stops consuming, then runs the tasks already taken
+    and returns from `run()`.
+    """
+
+    __slots__ = ("broker", "concurrency", "prefetch", "poll_interval", "processed", "_stopping")
+
+    def __init__(
+        self,
+        broker: Broker,
+        concurrency: int = 10,
+        prefetch: Union[int, None] = None,
+        poll_interval: float = 0.5,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        if prefetch is not None and prefetch < 0:
+            raise ValueError("prefetch cannot be negative.")
+
+        self.broker = broker
+        self.concurrency = concurrency
+        self.prefetch = concurrency if prefetch is None else prefetch
+        self.poll_interval = poll_interval
+        self.processed = 0
+        self._stopping = threading.Event()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    def stop(self) -> None:
+        """
+        Stops consuming and lets `run()` return once the tasks taken are done. Can be
+        called from any thread or from a signal handler.
+        """
+        self._stopping.set()
+
+    async def _fetch(self, send: MemoryObjectSendStream[Message]) -> None:
+        async with send:
+            while not self._stopping.is_set():
+                message = await anyio.to_thread.run_sync(self.broker.consume, self.poll_interval)
+                if message is None:
+                    continue
+                if self._stopping.is_set():
+                    # Taken while stopping, handed back to the other workers.
+                    await anyio.to_thread.run_sync(self.broker.publish, message)
+                    return
+                await send.send(message)
+
+    async def _execute(self, receive: MemoryObjectReceiveStream[Message]) -> None:
+        async with receive:
+            async for message in receive:
+                try:
+                    await decode(*message)()
+                except Exception:
+                    logger.exception("Error while running the task %s.", message[0])
+                self.processed += 1
+
+    async def run(self) -> None:
+        """
+        Consumes and runs the tasks until `stop()` is called.
+        """
+        send, receive = anyio.create_memory_object_stream[Message](self.prefetch)
+        async with anyio.create_task_group() as group:
+            group.start_soon(self._fetch, send)
+            async with receive:
+                for _ in range(self.concurrency):
+                    group.start_soon(self._execute, receive.clone())
+
+
+def _run_process(
+    broker: Broker,
+    concurrency: int,
+    prefetch: Union[int, None],
+    backend: Backend,
+    backend_options: Union[Dict[str, Any], None] = None,
+) -> None:
+    """
+    The entry point of the worker processes, draining on SIGTERM and SIGINT.
+    """
+    worker = Worker(broker, concurrency, prefetch)
+
+    async def main() -> None:
+        async def wait_for_signal() -> None:
+            with anyio.open_signal_receiver(signal.SIGTERM, signal.SIGINT) as signals:
+                async for _ in signals:
+                    worker.stop()
+                    return
+
+        async with anyio.create_task_group() as group:
+            group.start_soon(wait_for_signal)
+            await worker.run()
+            group.cancel_scope.cancel()
+
+    try:
+        anyio.run(main, backend=backend, backend_options=backend_options)
+    finally:
+        broker.close()
+
+
+class WorkerPool:
+    """
+    Runs [workers](./worker.md) in child processes and scales their number with the
+    depth of the queue, between `processes` and `max_processes`.
+
+    Every `scale_interval` seconds, the pool targets one process per
+    `concurrency + prefetch` messages waiting. It starts the missing processes at once
+    and stops the extra ones one at a time, so a short lull does not stop them all.
+    A process exiting on its own is replaced.
+
+    `stop()`, SIGTERM or SIGINT drain the pool: every process finishes the tasks it
+    took, within `drain_timeout` seconds, before being killed.
+
+    The `backend` and the `backend_options` are given to AnyIO for the loop of every
+    process, for instance `backend_options={"use_uvloop": True}` to run asyncio on
+    uvloop.
+    """
+
+    __slots__ = (
+        "broker",
+        "processes",
+        "max_processes",
+        "concurrency",
+        "prefetch",
+        "scale_interval",
+        "drain_timeout",
+        "backend",
+        "backend_options",
+        "_workers",
+        "_retiring",
+        "_stopping",
+        "_context",
+    )
+
+    def __init__(
+        self,
+        broker: Broker,
+        processes: int = 1,
+        max_processes: Union[int, None] = None,
+        concurrency: int = 10,
+        prefetch: Union[int, None] = None,
+        scale_interval: float = 1.0,
+        drain_timeout: float = 30.0,
+        backend: Backend = "asyncio",
+        backend_options: Union[Dict[str, Any], None] = None,
+    ) -> None:
+        if processes < 1:
+            raise ValueError("The pool needs at least one process.")
+        if max_processes is not None and max_processes < processes:
+            raise ValueError("max_processes cannot be lower than processes.")
+
+        self.broker = broker
+        self.processes = processes
+        self.max_processes = processes if max_processes is None else max_processes
+        self.concurrency = concurrency
+        self.prefetch = concurrency if prefetch is None else prefetch
+        self.scale_interval = scale_interval
+        self.drain_timeout = drain_timeout
+        self.backend = backend
+        self.backend_options = backend_options
+        self._workers: List[BaseProcess] = []
+        self._retiring: List[BaseProcess] = []
+        self._stopping = threading.Event()
+        self._context = multiprocessing.get_context("spawn")
+
+    def __len__(self) -> int:
+        """
+        The number of processes consuming, without the ones draining.
+        """
+        return len(self._workers)
+
+    def target(self, depth: int) -> int:
+        """
+        The number of processes wanted for `depth` messages waiting.
+        """
+        wanted = math.ceil(depth / max(self.concurrency + self.prefetch, 1))
+        return min(self.max_processes, max(self.processes, wanted))
+
+    def _spawn(self) -> None:
+        process = self._context.Process(
+            target=_run_process,
+            args=(
+                self.broker,
+                self.concurrency,
+                self.prefetch,
+                self.backend,
+                self.backend_options,
+            ),
+            name="backgrounder-worker",
+        )
+        process.start()
+        self._workers.append(process)
+
+    def _retire(self) -> None:
+        process = self._workers.pop()
+        process.terminate()
+        self._retiring.append(process)
+
+    def _reap(self) -> None:
+        self._retiring = [process for process in self._retiring if process.is_alive()]
+        for process in [process for process in self._workers if not process.is_alive()]:
+            logger.warning("The worker %s exited with %s.", process.pid, process.exitcode)
+            self._workers.remove(process)
+
+    def scale(self, depth: int) -> None:
+        """
+        Starts or stops processes following the depth of the queue.
+        """
+        target = self.target(depth)
+        while len(self._workers) < target:
+            self._spawn()
+        if len(self._workers) > target:
+            self._retire()
+
+    def stop(self) -> None:
+        """
+        Asks `run()` to drain the processes and return. Thread safe.
+        """
+        self._stopping.set()
+
+    def _shutdown(self) -> None:
+        processes = self._workers + self._retiring
+        self._workers, self._retiring = [], []
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + self.drain_timeout
+        for process in processes:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning("The worker %s did not drain in time, killing it.", process.pid)
+                process.kill()
+                process.join()
+
+    def run(self) -> None:
+        """
+        Runs the pool until `stop()` is called or the process receives SIGTERM or
+        SIGINT.
+        """
+        handlers: List[Any] = []
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                handlers.append((signum, signal.signal(signum, lambda *args: self.stop())))
+
+        try:
+            self.scale(0)
+            while not self._stopping.wait(self.scale_interval):
+                self._reap()
+                try:
+                    depth = self.broker.qsize()
+                except (OSError, EOFError):
+                    logger.exception("The broker is unreachable, stopping the workers.")
+                    break
+                self.scale(depth)
+        finally:
+            self._shutdown()
+            for signum, handler in handlers:
+                signal.signal(signum, handler)
@@ -0,0 +1,110 @@
+"""
+A small harness shared by the benchmarks, measuring the latency of repeated calls.
+
+Each case is timed without tracing first, then run again under `tracemalloc` to get
+its peak memory, so the tracing overhead never leaks into the timings.
+"""
+
+import gc
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, List
+
+HEADER = f"{'case':<36}{'ops/sec':>14}{'p50 (us)':>12}{'p99 (us)':>12}{'peak (KiB)':>12}"
+
+
+class Result:
+    __slots__ = ("name", "operations", "latencies", "peak")
+
+    def __init__(self, name: str, operations: int, latencies: List[float], peak: int) -> None:
+        self.name = name
+        self.operations = operations
+        self.latencies = latencies
+        self.peak = peak
+
+    @property
+    def ops_per_second(self) -> float:
+        total = sum(self.latencies)
+        return self.operations / total if total else float("inf")
+
+    def percentile(self, percentile: float) -> float:
+        latencies = sorted(self.latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        return latencies[index]
+
+    def row(self) -> str:
+        return (
+            f"{self.name:<36}{self.ops_per_second:>14,.0f}"
+            f"{self.percentile(50) * 1e6:>12,.1f}{self.percentile(99) * 1e6:>12,.1f}"
+            f"{self.peak / 1024:>12,.1f}"
+        )
+
+
+def measure(
+    name: str, func: Callable[[], Any], repeat: int, operations: int = 1, warmup: int = 5
+) -> Result:
+    """
+    Calls `func` `repeat` times. Each call counts as `operations` operations.
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    gc.collect()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(name, repeat * operations, latencies, peak)
+
+
+async def ameasure(
+    name: str,
+    func: Callable[[], Awaitable[Any]],
+    repeat: int,
+    operations: int = 1,
+    warmup: int = 5,
+) -> Result:
+    """
+    The async version of `measure()`.
+    """
+    for _ in range(warmup):
+        await func()
+
+    latencies = []
+    gc.collect()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        await func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(name, repeat * operations, latencies, peak)
+
+
+def report(title: str, results: List[Result]) -> None:
+    print(f"\n{title}")
+    print(HEADER)
+    for result in results:
+        print(result.row())
+
+
+def repeat_for(size: int, budget: int = 200_000, minimum: int = 3, maximum: int = 1000) -> int:
+    """
+    How many times to run a case of `size` operations to stay around `budget` operations.
+    """
+    return max(minimum, min(maximum, budget // size))
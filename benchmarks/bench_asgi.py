@@ -0,0 +1,79 @@
+"""
+Compares the latency of a request awaiting its background work in the handler with
+the same work added with `add_task()` and run by the `BackgroundMiddleware` after the
+response, through a local httpx client.
+
+    python -m benchmarks.bench_asgi
+    python -m benchmarks.bench_asgi --requests 2000 --task-duration 0.005
+
+An operation is one request.
+"""
+
+import argparse
+import functools
+from typing import Any, Awaitable, Callable, List, MutableMapping
+
+import anyio
+import httpx
+
+from backgrounder.asgi import BackgroundMiddleware, add_task
+
+from ._harness import Result, ameasure, report
+
+Scope = MutableMapping[str, Any]
+
+
+async def work(duration: float) -> None:
+    await anyio.sleep(duration)
+
+
+def application(handler: Callable[[], Awaitable[None]]) -> Any:
+    async def app(scope: Scope, receive: Any, send: Any) -> None:
+        await handler()
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"2")]}
+        )
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app
+
+
+async def request(client: httpx.AsyncClient) -> None:
+    response = await client.get("/")
+    response.raise_for_status()
+
+
+async def main(requests: int, duration: float, max_concurrency: int) -> None:
+    async def nothing() -> None:
+        return None
+
+    async def inline() -> None:
+        await work(duration)
+
+    async def after_response() -> None:
+        add_task(work, duration)
+
+    results: List[Result] = []
+    for name, handler in (
+        ("no task", nothing),
+        ("awaited in the handler", inline),
+        ("add_task()", after_response),
+    ):
+        middleware = BackgroundMiddleware(application(handler), max_concurrency=max_concurrency)
+        # The httpx transport does not run the lifespan, the runner is started by hand.
+        async with middleware.runner:
+            transport = httpx.ASGITransport(app=middleware)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                results.append(
+                    await ameasure(name, functools.partial(request, client), requests, warmup=10)
+                )
+    report(f"request latency, tasks of {duration * 1000:g}ms", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--task-duration", type=float, default=0.002)
+    parser.add_argument("--max-concurrency", type=int, default=100)
+    args = parser.parse_args()
+    anyio.run(main, args.requests, args.task_duration, args.max_concurrency)
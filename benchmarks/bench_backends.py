@@ -0,0 +1,72 @@
+"""
+Compares the dispatch throughput of the runner across the event loop backends.
+
+    python -m benchmarks.bench_backends
+    python -m benchmarks.bench_backends --calls 5000 --workers 2
+
+The uvloop case is skipped when uvloop is not installed.
+"""
+
+import argparse
+import importlib.util
+from typing import Any, Dict, List, Tuple
+
+from backgrounder import Task, Tasks
+from backgrounder.runner import Backend, Runner
+
+from ._harness import Result, measure, repeat_for, report
+
+BACKENDS: List[Tuple[str, Backend, Dict[str, Any]]] = [
+    ("asyncio", "asyncio", {}),
+    ("asyncio+uvloop", "asyncio", {"use_uvloop": True}),
+    ("trio", "trio", {}),
+]
+
+
+async def noop() -> None:
+    return None
+
+
+def sync_noop() -> None:
+    return None
+
+
+async def group(size: int) -> Any:
+    return await Tasks([Task(noop) for _ in range(size)], as_group=True)()
+
+
+def bench(label: str, runner: Runner, calls: int, size: int) -> List[Result]:
+    runner.start()
+    try:
+        return [
+            measure(f"{label} run", lambda: runner.run(noop), calls),
+            measure(f"{label} run sync task", lambda: runner.run(Task(sync_noop)), calls),
+            measure(
+                f"{label} group x{size}",
+                lambda: runner.run(group, size),
+                repeat_for(size, budget=50_000),
+                operations=size,
+            ),
+        ]
+    finally:
+        runner.shutdown()
+
+
+def main(calls: int, size: int, workers: int) -> None:
+    results = []
+    for label, backend, options in BACKENDS:
+        if options.get("use_uvloop") and importlib.util.find_spec("uvloop") is None:
+            print(f"{label}: skipped, uvloop is not installed")
+            continue
+        runner = Runner(workers=workers, backend=backend, backend_options=options)
+        results.extend(bench(label, runner, calls, size))
+    report("runner dispatch", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    main(args.calls, args.size, args.workers)
@@ -0,0 +1,58 @@
+"""
+Compares one thread hop per blocking task with chunked groups.
+
+    python -m benchmarks.bench_chunks
+    python -m benchmarks.bench_chunks --tasks 10000 --chunk-sizes 10 100 1000
+
+An operation is one task and the latency is the one of the group.
+"""
+
+import argparse
+import functools
+from typing import List, Union
+
+import anyio
+
+from backgrounder import Task, Tasks
+
+from ._harness import Result, ameasure, repeat_for, report
+
+
+def blocking_noop(number: int) -> int:
+    return number
+
+
+async def run_group(size: int, chunk_size: Union[int, None], max_concurrency: int) -> None:
+    tasks = Tasks(
+        [Task(blocking_noop, number) for number in range(size)],
+        as_group=True,
+        max_concurrency=max_concurrency,
+        chunk_size=chunk_size,
+    )
+    await tasks()
+
+
+async def main(size: int, chunk_sizes: List[int], max_concurrency: int) -> None:
+    repeat = repeat_for(size, budget=50_000)
+    results: List[Result] = []
+    for chunk_size in [None, *chunk_sizes]:
+        label = "one hop per task" if chunk_size is None else f"chunk_size={chunk_size}"
+        results.append(
+            await ameasure(
+                f"{label} x{size}",
+                functools.partial(run_group, size, chunk_size, max_concurrency),
+                repeat,
+                operations=size,
+                warmup=1,
+            )
+        )
+    report(f"blocking tasks, max_concurrency={max_concurrency}", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+    anyio.run(main, args.tasks, args.chunk_sizes, args.max_concurrency)
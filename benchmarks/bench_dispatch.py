@@ -0,0 +1,97 @@
+"""
+Measures the dispatch overhead and the throughput of every execution path.
+
+    python -m benchmarks.bench_dispatch
+    python -m benchmarks.bench_dispatch --backend asyncio --sizes 10 1000 --calls 5000
+
+For the `Tasks` cases, an operation is one task and the latency is the one of the group.
+"""
+
+import argparse
+from typing import Any, List
+
+import anyio
+
+from backgrounder import Task, Tasks, background
+from backgrounder.concurrency import run_sync
+from backgrounder.runner import get_runner
+
+from ._harness import Result, ameasure, measure, repeat_for, report
+
+
+async def async_noop() -> None:
+    return None
+
+
+def sync_noop() -> None:
+    return None
+
+
+@background
+async def decorated_async() -> None:
+    return None
+
+
+@background
+def decorated_sync() -> None:
+    return None
+
+
+def bench_outside_loop(calls: int) -> List[Result]:
+    get_runner().start()
+    return [
+        measure("background async, no loop", decorated_async, calls),
+        measure("background sync, no loop", decorated_sync, calls),
+        measure("run_sync, no loop", lambda: run_sync(async_noop()), calls),
+    ]
+
+
+async def bench_in_loop(calls: int, sizes: List[int]) -> List[Result]:
+    results = [
+        await ameasure("Task async", lambda: Task(async_noop)(), calls),
+        await ameasure("Task sync", lambda: Task(sync_noop)(), calls),
+    ]
+
+    async def call_decorated() -> Any:
+        # Inside a loop, a decorated coroutine function returns an awaitable.
+        return await decorated_async()
+
+    async def call_run_sync() -> Any:
+        return run_sync(async_noop())
+
+    results.append(await ameasure("background async, in loop", call_decorated, calls))
+    results.append(await ameasure("run_sync, in loop", call_run_sync, calls))
+
+    for size in sizes:
+        for as_group in (False, True):
+
+            async def run_group(as_group: bool = as_group, size: int = size) -> Any:
+                return await Tasks([Task(async_noop) for _ in range(size)], as_group=as_group)()
+
+            label = "as_group" if as_group else "sequential"
+            results.append(
+                await ameasure(
+                    f"Tasks {label} x{size}",
+                    run_group,
+                    repeat_for(size),
+                    operations=size,
+                    warmup=1,
+                )
+            )
+    return results
+
+
+def main(backends: List[str], sizes: List[int], calls: int) -> None:
+    report("outside a running loop", bench_outside_loop(calls))
+    for backend in backends:
+        results = anyio.run(bench_in_loop, calls, sizes, backend=backend)
+        report(f"inside a running loop, {backend}", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", action="append", choices=["asyncio", "trio"], dest="backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100_000])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.backends or ["asyncio", "trio"], args.sizes, args.calls)
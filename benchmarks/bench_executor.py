@@ -0,0 +1,60 @@
+"""
+Compares the thread and the process executors for CPU bound tasks.
+
+    python -m benchmarks.bench_executor --tasks 16 --size 200000
+"""
+
+import argparse
+import os
+import time
+
+import anyio
+from anyio import CapacityLimiter
+
+from backgrounder import Task, Tasks
+from backgrounder.concurrency import Executor
+
+
+def cpu_bound(size: int) -> int:
+    total = 0
+    for i in range(size):
+        total += i * i % 7
+    return total
+
+
+async def run(executor: Executor, tasks: int, size: int, workers: int) -> float:
+    limiter = CapacityLimiter(workers)
+    group = Tasks(
+        [
+            Task(cpu_bound, size).with_options(executor=executor, thread_limiter=limiter)
+            for _ in range(tasks)
+        ],
+        as_group=True,
+    )
+    start = time.perf_counter()
+    await group()
+    return time.perf_counter() - start
+
+
+async def main(tasks: int, size: int) -> None:
+    cpus = os.cpu_count() or 1
+    # Warms up the process pool so the spawn cost is not measured.
+    await run("process", cpus, 1, cpus)
+
+    baseline = await run("thread", tasks, size, cpus)
+    print(f"{'executor':<10}{'workers':>8}{'seconds':>10}{'speedup':>10}")
+    print(f"{'thread':<10}{cpus:>8}{baseline:>10.3f}{1:>10.2f}")
+
+    workers = 1
+    while workers <= cpus:
+        elapsed = await run("process", tasks, size, workers)
+        print(f"{'process':<10}{workers:>8}{elapsed:>10.3f}{baseline / elapsed:>10.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=16)
+    parser.add_argument("--size", type=int, default=200_000)
+    args = parser.parse_args()
+    anyio.run(main, args.tasks, args.size)
@@ -0,0 +1,87 @@
+"""
+Measures the cost of building and calling a task, against the previous invocation path.
+
+    python -m benchmarks.bench_invocation
+    python -m benchmarks.bench_invocation --calls 20000
+
+The legacy cases reproduce the former code: the classification of the callable done on
+every `Task()` and a merged kwargs dict with a new partial on every call. An operation is
+one classification, one task or one call.
+"""
+
+import argparse
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, List
+
+import anyio
+import anyio.to_thread
+
+from backgrounder import Task
+from backgrounder._compat import is_async_callable
+from backgrounder.concurrency import AsyncCallable
+
+from ._harness import Result, ameasure, measure, report
+
+BATCH = 1000
+
+
+def sync_noop() -> None:
+    return None
+
+
+async def async_noop() -> None:
+    return None
+
+
+def legacy_is_async_callable(obj: Any) -> bool:
+    while isinstance(obj, functools.partial):
+        obj = obj.func
+    return asyncio.iscoroutinefunction(obj) or (
+        callable(obj) and asyncio.iscoroutinefunction(obj.__call__)
+    )
+
+
+class LegacyAsyncCallable(AsyncCallable):
+    __slots__ = ()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Awaitable[Any]:
+        combined_kwargs = {**self.default_kwargs, **kwargs}
+        func: Callable[..., Any] = functools.partial(self._callable, **combined_kwargs)
+        return anyio.to_thread.run_sync(
+            func, *args, abandon_on_cancel=self.cancellable, limiter=self.limiter
+        )
+
+
+def classify(function: Callable[[Any], bool]) -> Callable[[], None]:
+    def run() -> None:
+        for _ in range(BATCH):
+            function(sync_noop)
+            function(async_noop)
+
+    return run
+
+
+def build_tasks() -> List[Task]:
+    return [Task(sync_noop) for _ in range(BATCH)]
+
+
+async def main(calls: int) -> None:
+    repeat = max(3, calls // BATCH)
+    results: List[Result] = [
+        measure("legacy classification", classify(legacy_is_async_callable), repeat, BATCH * 2),
+        measure("cached classification", classify(is_async_callable), repeat, BATCH * 2),
+        measure("Task() x1000 (peak per 1000)", build_tasks, repeat, BATCH),
+        await ameasure("legacy AsyncCallable call", LegacyAsyncCallable(sync_noop), calls),
+        await ameasure("AsyncCallable call", AsyncCallable(sync_noop), calls),
+        await ameasure("Task sync call", lambda: Task(sync_noop)(), calls),
+        await ameasure("Task async call", lambda: Task(async_noop)(), calls),
+    ]
+    report("task invocation", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=10_000)
+    args = parser.parse_args()
+    anyio.run(main, args.calls)
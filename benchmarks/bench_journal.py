@@ -0,0 +1,118 @@
+"""
+Measures the write throughput of the task journal per synchronous mode, on its own
+and behind a `TaskQueue` putting and running the tasks.
+
+    python -m benchmarks.bench_journal
+    python -m benchmarks.bench_journal --tasks 10000 --batch 500
+
+For the queue, an operation is one task put, run and marked as done.
+"""
+
+import argparse
+import functools
+import itertools
+import os
+import tempfile
+from typing import List, Union
+
+import anyio
+
+from backgrounder import Task, TaskQueue
+from backgrounder.journal import Journal, Synchronous
+
+from ._harness import Result, ameasure, measure, report
+
+
+def send_email(address: str, subject: str) -> None:
+    return None
+
+
+async def send_email_async(address: str, subject: str) -> None:
+    return None
+
+
+async def run_queue(journal: Union[Journal, None], tasks: int, producers: int) -> None:
+    task = Task(send_email_async, "user@example.com", subject="Welcome")
+
+    async def produce(count: int) -> None:
+        for _ in range(count):
+            if producers:
+                await queue.put(task)
+            else:
+                queue.put_nowait(task)
+
+    async with TaskQueue(workers=10, journal=journal) as queue:
+        async with anyio.create_task_group() as group:
+            for _ in range(max(producers, 1)):
+                group.start_soon(produce, tasks // max(producers, 1))
+        await queue.join()
+
+
+async def bench_queue(directory: str, tasks: int, producers: int) -> List[Result]:
+    """
+    Without producers, the tasks are added with `put_nowait()`. Otherwise each producer
+    waits in `put()` for its task to be stored, the concurrent ones sharing a commit.
+    """
+    label = "put_nowait" if not producers else f"put x{producers} producers"
+    results = [
+        await ameasure(
+            f"{label}, no journal",
+            functools.partial(run_queue, None, tasks, producers),
+            3,
+            operations=tasks,
+            warmup=1,
+        )
+    ]
+    synchronous: Synchronous
+    for synchronous in ("OFF", "NORMAL", "FULL"):
+        path = os.path.join(directory, f"queue-{synchronous.lower()}.db")
+        with Journal(path, synchronous=synchronous) as journal:
+            results.append(
+                await ameasure(
+                    f"{label}, {synchronous}",
+                    functools.partial(run_queue, journal, tasks, producers),
+                    3,
+                    operations=tasks,
+                    warmup=1,
+                )
+            )
+    return results
+
+
+def bench(directory: str, synchronous: Synchronous, tasks: int, batch: int) -> List[Result]:
+    path = os.path.join(directory, f"{synchronous.lower()}.db")
+    task = Task(send_email, "user@example.com", subject="Welcome")
+    entries = itertools.count(1)
+
+    with Journal(path, synchronous=synchronous, compact_every=0) as journal:
+        results = [
+            measure(f"{synchronous} append", lambda: journal.append(task), tasks),
+            measure(
+                f"{synchronous} append_many x{batch}",
+                lambda: journal.append_many([task] * batch),
+                max(1, tasks // batch),
+                operations=batch,
+            ),
+            measure(f"{synchronous} complete", lambda: journal.complete(next(entries)), tasks),
+        ]
+        results.append(measure(f"{synchronous} compact", journal.compact, 1, warmup=0))
+    return results
+
+
+def main(tasks: int, batch: int) -> None:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for synchronous in ("OFF", "NORMAL", "FULL"):
+            results.extend(bench(directory, synchronous, tasks, batch))
+        report("journal writes", results)
+
+        for producers in (0, 1, 50):
+            report("queue with a journal", anyio.run(bench_queue, directory, tasks, producers))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+    main(args.tasks, args.batch)
@@ -0,0 +1,45 @@
+"""
+Compares submitting tasks from blocking code with a loop per call and with a portal.
+
+    python -m benchmarks.bench_portal --calls 1000
+"""
+
+import argparse
+from concurrent.futures import wait
+
+import anyio
+
+import backgrounder
+from backgrounder import Task
+
+from ._harness import measure, report
+
+
+async def noop() -> None:
+    return None
+
+
+def main(calls: int) -> None:
+    results = [measure("anyio.run per call", lambda: anyio.run(Task(noop)), calls)]
+
+    with backgrounder.portal() as portal:
+        results.append(
+            measure("portal submit and wait", lambda: portal.submit(Task(noop)).result(), calls)
+        )
+        results.append(
+            measure(
+                f"portal submit x{calls} then wait",
+                lambda: wait([portal.submit(Task(noop)) for _ in range(calls)]),
+                repeat=5,
+                operations=calls,
+            )
+        )
+
+    report("blocking code submitting tasks", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.calls)
@@ -0,0 +1,79 @@
+"""
+Compares pending timers in the scheduler with one sleeping coroutine per timer.
+
+    python -m benchmarks.bench_scheduler
+    python -m benchmarks.bench_scheduler --timers 10000
+"""
+
+import argparse
+
+import anyio
+
+from backgrounder import Task
+from backgrounder.scheduler import Scheduler
+
+from ._harness import ameasure, report
+
+
+async def noop() -> None:
+    return None
+
+
+async def sleeping_coroutines(timers: int) -> None:
+    async def sleep_then_run() -> None:
+        await anyio.sleep(0.05)
+        await noop()
+
+    async with anyio.create_task_group() as group:
+        for _ in range(timers):
+            group.start_soon(sleep_then_run)
+
+
+async def scheduler_timers(timers: int) -> None:
+    async with Scheduler() as scheduler:
+        for _ in range(timers):
+            scheduler.schedule_in(Task(noop), 0.05)
+        while len(scheduler):
+            await anyio.sleep(0.01)
+
+
+async def scheduler_pending(timers: int) -> None:
+    scheduler = Scheduler()
+    entries = [scheduler.schedule_in(Task(noop), 3600) for _ in range(timers)]
+    for entry in entries:
+        entry.cancel()
+
+
+async def main(timers: int, repeat: int) -> None:
+    results = [
+        await ameasure(
+            f"anyio.sleep x{timers}",
+            lambda: sleeping_coroutines(timers),
+            repeat,
+            operations=timers,
+            warmup=1,
+        ),
+        await ameasure(
+            f"Scheduler x{timers}",
+            lambda: scheduler_timers(timers),
+            repeat,
+            operations=timers,
+            warmup=1,
+        ),
+        await ameasure(
+            f"Scheduler schedule+cancel x{timers}",
+            lambda: scheduler_pending(timers),
+            repeat,
+            operations=timers,
+            warmup=1,
+        ),
+    ]
+    report("pending timers", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--timers", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    anyio.run(main, args.timers, args.repeat)
@@ -0,0 +1,64 @@
+"""
+Compares a whole group of tasks with the streaming APIs, in time and peak memory.
+
+    python -m benchmarks.bench_streaming
+    python -m benchmarks.bench_streaming --items 1000000 --concurrency 100
+"""
+
+import argparse
+import functools
+
+import anyio
+
+from backgrounder import Task, Tasks
+
+from ._harness import ameasure, report
+
+
+async def identity(item: int) -> int:
+    return item
+
+
+async def group(items: int, concurrency: int) -> None:
+    tasks = Tasks([Task(identity, item) for item in range(items)], max_concurrency=concurrency)
+    await tasks.run_as_group()
+
+
+async def as_completed(items: int, concurrency: int) -> None:
+    tasks = Tasks([Task(identity, item) for item in range(items)], max_concurrency=concurrency)
+    async with tasks.as_completed() as results:
+        async for _ in results:
+            pass
+
+
+async def streaming_map(items: int, concurrency: int) -> None:
+    async with Tasks.map(identity, range(items), concurrency=concurrency) as results:
+        async for _ in results:
+            pass
+
+
+async def main(items: int, concurrency: int, repeat: int) -> None:
+    results = [
+        await ameasure(
+            f"{name} x{items}",
+            functools.partial(func, items, concurrency),
+            repeat,
+            operations=items,
+            warmup=1,
+        )
+        for name, func in (
+            ("run_as_group", group),
+            ("as_completed", as_completed),
+            ("Tasks.map", streaming_map),
+        )
+    ]
+    report(f"streaming results, concurrency={concurrency}", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    anyio.run(main, args.items, args.concurrency, args.repeat)
@@ -0,0 +1,78 @@
+"""
+Compares a `Tasks` of one `Task` per row with a `TaskBatch`, in time and peak memory,
+to build the pending calls and to build and run them.
+
+    python -m benchmarks.bench_taskbatch
+    python -m benchmarks.bench_taskbatch --rows 1000000 --repeat 1
+
+An operation is one row, the rows being an int and a short string.
+"""
+
+import argparse
+import functools
+from typing import Any, Iterator, Tuple
+
+import anyio
+
+from backgrounder import Task, Tasks
+from backgrounder.taskbatch import TaskBatch
+
+from ._harness import ameasure, measure, report
+
+
+async def send(user_id: int, email: str) -> None:
+    return None
+
+
+def rows(size: int) -> Iterator[Tuple[int, str]]:
+    # The strings are shared, only the containers holding the rows are measured.
+    email = "user@example.com"
+    return ((user_id, email) for user_id in range(size))
+
+
+def build_tasks(size: int, concurrency: int) -> Tasks:
+    return Tasks(
+        [Task(send, *row) for row in rows(size)], as_group=True, max_concurrency=concurrency
+    )
+
+
+def build_batch(size: int, concurrency: int) -> TaskBatch:
+    return TaskBatch(send, rows(size), max_concurrency=concurrency)
+
+
+async def run(build: Any, size: int, concurrency: int) -> None:
+    await build(size, concurrency)()
+
+
+async def main(size: int, concurrency: int, repeat: int) -> None:
+    results = []
+    for name, build in (("Tasks", build_tasks), ("TaskBatch", build_batch)):
+        results.append(
+            measure(
+                f"build {name} x{size}",
+                functools.partial(build, size, concurrency),
+                repeat,
+                operations=size,
+                warmup=1,
+            )
+        )
+    for name, build in (("Tasks", build_tasks), ("TaskBatch", build_batch)):
+        results.append(
+            await ameasure(
+                f"run {name} x{size}",
+                functools.partial(run, build, size, concurrency),
+                repeat,
+                operations=size,
+                warmup=1,
+            )
+        )
+    report(f"pending calls, max_concurrency={concurrency}", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    anyio.run(main, args.rows, args.concurrency, args.repeat)
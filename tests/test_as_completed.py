@@ -0,0 +1,155 @@
+import time
+
+import anyio
+import pytest
+
+from backgrounder.graph import TaskGraph
+from backgrounder.tasks import Task, Tasks
+
+pytestmark = pytest.mark.anyio
+
+
+async def sleep_and_return(delay):
+    await anyio.sleep(delay)
+    return delay
+
+
+async def test_as_completed_yields_in_completion_order():
+    tasks = Tasks([Task(sleep_and_return, delay) for delay in (0.06, 0.0, 0.03)])
+
+    async with tasks.as_completed() as stream:
+        results = [result async for result in stream]
+
+    assert [result.index for result in results] == [1, 2, 0]
+    assert [result.value for result in results] == [0.0, 0.03, 0.06]
+
+
+async def test_as_completed_respects_max_concurrency():
+    running = peak = 0
+
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await anyio.sleep(0.005)
+        running -= 1
+
+    tasks = Tasks([Task(work) for _ in range(20)], max_concurrency=3)
+    async with tasks.as_completed() as stream:
+        results = [result async for result in stream]
+
+    assert len(results) == 20
+    assert peak == 3
+
+
+async def test_as_completed_raises_the_first_exception():
+    finished = []
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def slow():
+        await anyio.sleep(1)
+        finished.append(True)
+
+    tasks = Tasks([Task(slow), Task(fail)])
+    with pytest.raises(ValueError, match="boom"):
+        async with tasks.as_completed() as stream:
+            async for _ in stream:
+                pass
+    assert finished == []
+
+
+async def test_as_completed_collects_exceptions():
+    def fail():
+        raise ValueError("boom")
+
+    tasks = Tasks([Task(fail), Task(time.sleep, 0)], return_exceptions=True)
+    async with tasks.as_completed() as stream:
+        results = sorted([result async for result in stream], key=lambda r: r.index)
+
+    assert isinstance(results[0].exception, ValueError)
+    assert results[1].ok
+
+
+@pytest.mark.parametrize("anyio_backend", ["asyncio", "trio"])
+async def test_break_cancels_the_remaining_tasks():
+    finished = []
+
+    async def work(delay):
+        await anyio.sleep(delay)
+        finished.append(delay)
+
+    async with Tasks([Task(work, 0), Task(work, 1)]).as_completed() as stream:
+        async for _ in stream:
+            break
+
+    assert finished == [0]
+
+
+@pytest.mark.parametrize("anyio_backend", ["asyncio", "trio"])
+async def test_timeout_around_the_stream():
+    received = []
+
+    with anyio.move_on_after(0.1) as scope:
+        async with Tasks.map(sleep_and_return, [0, 10, 10]) as stream:
+            async for result in stream:
+                received.append(result.value)
+
+    assert scope.cancelled_caught
+    assert received == [0]
+
+
+async def test_iterating_outside_of_the_block():
+    stream = Tasks([Task(sleep_and_return, 0)]).as_completed()
+
+    with pytest.raises(RuntimeError):
+        await stream.__anext__()
+
+
+async def test_map_pulls_the_items_lazily():
+    pulled = 0
+
+    def items():
+        nonlocal pulled
+        for item in range(100):
+            pulled += 1
+            yield item
+
+    async def double(item):
+        return item * 2
+
+    async with Tasks.map(double, items(), concurrency=4) as stream:
+        first = await stream.__anext__()
+
+    assert first.value == first.index * 2
+    # Only the items taken by the workers, plus the buffered results, were pulled.
+    assert pulled <= 10
+
+
+async def test_map_async_iterable_and_options():
+    async def items():
+        for item in range(10):
+            yield item
+
+    def fail_on_odd(item):
+        if item % 2:
+            raise ValueError(item)
+        return item
+
+    stream = Tasks.map(fail_on_odd, items(), concurrency=3, return_exceptions=True, retries=1)
+    async with stream:
+        results = [result async for result in stream]
+
+    assert sorted(result.value for result in results if result.ok) == [0, 2, 4, 6, 8]
+    assert sorted(result.index for result in results if not result.ok) == [1, 3, 5, 7, 9]
+
+
+def test_map_rejects_an_invalid_concurrency():
+    with pytest.raises(ValueError):
+        Tasks.map(print, [], concurrency=0)
+
+
+def test_graph_does_not_support_as_completed():
+    with pytest.raises(TypeError):
+        TaskGraph().as_completed()
@@ -0,0 +1,190 @@
+import time
+
+import anyio
+import pytest
+from esmerald.responses import Response
+
+from backgrounder.asgi import AfterResponseRunner, BackgroundMiddleware, add, add_task
+from backgrounder.tasks import Task, Tasks
+
+
+def application(handler):
+    """
+    A bare ASGI application calling `handler` for each request.
+    """
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                else:
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        await handler()
+        await Response("done", media_type="text/plain")(scope, receive, send)
+
+    return app
+
+
+def test_tasks_run_after_the_response(test_client_factory):
+    events = []
+
+    async def slow(value):
+        await anyio.sleep(0.3)
+        events.append(value)
+
+    async def handler():
+        add_task(slow, "first")
+        add(Tasks([Task(slow, "second")], as_group=True))
+
+    middleware = BackgroundMiddleware(application(handler))
+    with test_client_factory(middleware) as client:
+        started = time.monotonic()
+        response = client.get("/")
+        assert time.monotonic() - started < 0.25
+        assert response.text == "done"
+        assert events == []
+        assert len(middleware.runner) == 2
+
+    # Drained on shutdown.
+    assert sorted(events) == ["first", "second"]
+    assert not middleware.runner.started
+
+
+def test_tasks_run_in_the_request_without_a_lifespan(test_client_factory):
+    events = []
+
+    async def handler():
+        add_task(events.append, "task")
+
+    client = test_client_factory(BackgroundMiddleware(application(handler)))
+    assert client.get("/").text == "done"
+    assert events == ["task"]
+
+
+def test_tasks_of_a_failed_request_are_discarded(test_client_factory):
+    events = []
+
+    async def handler():
+        add_task(events.append, "task")
+        raise ValueError("boom")
+
+    client = test_client_factory(BackgroundMiddleware(application(handler)))
+    with pytest.raises(ValueError):
+        client.get("/")
+    assert events == []
+
+
+def test_tasks_share_the_concurrency_limit(test_client_factory):
+    running = []
+    peak = []
+
+    async def track():
+        running.append(1)
+        peak.append(len(running))
+        await anyio.sleep(0.05)
+        running.pop()
+
+    async def handler():
+        for _ in range(3):
+            add_task(track)
+
+    middleware = BackgroundMiddleware(application(handler), max_concurrency=2)
+    with test_client_factory(middleware) as client:
+        for _ in range(3):
+            client.get("/")
+
+    assert len(peak) == 9
+    assert max(peak) == 2
+
+
+def test_drain_cancels_the_tasks_after_the_deadline(test_client_factory, caplog):
+    events = []
+
+    async def forever():
+        await anyio.sleep(10)
+        events.append("never")
+
+    async def handler():
+        add_task(forever)
+
+    middleware = BackgroundMiddleware(application(handler), drain_timeout=0.1)
+    started = time.monotonic()
+    with test_client_factory(middleware) as client:
+        client.get("/")
+
+    assert time.monotonic() - started < 5
+    assert events == []
+    assert len(middleware.runner) == 0
+    assert "Cancelling 1 tasks" in caplog.text
+
+
+def test_errors_are_logged(test_client_factory, caplog):
+    def fail():
+        raise ValueError("boom")
+
+    async def handler():
+        add_task(fail)
+
+    with test_client_factory(BackgroundMiddleware(application(handler))) as client:
+        assert client.get("/").status_code == 200
+
+    assert "Error while running the task" in caplog.text
+    assert "ValueError: boom" in caplog.text
+
+
+@pytest.mark.anyio
+async def test_runner_started_by_hand():
+    runner = AfterResponseRunner(max_concurrency=1)
+    events = []
+
+    async with runner:
+        runner.submit([Task(events.append, 1), Task(events.append, 2)])
+        with pytest.raises(RuntimeError):
+            async with runner:
+                pass
+
+    assert events == [1, 2]
+    with pytest.raises(RuntimeError):
+        runner.submit([Task(events.append, 3)])
+
+
+@pytest.mark.parametrize("backend", ["asyncio", "trio"])
+def test_lifespan_drains_and_closes_the_runner(backend):
+    events = []
+    sent = []
+    middleware = BackgroundMiddleware(application(None))
+
+    async def lifespan():
+        messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+
+        async def receive():
+            message = next(messages)
+            if message["type"] == "lifespan.shutdown":
+                middleware.runner.submit([Task(anyio.sleep, 0.05), Task(events.append, "task")])
+            return message
+
+        async def send(message):
+            sent.append(message["type"])
+
+        await middleware({"type": "lifespan"}, receive, send)
+        assert not middleware.runner.started
+
+        # Started again once left.
+        async with middleware.runner:
+            middleware.runner.submit([Task(events.append, "again")])
+
+    # Run in its own loop, a task group left open fails when the loop ends on trio.
+    anyio.run(lifespan, backend=backend)
+
+    assert events == ["task", "again"]
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+def test_add_outside_of_a_request():
+    with pytest.raises(RuntimeError):
+        add_task(print, "no request")
+    with pytest.raises(ValueError):
+        AfterResponseRunner(max_concurrency=0)
@@ -0,0 +1,130 @@
+import threading
+
+import pytest
+
+from backgrounder.batch import BatchedTask
+from backgrounder.decorator import background
+from backgrounder.tasks import Task, Tasks
+
+pytestmark = pytest.mark.anyio
+
+
+def test_flushes_on_size():
+    batches = []
+
+    def write_rows(rows):
+        batches.append(rows)
+        return len(rows)
+
+    write_row = BatchedTask(write_rows, max_size=3, max_wait=10)
+    handles = [write_row.submit(number) for number in range(3)]
+
+    assert handles[0].result(timeout=5) == 3
+    assert batches == [[(0,), (1,), (2,)]]
+    assert len(write_row) == 0
+
+
+def test_flushes_on_time():
+    batches = []
+
+    def write_rows(rows):
+        batches.append(rows)
+
+    write_row = BatchedTask(write_rows, max_size=100, max_wait=0.01)
+    write_row.submit("a", 1)
+    write_row.submit("b", 2).result(timeout=5)
+
+    assert batches == [[("a", 1), ("b", 2)]]
+
+
+def test_explicit_flush():
+    batches = []
+
+    async def write_rows(rows):
+        batches.append(rows)
+
+    write_row = BatchedTask(write_rows, max_size=100, max_wait=10)
+
+    assert write_row.flush() is None
+
+    write_row.submit(1)
+    write_row.flush().result(timeout=5)
+
+    assert batches == [[(1,)]]
+
+
+def test_submit_from_many_threads():
+    rows = []
+    lock = threading.Lock()
+
+    def write_rows(batch):
+        with lock:
+            rows.extend(batch)
+
+    write_row = BatchedTask(write_rows, max_size=7, max_wait=0.01)
+    handles = []
+
+    def producer(start):
+        for number in range(start, start + 50):
+            handles.append(write_row.submit(number))
+
+    threads = [threading.Thread(target=producer, args=(i * 50,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for handle in handles:
+        handle.result(timeout=5)
+
+    assert sorted(number for (number,) in rows) == list(range(200))
+
+
+def test_errors_are_shared_by_the_batch():
+    def write_rows(rows):
+        raise ValueError("failed")
+
+    write_row = BatchedTask(write_rows, max_size=2, max_wait=10)
+    first = write_row.submit(1)
+    second = write_row.submit(2)
+
+    with pytest.raises(ValueError):
+        first.result(timeout=5)
+    with pytest.raises(ValueError):
+        second.result(timeout=5)
+
+
+async def test_batched_in_tasks_group():
+    batches = []
+
+    def write_rows(rows):
+        batches.append(rows)
+
+    # Flushed by the size, a pause of the loop cannot split the batch.
+    write_row = BatchedTask(write_rows, max_size=10, max_wait=10)
+    tasks = Tasks([Task(write_row, number) for number in range(10)], as_group=True)
+    await tasks()
+
+    assert len(batches) == 1
+    assert sorted(batches[0]) == [(number,) for number in range(10)]
+
+
+async def test_background_batched_decorator():
+    batches = []
+
+    @background.batched(max_size=2, max_wait=10)
+    def send_metrics(metrics):
+        batches.append(metrics)
+        return "sent"
+
+    send_metrics.submit("requests", 1)
+
+    assert await send_metrics("errors", 1) == "sent"
+    assert batches == [[("requests", 1), ("errors", 1)]]
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        BatchedTask(print, max_size=0)
+    with pytest.raises(ValueError):
+        BatchedTask(print, max_wait=-1)
@@ -0,0 +1,64 @@
+import functools
+import gc
+
+import pytest
+
+from backgrounder import _compat
+from backgrounder._compat import is_async_callable
+from backgrounder.concurrency import AsyncCallable, run_in_threadpool
+
+pytestmark = pytest.mark.anyio
+
+
+def blocking(a, b=0, c=0):
+    return a + b + c
+
+
+async def coroutine():
+    return None
+
+
+class Service:
+    async def handle(self):
+        return None
+
+    def __call__(self):
+        return None
+
+
+async def test_run_in_threadpool_passes_the_keyword_arguments():
+    assert await run_in_threadpool(blocking, 1, b=2, c=3) == 6
+
+
+async def test_async_callable_merges_the_default_kwargs():
+    assert await AsyncCallable(blocking, b=10)(1) == 11
+    assert await AsyncCallable(blocking, b=10)(1, b=2, c=3) == 6
+    assert await AsyncCallable(blocking)(1, 2) == 3
+
+
+def test_is_async_callable():
+    service = Service()
+
+    assert is_async_callable(coroutine)
+    assert is_async_callable(functools.partial(coroutine))
+    assert is_async_callable(service.handle)
+    assert not is_async_callable(service)
+    assert not is_async_callable(blocking)
+    assert not is_async_callable(print)
+
+
+def test_is_async_callable_caches_the_wrapped_callable():
+    async def local():
+        return None
+
+    is_async_callable(functools.partial(local))
+    assert _compat._async_callables[local] is True
+
+    service = Service()
+    is_async_callable(service.handle)
+    assert Service.handle in _compat._async_callables
+
+    # The entries do not keep the callables alive.
+    del local
+    gc.collect()
+    assert all(key.__name__ != "local" for key in _compat._async_callables.keys())
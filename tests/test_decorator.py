@@ -1,6 +1,14 @@
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future
+
+import anyio
 import pytest
 
 from backgrounder.decorator import background
+from backgrounder.handle import TaskHandle
+from backgrounder.runner import get_runner
 from backgrounder.tasks import Task
 
 GLOBAL = 0
@@ -69,3 +77,120 @@ def test_decorator():
     work(2)
 
     assert TOTAL == 2
+
+
+def test_decorator_without_wait_returns_handle():
+    event = threading.Event()
+
+    @background(wait=False)
+    def work(number):
+        event.wait(5)
+        return number * 2
+
+    handle = work(2)
+
+    assert isinstance(handle, TaskHandle)
+    assert not handle.done()
+
+    event.set()
+
+    assert handle.result(timeout=5) == 4
+    assert handle.done()
+
+
+def test_decorator_without_wait_cancel():
+    started = threading.Event()
+
+    @background(wait=False)
+    async def work():
+        started.set()
+        await anyio.sleep(10)
+
+    handle = work()
+    started.wait(5)
+
+    assert handle.cancel()
+    assert handle.cancelled()
+
+
+def test_decorator_without_wait_propagates_errors():
+    @background(wait=False)
+    def work():
+        raise ValueError("failed")
+
+    handle = work()
+
+    with pytest.raises(ValueError):
+        handle.result(timeout=5)
+
+
+async def test_decorator_without_wait_is_awaitable():
+    @background(wait=False)
+    async def work(number):
+        await anyio.sleep(0.01)
+        return number
+
+    handle = work(3)
+
+    assert await handle == 3
+
+
+@pytest.mark.parametrize("backend", ["asyncio", "trio"])
+def test_awaiting_handles_does_not_hold_threads(backend):
+    futures = [Future() for _ in range(100)]
+    results = []
+
+    async def wait(future):
+        results.append(await TaskHandle(future))
+
+    async def main():
+        async with anyio.create_task_group() as group:
+            for future in futures:
+                group.start_soon(wait, future)
+            await anyio.sleep(0.05)
+            assert anyio.to_thread.current_default_thread_limiter().borrowed_tokens == 0
+
+            # Completed from another thread and from the loop itself.
+            thread = threading.Thread(target=lambda: [f.set_result(1) for f in futures[:50]])
+            thread.start()
+            for future in futures[50:]:
+                future.set_result(2)
+            thread.join()
+
+    anyio.run(main, backend=backend)
+    assert sorted(results) == [1] * 50 + [2] * 50
+
+
+def test_decorator_without_wait_from_runner_loop():
+    @background(wait=False)
+    async def inner():
+        return 1
+
+    async def outer():
+        return await inner()
+
+    assert get_runner().run(outer) == 1
+
+
+def test_import_does_not_patch_asyncio():
+    code = (
+        "import asyncio; run = asyncio.run; loop = asyncio.new_event_loop();"
+        "import backgrounder;"
+        "assert asyncio.run is run;"
+        "assert not hasattr(loop, '_nest_patched')"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_decorator_blocking_call_inside_running_loop():
+    @background
+    def work(number):
+        return number * 2
+
+    async def main():
+        # Runs on the loop of the runner, the calling loop is only blocked.
+        return work(2)
+
+    assert anyio.run(main) == 4
+    assert anyio.run(main, backend="trio") == 4
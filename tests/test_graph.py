@@ -0,0 +1,150 @@
+import anyio
+import pytest
+
+from backgrounder.exceptions import CycleError, DependencyError
+from backgrounder.graph import TaskGraph
+from backgrounder.tasks import Task
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_graph_passes_results_downstream():
+    async def fetch(source):
+        await anyio.sleep(0.01)
+        return [source]
+
+    async def merge(a, b):
+        return a + b
+
+    def count(rows, offset=0):
+        return len(rows) + offset
+
+    graph = TaskGraph()
+    a = graph.add(Task(fetch, "a"))
+    b = graph.add(Task(fetch, "b"))
+    merged = graph.add(Task(merge), name="merge", depends_on=[a, b])
+    graph.add(Task(count, offset=10), depends_on=[merged])
+    graph.add(Task(count), depends_on=["merge"])
+
+    result = await graph()
+
+    assert result.values == [["a"], ["b"], ["a", "b"], 12, 2]
+    assert graph.index("merge") == 2
+
+
+async def test_graph_starts_tasks_as_soon_as_possible():
+    events = []
+
+    async def work(name, delay):
+        events.append(f"start {name}")
+        await anyio.sleep(delay)
+        events.append(f"end {name}")
+
+    graph = TaskGraph()
+    graph.add(Task(work, "slow", 0.1), name="slow")
+    graph.add(Task(work, "fast", 0.01), name="fast")
+    graph.add(Task(work, "after fast", 0.01), depends_on=["fast"], pass_results=False)
+
+    await graph()
+
+    # No stage barrier, the dependent of the fast task does not wait for the slow one.
+    assert events.index("start after fast") < events.index("end slow")
+
+
+async def test_graph_max_concurrency():
+    running = 0
+    peak = 0
+
+    async def work(*upstream):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await anyio.sleep(0.01)
+        running -= 1
+
+    graph = TaskGraph(max_concurrency=2)
+    roots = [graph.add(Task(work)) for _ in range(6)]
+    graph.add(Task(work), depends_on=roots)
+    await graph()
+
+    assert peak == 2
+
+
+async def test_graph_detects_cycles_and_unknown_dependencies():
+    async def work(*upstream): ...
+
+    graph = TaskGraph()
+    graph.add(Task(work), name="a", depends_on=["c"])
+    graph.add(Task(work), name="b", depends_on=["a"])
+    graph.add(Task(work), name="c", depends_on=["b"])
+
+    with pytest.raises(CycleError) as info:
+        await graph()
+    assert set(info.value.cycle) == {"a", "b", "c"}
+
+    graph = TaskGraph()
+    graph.add(Task(work), depends_on=["missing"])
+    with pytest.raises(ValueError):
+        graph.validate()
+
+    with pytest.raises(ValueError):
+        graph.add(Task(work), name=0)
+
+
+async def test_graph_failures_skip_the_dependents():
+    ran = []
+
+    async def fail():
+        raise KeyError("failed")
+
+    async def work(name, *upstream):
+        ran.append(name)
+        return name
+
+    graph = TaskGraph(return_exceptions=True)
+    failed = graph.add(Task(fail))
+    child = graph.add(Task(work, "child"), depends_on=[failed])
+    graph.add(Task(work, "grandchild"), depends_on=[child])
+    graph.add(Task(work, "other"))
+
+    result = await graph()
+
+    assert ran == ["other"]
+    assert isinstance(result[0].exception, KeyError)
+    assert isinstance(result[1].exception, DependencyError)
+    assert isinstance(result[2].exception, DependencyError)
+    assert result[3].value == "other"
+
+
+async def test_failure_skips_a_chain_deeper_than_the_recursion_limit():
+    async def fail():
+        raise KeyError("missing")
+
+    async def work(*upstream):
+        return None
+
+    graph = TaskGraph(return_exceptions=True)
+    previous = graph.add(Task(fail), name="root")
+    for index in range(3000):
+        previous = graph.add(Task(work), name=f"step-{index}", depends_on=[previous])
+
+    result = await graph()
+
+    assert all(isinstance(entry.exception, DependencyError) for entry in result.results[1:])
+    assert str(result[1].exception) == "The dependency 'root' of the task 'step-0' failed."
+
+
+async def test_graph_failure_propagates():
+    async def fail():
+        raise KeyError("failed")
+
+    graph = TaskGraph()
+    graph.add(Task(fail))
+
+    with pytest.raises(Exception) as info:
+        await graph()
+
+    # The task group of the graph wraps the error in an exception group.
+    assert any(
+        isinstance(exc, KeyError) for exc in getattr(info.value, "exceptions", [info.value])
+    )
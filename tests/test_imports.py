@@ -0,0 +1,62 @@
+import subprocess
+import sys
+
+import pytest
+
+import backgrounder
+
+# Generous budgets in microseconds, the point is to catch an eager import creeping back.
+BARE_IMPORT_BUDGET = 20_000
+TASK_IMPORT_BUDGET = 250_000
+
+
+def import_times(statement):
+    """
+    The modules imported by the statement in a fresh interpreter, with the cumulative
+    import time of the top level `backgrounder` ones.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set()
+    total = 0
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.add(name.strip())
+        if name.startswith(" backgrounder"):
+            total += int(cumulative)
+    return modules, total
+
+
+def test_bare_import_is_lazy():
+    modules, total = import_times("import backgrounder")
+
+    assert "backgrounder" in modules
+    assert not {"anyio", "sniffio", "backgrounder.tasks"} & modules
+    assert total < BARE_IMPORT_BUDGET
+
+
+@pytest.mark.parametrize(
+    "statement", ["from backgrounder import Task", "from backgrounder import TaskQueue"]
+)
+def test_optional_modules_are_not_imported(statement):
+    modules, total = import_times(statement)
+
+    assert not {"sqlite3", "multiprocessing", "trio", "uvloop", "anyio.to_process"} & modules
+    assert total < TASK_IMPORT_BUDGET
+
+
+def test_lazy_attributes():
+    from backgrounder.tasks import Task
+
+    assert backgrounder.Task is Task
+    assert "Task" in dir(backgrounder)
+    assert set(backgrounder.__all__) <= set(dir(backgrounder))
+
+    with pytest.raises(AttributeError):
+        backgrounder.Unknown  # noqa: B018
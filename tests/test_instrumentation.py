@@ -0,0 +1,153 @@
+import threading
+
+import anyio
+import pytest
+
+from backgrounder import TaskQueue, background
+from backgrounder.instrumentation import (
+    Histogram,
+    Instrument,
+    MetricsCollector,
+    add_instrument,
+    callable_name,
+    remove_instrument,
+)
+from backgrounder.tasks import Task, Tasks
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def metrics():
+    collector = MetricsCollector()
+    add_instrument(collector)
+    yield collector
+    remove_instrument(collector)
+
+
+async def work(number):
+    await anyio.sleep(0.001)
+    return number
+
+
+def blocking(number):
+    return number
+
+
+async def fail():
+    raise ValueError("failed")
+
+
+async def test_task_metrics(metrics):
+    name = callable_name(work)
+
+    assert await Task(work, 1)() == 1
+
+    stats = metrics.snapshot()[name]
+    assert stats["started"] == 1
+    assert stats["finished"] == 1
+    assert stats["submitted"] == 0
+    assert stats["duration"]["count"] == 1
+
+
+async def test_failed_task_metrics(metrics):
+    with pytest.raises(ValueError):
+        await Task(fail)()
+
+    stats = metrics.get(callable_name(fail))
+    assert stats.failed == 1
+    assert stats.finished == 0
+
+
+async def test_decorated_blocking_function_in_a_loop(metrics):
+    decorated = background(blocking)
+
+    assert decorated(1) == 1
+
+    stats = metrics.get(callable_name(blocking))
+    assert stats.submitted == 1
+    assert stats.started == 1
+    assert stats.finished == 1
+    assert stats.thread_wait.count == 1
+
+
+async def test_group_records_wait_and_thread_wait(metrics):
+    tasks = Tasks([Task(blocking, number) for number in range(5)], as_group=True)
+    result = await tasks()
+
+    assert result.values == [0, 1, 2, 3, 4]
+    stats = metrics.get(callable_name(blocking))
+    assert stats.submitted == 5
+    assert stats.wait.count == 5
+    assert stats.thread_wait.count == 5
+    assert metrics.get("Tasks").finished == 1
+
+
+async def test_queue_records_wait(metrics):
+    async with TaskQueue() as queue:
+        for number in range(3):
+            await queue.put(Task(work, number))
+        await queue.join()
+
+    stats = metrics.get(callable_name(work))
+    assert stats.submitted == 3
+    assert stats.wait.count == 3
+
+
+async def test_no_events_without_instruments():
+    events = []
+
+    class Recorder(Instrument):
+        def on_start(self, name, timestamp, wait):
+            events.append(name)
+
+    recorder = Recorder()
+    add_instrument(recorder)
+    remove_instrument(recorder)
+
+    await Task(work, 1)()
+
+    assert events == []
+
+
+async def test_failing_hook_does_not_break_tasks(caplog):
+    class Broken(Instrument):
+        def on_finish(self, name, timestamp, duration):
+            raise RuntimeError("broken")
+
+    broken = Broken()
+    add_instrument(broken)
+    try:
+        assert await Task(work, 1)() == 1
+    finally:
+        remove_instrument(broken)
+
+    assert "on_finish" in caplog.text
+
+
+def test_collector_is_thread_safe():
+    metrics = MetricsCollector()
+
+    def record():
+        for _ in range(1000):
+            metrics.on_submit("name", 0)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.get("name").submitted == 4000
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for _ in range(99):
+        histogram.record(0.001)
+    histogram.record(1)
+
+    assert histogram.count == 100
+    assert histogram.percentile(50) <= 0.002
+    assert histogram.percentile(100) == 1
+    assert histogram.max == 1
@@ -0,0 +1,169 @@
+import threading
+
+import anyio
+import pytest
+
+from backgrounder.concurrency import ProcessCallable
+from backgrounder.decorator import background
+from backgrounder.exceptions import NotPicklableError
+from backgrounder.journal import Journal
+from backgrounder.queue import TaskQueue
+from backgrounder.tasks import Task, Tasks
+
+pytestmark = pytest.mark.anyio
+
+RESULTS = []
+
+
+async def record(value, suffix=""):
+    RESULTS.append(f"{value}{suffix}")
+    return value
+
+
+def multiply(a, b):
+    return a * b
+
+
+@background
+def decorated(value):
+    return value
+
+
+@pytest.fixture
+def journal(tmp_path):
+    with Journal(tmp_path / "tasks.db") as journal:
+        yield journal
+
+
+@pytest.fixture(autouse=True)
+def clear_results():
+    RESULTS.clear()
+
+
+async def test_journal_round_trip(journal):
+    task = Task(record, 1, suffix="!").with_options(timeout=5, retries=2, backoff=0.5)
+    entry = journal.append(task, priority=3)
+
+    [(replayed_entry, priority, replayed)] = journal.pending()
+
+    assert (replayed_entry, priority) == (entry, 3)
+    assert replayed.args == (1,)
+    assert replayed.kwargs == {"suffix": "!"}
+    assert replayed.timeout == 5
+    assert replayed.retry.retries == 2
+    assert await replayed() == 1
+    assert RESULTS == ["1!"]
+
+
+async def test_journal_keeps_the_executor_and_unwraps_decorators(journal):
+    journal.append(Task(multiply, 2, 3).with_options(executor="process"))
+    journal.append(Task(decorated.__wrapped__, 4))
+
+    [(_, _, process), (_, _, thread)] = journal.pending()
+
+    assert isinstance(process.func, ProcessCallable)
+    assert await process() == 6
+    assert await thread() == 4
+
+
+def test_journal_complete_and_compact(journal):
+    entries = journal.append_many([Task(multiply, number, 2) for number in range(5)])
+
+    journal.complete(*entries[:3])
+
+    assert len(journal) == 2
+    assert [entry for entry, _, _ in journal.pending()] == entries[3:]
+    assert journal.compact() == 3
+
+
+def test_journal_compacts_automatically(tmp_path):
+    with Journal(tmp_path / "tasks.db", compact_every=2) as journal:
+        entries = journal.append_many([Task(multiply, 1, 2) for _ in range(3)])
+        journal.complete(*entries[:2])
+
+        assert journal.compact() == 0
+        assert len(journal) == 1
+
+
+def test_journal_rejects_what_cannot_be_replayed(journal):
+    async def local():
+        pass
+
+    with pytest.raises(NotPicklableError):
+        journal.append(Task(local))
+    with pytest.raises(NotPicklableError):
+        journal.append(Task(multiply, lambda: 1, 2))
+    with pytest.raises(TypeError):
+        journal.append(Tasks([Task(multiply, 1, 2)]))
+
+    assert len(journal) == 0
+
+
+async def test_queue_replays_pending_entries(tmp_path):
+    path = tmp_path / "tasks.db"
+
+    with Journal(path) as journal:
+        queue = TaskQueue(journal=journal)
+        queue.put_nowait(Task(record, "low"), priority=5)
+        queue.put_nowait(Task(record, "high"), priority=0)
+        # The process stops before the queue runs anything.
+
+    with Journal(path) as journal:
+        async with TaskQueue(journal=journal) as queue:
+            await queue.join()
+
+        assert RESULTS == ["high", "low"]
+        assert len(journal) == 0
+
+
+async def test_queue_completes_failed_tasks(journal):
+    async with TaskQueue(journal=journal) as queue:
+        await queue.put(Task(multiply, None, 2))
+        await queue.put(Task(record, "done"))
+        await queue.join()
+
+    assert RESULTS == ["done"]
+    assert len(journal) == 0
+
+
+class RecordingJournal(Journal):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = []
+
+    def _write(self, rows, completions):
+        self.writes.append((len(rows), len(completions), threading.current_thread()))
+        return super()._write(rows, completions)
+
+
+async def test_queue_batches_the_journal_writes_in_a_thread(tmp_path):
+    with RecordingJournal(tmp_path / "tasks.db") as journal:
+        async with TaskQueue(workers=4, journal=journal) as queue:
+            for number in range(50):
+                queue.put_nowait(Task(record, number))
+            await queue.join()
+
+        assert sorted(RESULTS) == sorted(str(number) for number in range(50))
+        assert len(journal) == 0
+        # The 50 tasks share a commit, and so do their completions.
+        assert journal.writes[0][0] == 50
+        assert sum(completions for _, completions, _ in journal.writes) == 50
+        assert len(journal.writes) < 10
+        assert all(thread is not threading.main_thread() for _, _, thread in journal.writes)
+
+
+async def test_put_returns_once_the_task_is_stored(journal):
+    async with TaskQueue(journal=journal) as queue:
+        await queue.put(Task(anyio.sleep, 0.2))
+        assert len(journal) == 1
+        await queue.put(Task(record, "next"))
+        assert len(journal) == 2
+
+    assert len(journal) == 0
+
+
+async def test_unstarted_queue_writes_right_away(journal):
+    queue = TaskQueue(journal=journal)
+    queue.put_nowait(Task(record, "first"))
+
+    assert len(journal) == 1
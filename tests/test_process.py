@@ -0,0 +1,102 @@
+import os
+import threading
+
+import pytest
+
+from backgrounder.concurrency import ProcessCallable
+from backgrounder.decorator import background
+from backgrounder.exceptions import NotPicklableError
+from backgrounder.tasks import Task, Tasks
+
+pytestmark = pytest.mark.anyio
+
+
+def get_pid(number: int = 0) -> int:
+    return os.getpid()
+
+
+def multiply(number: int, by: int = 1) -> int:
+    return number * by
+
+
+@background(executor="process")
+def decorated_pid() -> int:
+    return os.getpid()
+
+
+@background(executor="process", wait=False)
+def decorated_multiply(number: int) -> int:
+    return number * 2
+
+
+async def test_task_runs_in_a_process():
+    task = Task(get_pid).with_options(executor="process")
+
+    assert await task() != os.getpid()
+
+
+async def test_task_in_process_with_kwargs():
+    task = Task(multiply, 3, by=4).with_options(executor="process")
+
+    assert await task() == 12
+
+
+async def test_process_pool_is_reused():
+    pids = set()
+    for _ in range(5):
+        pids.add(await Task(get_pid).with_options(executor="process")())
+
+    assert os.getpid() not in pids
+    assert len(pids) == 1
+
+
+async def test_tasks_with_process_executor():
+    tasks = Tasks([Task(get_pid), Task(get_pid)], as_group=True).with_options(executor="process")
+    await tasks()
+
+    assert all(isinstance(task.func, ProcessCallable) for task in tasks.tasks)
+
+
+async def test_unpicklable_callable():
+    lock = threading.Lock()
+
+    def local():
+        return lock
+
+    task = Task(local).with_options(executor="process")
+
+    with pytest.raises(NotPicklableError):
+        await task()
+
+
+async def test_unpicklable_arguments():
+    task = Task(get_pid, threading.Lock()).with_options(executor="process")
+
+    with pytest.raises(NotPicklableError, match="arguments"):
+        await task()
+
+
+async def test_async_callable_in_process_is_rejected():
+    async def work(): ...
+
+    with pytest.raises(ValueError):
+        Task(work).with_options(executor="process")
+
+
+async def test_unknown_executor():
+    with pytest.raises(ValueError):
+        Task(get_pid).with_options(executor="fiber")
+
+
+def test_decorator_with_process_executor():
+    assert decorated_pid() != os.getpid()
+    assert decorated_multiply(21).result(timeout=30) == 42
+
+
+def test_decorator_with_process_executor_requires_module_level_function():
+    @background(executor="process")
+    def local():
+        return 1
+
+    with pytest.raises(NotPicklableError):
+        local()
@@ -0,0 +1,111 @@
+import anyio
+import pytest
+
+from backgrounder.queue import TaskQueue
+from backgrounder.tasks import Task
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_queue_runs_tasks_by_priority():
+    order = []
+
+    async def work(name):
+        order.append(name)
+
+    queue = TaskQueue(workers=1)
+    queue.put_nowait(Task(work, "low"), priority=10)
+    queue.put_nowait(Task(work, "first"), priority=0)
+    queue.put_nowait(Task(work, "second"), priority=0)
+    queue.put_nowait(Task(work, "high"), priority=-5)
+
+    async with queue:
+        await queue.join()
+
+    assert order == ["high", "first", "second", "low"]
+
+
+async def test_queue_runs_blocking_tasks_with_many_workers():
+    results = []
+
+    def work(number):
+        results.append(number)
+
+    async with TaskQueue(workers=4) as queue:
+        for number in range(20):
+            await queue.put(Task(work, number))
+
+    assert sorted(results) == list(range(20))
+    assert queue.unfinished == 0
+
+
+async def test_queue_is_bounded():
+    queue = TaskQueue(maxsize=2)
+
+    async def work(): ...
+
+    queue.put_nowait(Task(work))
+    queue.put_nowait(Task(work))
+
+    assert queue.full()
+    with pytest.raises(anyio.WouldBlock):
+        queue.put_nowait(Task(work))
+
+
+async def test_put_waits_for_a_free_slot():
+    done = []
+
+    async def work(number):
+        await anyio.sleep(0.01)
+        done.append(number)
+
+    async with TaskQueue(workers=1, maxsize=1) as queue:
+        for number in range(5):
+            await queue.put(Task(work, number))
+            assert queue.qsize() <= 1
+
+    assert done == [0, 1, 2, 3, 4]
+
+
+async def test_errors_do_not_stop_the_workers(caplog):
+    done = []
+
+    def fail():
+        raise ValueError("failed")
+
+    def work():
+        done.append(True)
+
+    async with TaskQueue(workers=1) as queue:
+        await queue.put(Task(fail))
+        await queue.put(Task(work))
+
+    assert done == [True]
+    assert "Error while running the task" in caplog.text
+
+
+async def test_closed_queue_rejects_tasks():
+    async def work(): ...
+
+    async with TaskQueue() as queue:
+        await queue.close()
+
+        with pytest.raises(anyio.ClosedResourceError):
+            await queue.put(Task(work))
+
+
+async def test_close_without_drain_discards_pending_tasks():
+    done = []
+
+    async def work(number):
+        done.append(number)
+
+    queue = TaskQueue()
+    for number in range(3):
+        queue.put_nowait(Task(work, number))
+
+    async with queue:
+        await queue.close(drain=False)
+
+    assert done == []
+    assert queue.unfinished == 0
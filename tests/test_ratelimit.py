@@ -0,0 +1,169 @@
+import time
+
+import anyio
+import pytest
+
+from backgrounder.decorator import background
+from backgrounder.ratelimit import KeyedRateLimiter, LeakyBucket, RateLimiter, TokenBucket
+from backgrounder.tasks import Task, Tasks
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_token_bucket_allows_a_burst_then_spaces_the_calls():
+    limiter = TokenBucket(50, burst=5)
+    started = time.monotonic()
+    calls = []
+
+    async def call(index):
+        calls.append(time.monotonic() - started)
+
+    tasks = Tasks([Task(call, index) for index in range(10)], as_group=True)
+    tasks.with_options(rate_limit=limiter)
+    await tasks()
+
+    calls.sort()
+    assert calls[4] < 0.015
+    # The 5 calls beyond the burst wait 20ms each.
+    assert calls[-1] >= 0.09
+
+
+async def test_leaky_bucket_spaces_the_calls_evenly():
+    limiter = LeakyBucket(100)
+    moments = []
+
+    async def call():
+        moments.append(time.monotonic())
+
+    await Tasks([Task(call).with_options(rate_limit=limiter) for _ in range(6)], as_group=True)()
+
+    # The slots are 10ms apart, a late call does not delay the next ones.
+    assert max(moments) - min(moments) >= 0.045
+
+
+async def test_tasks_added_later_use_the_rate_limit_of_the_group():
+    limiter = LeakyBucket(1000)
+    tasks = Tasks(as_group=True).with_options(rate_limit=limiter)
+    tasks.add_task(time.sleep, 0)
+
+    assert tasks.tasks[0].rate_limit is limiter
+    assert tasks.rate_limit is None
+
+
+async def test_keyed_limiter_limits_each_key_separately():
+    limiter = KeyedRateLimiter(lambda: LeakyBucket(10), key=lambda tenant: tenant)
+    started = time.monotonic()
+
+    async def call(tenant):
+        return time.monotonic() - started
+
+    tasks = Tasks([Task(call, tenant) for tenant in range(5)], as_group=True)
+    result = await tasks.with_options(rate_limit=limiter)()
+
+    # A single call per key never waits.
+    assert max(result.values) < 0.05
+
+    result = await Task(call, 0).with_options(rate_limit=limiter)()
+    assert result >= 0.09
+
+
+async def test_keyed_limiter_keeps_the_most_recent_keys():
+    limiter = KeyedRateLimiter(lambda: TokenBucket(1), key=lambda key: key, maxsize=2)
+    first = limiter.get("a")
+    limiter.get("b")
+    assert limiter.get("a") is first
+
+    limiter.get("c")
+    assert limiter.get("a") is first
+    assert list(limiter._limiters) == ["c", "a"]
+
+
+async def test_decorator_rate_limit():
+    limiter = LeakyBucket(50)
+    moments = []
+
+    @background(rate_limit=limiter)
+    async def call():
+        moments.append(time.monotonic())
+
+    async with anyio.create_task_group() as group:
+        for _ in range(3):
+            group.start_soon(call)
+
+    assert max(moments) - min(moments) >= 0.035
+
+
+def test_decorator_rate_limit_outside_a_loop():
+    limiter = TokenBucket(20, burst=1)
+
+    @background(rate_limit=limiter)
+    def call():
+        return time.monotonic()
+
+    first = call()
+    second = call()
+    assert second - first >= 0.04
+
+
+async def test_cancelled_waiter_gives_back_its_reservation():
+    limiter = LeakyBucket(10)
+    assert limiter.reserve() == 0
+
+    with anyio.move_on_after(0.01):
+        await limiter.acquire()
+
+    # The cancelled call did not push back the next one by another 100ms.
+    assert 0 < limiter.reserve() < 0.15
+
+
+async def test_cancelled_middle_waiter_keeps_the_spacing():
+    limiter = LeakyBucket(10)
+    scopes = {name: anyio.CancelScope() for name in "abcd"}
+    started = {}
+
+    async def call(name):
+        with scopes[name]:
+            await limiter.acquire()
+            started[name] = time.monotonic()
+
+    async with anyio.create_task_group() as group:
+        for name in "abc":
+            group.start_soon(call, name)
+            await anyio.sleep(0.001)
+        await anyio.sleep(0.02)
+        scopes["b"].cancel()
+        await anyio.sleep(0.02)
+        # The slot of b is not given to a new call, c keeps the one after it.
+        group.start_soon(call, "d")
+
+    assert set(started) == {"a", "c", "d"}
+    assert started["d"] - started["c"] >= 0.09
+
+
+def test_rate_limiters_implement_reserve():
+    class Incomplete(RateLimiter):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+async def test_token_bucket_gives_back_its_reservation():
+    limiter = TokenBucket(10, burst=1)
+    limiter.reserve()
+
+    with anyio.move_on_after(0.01):
+        await limiter.acquire()
+
+    assert 0 < limiter.reserve() < 0.15
+
+
+def test_invalid_rates():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+    with pytest.raises(ValueError):
+        TokenBucket(1, burst=0)
+    with pytest.raises(ValueError):
+        LeakyBucket(1, per=0)
+    with pytest.raises(TypeError):
+        KeyedRateLimiter(lambda: TokenBucket(1), key=lambda: None).reserve()
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+
+import anyio
+import pytest
+import sniffio
+
+import backgrounder
+from backgrounder.concurrency import run_sync
+from backgrounder.decorator import background
+from backgrounder.runner import Runner, get_runner
+from backgrounder.tasks import Task, Tasks
+
+
+async def get_thread_id() -> int:
+    await anyio.sleep(0)
+    return threading.get_ident()
+
+
+def test_runner_is_lazy_and_reuses_the_loop_thread():
+    runner = Runner()
+
+    assert not runner.is_running
+
+    first = runner.run(get_thread_id)
+    second = runner.run(get_thread_id)
+
+    assert runner.is_running
+    assert first == second
+    assert first != threading.get_ident()
+
+    runner.shutdown()
+    assert not runner.is_running
+
+
+def test_runner_pool_uses_all_workers():
+    runner = Runner(workers=3)
+    try:
+        thread_ids = {runner.run(get_thread_id) for _ in range(6)}
+    finally:
+        runner.shutdown()
+
+    assert len(thread_ids) == 3
+
+
+def test_runner_restarts_after_shutdown():
+    runner = Runner()
+    runner.run(get_thread_id)
+    runner.shutdown()
+
+    assert runner.run(get_thread_id)
+    runner.shutdown()
+
+
+def test_runner_shutdown_waits_for_pending_work():
+    runner = Runner()
+    done = False
+
+    async def work():
+        nonlocal done
+        await anyio.sleep(0.05)
+        done = True
+
+    runner.submit(work)
+    runner.shutdown()
+
+    assert done
+
+
+def test_runner_requires_one_worker():
+    with pytest.raises(ValueError):
+        Runner(workers=0)
+
+
+def test_runner_blocking_from_own_thread_raises():
+    runner = Runner()
+
+    async def nested():
+        return runner.run(get_thread_id)
+
+    try:
+        with pytest.raises(RuntimeError):
+            runner.run(nested)
+    finally:
+        runner.shutdown()
+
+
+def test_background_uses_the_shared_runner():
+    @background
+    def work():
+        return threading.get_ident()
+
+    @background
+    async def async_work():
+        return threading.get_ident()
+
+    assert async_work() == async_work()
+    assert work() != threading.get_ident()
+    assert get_runner().is_running
+
+
+def test_run_sync_from_inside_the_runner():
+    async def inner():
+        return 42
+
+    async def outer():
+        return run_sync(inner())
+
+    assert get_runner().run(outer) == 42
+
+
+async def get_backend():
+    return sniffio.current_async_library()
+
+
+def test_runner_trio_backend():
+    runner = Runner(backend="trio")
+    try:
+        assert runner.run(get_backend) == "trio"
+    finally:
+        runner.shutdown()
+
+
+def test_runner_backend_options():
+    async def is_debug():
+        return asyncio.get_running_loop().get_debug()
+
+    runner = Runner(backend_options={"debug": True})
+    try:
+        assert runner.run(is_debug)
+    finally:
+        runner.shutdown()
+
+
+def test_runner_unknown_backend():
+    with pytest.raises(ValueError):
+        Runner(backend="curio")
+
+
+def test_uvloop_backend():
+    uvloop = pytest.importorskip("uvloop")
+
+    async def loop_type():
+        return type(asyncio.get_running_loop())
+
+    runner = Runner(backend_options={"use_uvloop": True})
+    try:
+        assert runner.run(loop_type) is uvloop.Loop
+    finally:
+        runner.shutdown()
+
+
+def test_shared_runner_backend_is_used_everywhere(monkeypatch):
+    runner = Runner(backend="trio")
+    monkeypatch.setattr("backgrounder.runner._runner", runner)
+
+    @background
+    async def work():
+        return sniffio.current_async_library()
+
+    async def outer():
+        return run_sync(get_backend())
+
+    try:
+        assert work() == "trio"
+        assert get_runner().run(outer) == "trio"
+    finally:
+        runner.shutdown()
+
+
+def test_portal_submits_many_tasks():
+    async def double(number):
+        return number * 2
+
+    with backgrounder.portal() as portal:
+        futures = [portal.submit(Task(double, number)) for number in range(1000)]
+        group = portal.submit(Tasks([Task(double, 1), Task(double, 2)], as_group=True))
+
+    assert [future.result() for future in futures] == [number * 2 for number in range(1000)]
+    assert group.result().values == [2, 4]
+    assert not portal.is_running
+
+
+def test_portal_cancels_pending_work_on_error():
+    async def work():
+        await anyio.sleep(10)
+
+    with pytest.raises(ValueError):
+        with backgrounder.portal() as portal:
+            future = portal.submit(work)
+            raise ValueError("failed")
+
+    assert future.cancelled()
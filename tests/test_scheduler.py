@@ -0,0 +1,126 @@
+import time
+from datetime import datetime, timedelta
+
+import anyio
+import pytest
+
+from backgrounder.scheduler import Cron, Scheduler
+from backgrounder.tasks import Task
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_schedule_in_and_at():
+    runs = []
+
+    async def work(name):
+        runs.append(name)
+
+    async with Scheduler() as scheduler:
+        scheduler.schedule_in(Task(work, "later"), 0.05)
+        scheduler.schedule_in(Task(work, "soon"), timedelta(seconds=0.01))
+        scheduler.schedule_at(Task(work, "at"), datetime.now() + timedelta(seconds=0.03))
+        await anyio.sleep(0.1)
+
+    assert runs == ["soon", "at", "later"]
+    assert len(scheduler) == 0
+
+
+async def test_every_interval():
+    runs = []
+
+    async with Scheduler() as scheduler:
+        scheduled = scheduler.every(Task(runs.append, 1), 0.02, first_in=0)
+        await anyio.sleep(0.09)
+        scheduled.cancel()
+        count = scheduled.runs
+        await anyio.sleep(0.05)
+
+    assert 3 <= count <= 6
+    assert scheduled.runs == count
+
+
+async def test_cancel_before_the_run():
+    runs = []
+
+    async with Scheduler() as scheduler:
+        scheduled = scheduler.schedule_in(Task(runs.append, 1), 0.01)
+        scheduled.cancel()
+        await anyio.sleep(0.03)
+
+    assert runs == []
+    assert len(scheduler) == 0
+
+
+async def test_many_timers_share_one_timer():
+    runs = 0
+
+    async def work():
+        nonlocal runs
+        runs += 1
+
+    scheduler = Scheduler()
+    scheduled = [scheduler.schedule_in(Task(work), 0.01) for _ in range(2000)]
+    for entry in scheduled[::2]:
+        entry.cancel()
+
+    assert len(scheduler) == 1000
+
+    async with scheduler:
+        await anyio.sleep(0.2)
+
+    assert runs == 1000
+
+
+@pytest.mark.parametrize("misfire, expected", [("run_once", 1), ("run_all", 5), ("skip", 0)])
+async def test_misfire_policies(misfire, expected):
+    runs = []
+
+    async def work():
+        runs.append(1)
+
+    scheduler = Scheduler()
+    scheduler.every(Task(work), 0.1, first_in=0, misfire=misfire, grace=0.001)
+
+    # The scheduler starts late, the first 5 runs were missed. The next one is due 50ms
+    # later, out of reach of the few loop iterations below even on a loaded machine.
+    time.sleep(0.45)
+    async with scheduler:
+        for _ in range(5):
+            await anyio.sleep(0)
+
+    assert len(runs) == expected
+
+
+async def test_errors_do_not_stop_the_scheduler():
+    runs = []
+
+    async def fail():
+        raise ValueError("failed")
+
+    async with Scheduler(max_concurrency=1) as scheduler:
+        scheduler.schedule_in(Task(fail), 0)
+        scheduler.schedule_in(Task(runs.append, 1), 0.01)
+        await anyio.sleep(0.05)
+
+    assert runs == [1]
+
+
+def test_cron_next():
+    monday = datetime(2024, 1, 1, 10, 7, 30)
+
+    assert Cron("*/5 * * * *").next(monday) == datetime(2024, 1, 1, 10, 10)
+    assert Cron("30 2 * * *").next(monday) == datetime(2024, 1, 2, 2, 30)
+    assert Cron("0 9 * * 0").next(monday) == datetime(2024, 1, 7, 9, 0)
+    assert Cron("0 0 1 3 *").next(monday) == datetime(2024, 3, 1, 0, 0)
+    assert Cron("0 0 13 * 5").next(monday) == datetime(2024, 1, 5, 0, 0)
+    assert Cron("0 0 29 2 *").next(monday) == datetime(2024, 2, 29, 0, 0)
+
+
+def test_cron_validation():
+    with pytest.raises(ValueError):
+        Cron("* * * *")
+    with pytest.raises(ValueError):
+        Cron("60 * * * *")
+    with pytest.raises(ValueError):
+        Cron("0 0 31 2 *").next(datetime(2024, 1, 1))
@@ -0,0 +1,196 @@
+import threading
+import time
+
+import anyio
+import pytest
+
+from backgrounder.decorator import background
+from backgrounder.singleflight import SingleFlight
+from backgrounder.tasks import Task, Tasks
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_duplicates_share_one_execution():
+    calls = 0
+
+    async def rebuild(tenant_id):
+        nonlocal calls
+        calls += 1
+        await anyio.sleep(0.02)
+        return tenant_id * 10
+
+    tasks = Tasks(
+        [Task(rebuild, 42).with_options(key="tenant-42") for _ in range(5)]
+        + [Task(rebuild, 7).with_options(key="tenant-7")],
+        as_group=True,
+    )
+    result = await tasks()
+
+    assert result.values == [420] * 5 + [70]
+    assert calls == 2
+
+
+@pytest.mark.parametrize("backend", ["asyncio", "trio"])
+def test_more_duplicates_than_threads(backend):
+    calls = 0
+
+    async def rebuild(tenant_id):
+        nonlocal calls
+        calls += 1
+        await anyio.sleep(0.05)
+        # The leader still gets a thread while the duplicates wait.
+        return await anyio.to_thread.run_sync(lambda: tenant_id * 10)
+
+    async def main():
+        waiters = anyio.to_thread.current_default_thread_limiter().total_tokens + 20
+        tasks = Tasks(
+            [Task(rebuild, 42).with_options(key="tenant-42") for _ in range(waiters)],
+            as_group=True,
+        )
+        with anyio.fail_after(5):
+            return await tasks()
+
+    result = anyio.run(main, backend=backend)
+
+    assert set(result.values) == {420}
+    assert calls == 1
+
+
+async def test_key_function_and_errors_are_shared():
+    calls = 0
+
+    def fail(tenant_id):
+        nonlocal calls
+        calls += 1
+        time.sleep(0.02)
+        raise ValueError(tenant_id)
+
+    tasks = Tasks(
+        [Task(fail, 1).with_options(key=lambda tenant_id: tenant_id) for _ in range(3)],
+        as_group=True,
+        return_exceptions=True,
+    )
+    result = await tasks()
+
+    assert calls == 1
+    assert [str(exc) for exc in result.exceptions] == ["1", "1", "1"]
+
+
+async def test_sequential_calls_run_again_without_ttl():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+
+    task = Task(work).with_options(key="key")
+    await task()
+    await task()
+
+    assert calls == 2
+
+
+async def test_ttl_cache_with_lru_eviction():
+    calls = []
+    cache = SingleFlight(ttl=60, maxsize=2)
+
+    async def work(number):
+        calls.append(number)
+        return number
+
+    def task(number):
+        return Task(work, number).with_options(key=lambda number: number, single_flight=cache)
+
+    for number in [1, 2, 1, 3, 1, 2]:
+        assert await task(number)() == number
+
+    # 2 was the least recently used key when 3 was added.
+    assert calls == [1, 2, 3, 2]
+
+    cache.clear()
+    await task(1)()
+    assert calls == [1, 2, 3, 2, 1]
+
+
+async def test_ttl_expires():
+    calls = 0
+    cache = SingleFlight(ttl=0.01)
+
+    async def work():
+        nonlocal calls
+        calls += 1
+
+    await Task(work).with_options(key="key", single_flight=cache)()
+    await anyio.sleep(0.02)
+    await Task(work).with_options(key="key", single_flight=cache)()
+
+    assert calls == 2
+
+
+async def test_waiter_takes_over_when_the_leader_is_cancelled():
+    calls = 0
+    results = []
+    scope = anyio.CancelScope()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await anyio.sleep(0.02)
+        return calls
+
+    async def leader():
+        with scope:
+            await Task(work).with_options(key="key")()
+
+    async def waiter():
+        results.append(await Task(work).with_options(key="key")())
+
+    async with anyio.create_task_group() as group:
+        group.start_soon(leader)
+        await anyio.sleep(0.005)
+        group.start_soon(waiter)
+        await anyio.sleep(0.005)
+        scope.cancel()
+
+    assert results == [2]
+
+
+def test_decorator_shares_executions_across_threads():
+    calls = 0
+    started = threading.Event()
+
+    @background(key=lambda tenant_id: tenant_id)
+    def rebuild(tenant_id):
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.05)
+        return tenant_id
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(rebuild(1))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [1, 1, 1, 1]
+    assert calls == 1
+
+
+async def test_decorator_key_inside_a_loop():
+    calls = 0
+
+    @background(key="key")
+    async def work():
+        nonlocal calls
+        calls += 1
+        await anyio.sleep(0.01)
+        return calls
+
+    async with anyio.create_task_group() as group:
+        for _ in range(3):
+            group.start_soon(work)
+
+    assert calls == 1
@@ -0,0 +1,174 @@
+import time
+from array import array
+
+import anyio
+import pytest
+
+from backgrounder.ratelimit import LeakyBucket
+from backgrounder.singleflight import SingleFlight
+from backgrounder.taskbatch import TaskBatch
+
+pytestmark = pytest.mark.anyio
+
+
+async def add(a, b):
+    return a + b
+
+
+def multiply(a, b):
+    return a * b
+
+
+def fail_on_three(number):
+    if number == 3:
+        raise ValueError(number)
+    return number
+
+
+async def test_batch_returns_the_values_in_order():
+    batch = TaskBatch(add, [(number, 1) for number in range(500)], max_concurrency=7)
+
+    assert len(batch) == 500
+    assert await batch() == [number + 1 for number in range(500)]
+    assert len(batch) == 0
+
+
+async def test_blocking_callable_in_chunks():
+    batch = TaskBatch(multiply, max_concurrency=3, chunk_size=16)
+    batch.extend((number, 2) for number in range(100))
+
+    assert await batch() == [number * 2 for number in range(100)]
+
+
+@pytest.mark.parametrize("chunk_size", [None, 2])
+async def test_return_exceptions(chunk_size):
+    batch = TaskBatch(fail_on_three, return_exceptions=True, chunk_size=chunk_size)
+    batch.extend((number,) for number in range(5))
+
+    results = await batch()
+
+    assert results[:3] == [0, 1, 2]
+    assert isinstance(results[3], ValueError)
+    assert results[4] == 4
+
+
+@pytest.mark.parametrize("chunk_size", [None, 2])
+async def test_first_exception_is_raised(chunk_size):
+    batch = TaskBatch(fail_on_three, max_concurrency=1, chunk_size=chunk_size)
+    batch.extend((number,) for number in range(100))
+
+    with pytest.raises(Exception) as info:
+        await batch()
+
+    errors = getattr(info.value, "exceptions", [info.value])
+    assert isinstance(errors[0], ValueError)
+    # The rows after the failure were not taken.
+    assert len(batch) > 0
+
+
+async def test_int_and_float_columns_are_arrays():
+    batch = TaskBatch(add)
+    batch.append(1, 1.5)
+    batch.append(2, 2.5)
+
+    assert [type(column) for column in batch._columns] == [array, array]
+
+    # A value the array cannot hold turns the column into a list.
+    batch.append(True, 3.5)
+    batch.append(2**70, "text")
+
+    assert [type(column) for column in batch._columns] == [list, list]
+    assert batch._pop() == [1, 1.5]
+    assert batch._columns[0][1:] == [2, True, 2**70]
+
+
+async def test_consumed_rows_are_released():
+    batch = TaskBatch(add)
+    batch.extend((str(number), "") for number in range(10_000))
+
+    for _ in range(3000):
+        batch._pop()
+    # The values of the rows taken are dropped straight away.
+    assert batch._columns[0][2999] is None
+
+    for _ in range(3000):
+        batch._pop()
+    # Once half of the rows are consumed, they are removed from the columns.
+    assert len(batch._columns[0]) == 5000
+    assert len(batch) == 4000
+    assert batch._pop() == ["6000", ""]
+
+
+async def test_rows_must_have_the_same_length():
+    batch = TaskBatch(add)
+    batch.append(1, 2)
+
+    with pytest.raises(ValueError):
+        batch.append(1)
+
+
+async def test_rows_cannot_be_added_while_running():
+    errors = []
+
+    async def call(number):
+        try:
+            batch.append(number)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    batch = TaskBatch(call, [(1,)])
+    await batch()
+
+    assert len(errors) == 1
+
+
+async def test_rate_limit_applies_to_every_call():
+    moments = []
+
+    async def call(number):
+        moments.append(time.monotonic())
+
+    batch = TaskBatch(call, [(number,) for number in range(4)]).with_options(
+        rate_limit=LeakyBucket(50)
+    )
+    await batch()
+
+    assert max(moments) - min(moments) >= 0.055
+
+
+async def test_retries_apply_to_every_call():
+    attempts = {}
+
+    async def flaky(number):
+        attempts[number] = attempts.get(number, 0) + 1
+        if number == 20 and attempts[number] < 3:
+            raise ValueError(number)
+        return number + 10
+
+    batch = TaskBatch(flaky, [(10,), (20,), (30,)], max_concurrency=1).with_options(retries=2)
+
+    assert await batch() == [20, 30, 40]
+    assert attempts == {10: 1, 20: 3, 30: 1}
+
+
+async def test_batch_cannot_have_a_key():
+    batch = TaskBatch(add, [(1, 2)])
+
+    with pytest.raises(TypeError):
+        batch.with_options(key="batch")
+    with pytest.raises(TypeError):
+        batch.with_options(single_flight=SingleFlight())
+
+
+async def test_timeout_applies_to_the_batch():
+    batch = TaskBatch(anyio.sleep, [(1,) for _ in range(3)]).with_options(timeout=0.05)
+
+    with pytest.raises(TimeoutError):
+        await batch()
+
+
+def test_invalid_batches():
+    with pytest.raises(ValueError):
+        TaskBatch(add, max_concurrency=0)
+    with pytest.raises(ValueError):
+        TaskBatch(add, chunk_size=0)
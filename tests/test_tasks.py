@@ -0,0 +1,380 @@
+import threading
+import time
+
+import anyio
+import pytest
+from anyio import CapacityLimiter
+
+from backgrounder.retry import Retry
+from backgrounder.tasks import Task, Tasks
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_tasks_max_concurrency():
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await anyio.sleep(0.01)
+        running -= 1
+
+    tasks = Tasks([Task(work) for _ in range(20)], as_group=True, max_concurrency=3)
+    await tasks()
+
+    assert peak == 3
+    assert running == 0
+
+
+async def test_tasks_max_concurrency_must_be_positive():
+    with pytest.raises(ValueError):
+        Tasks(max_concurrency=0)
+
+
+async def test_task_limiter_is_shared():
+    limiter = CapacityLimiter(2)
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await anyio.sleep(0.01)
+        running -= 1
+
+    tasks = Tasks([Task(work).with_options(limiter=limiter) for _ in range(10)], as_group=True)
+    await tasks()
+
+    assert peak == 2
+
+
+async def test_thread_limiter_is_used_for_blocking_callables():
+    limiter = CapacityLimiter(1)
+    borrowed = []
+
+    def work():
+        borrowed.append(limiter.borrowed_tokens)
+
+    tasks = Tasks(as_group=True, thread_limiter=limiter)
+    tasks.add_task(work)
+    tasks.add_task(work)
+    await tasks()
+
+    assert borrowed == [1, 1]
+
+
+async def test_with_options_returns_the_task():
+    async def work():
+        return 1
+
+    task = Task(work)
+
+    assert task.with_options(limiter=CapacityLimiter(1)) is task
+    assert await task() == 1
+
+
+async def test_task_timeout():
+    async def work():
+        await anyio.sleep(10)
+
+    task = Task(work).with_options(timeout=0.01)
+
+    with pytest.raises(TimeoutError):
+        await task()
+
+
+async def test_blocking_task_timeout_does_not_wait_for_the_thread():
+    event = threading.Event()
+
+    def work():
+        event.wait(5)
+
+    task = Task(work).with_options(timeout=0.01)
+
+    with anyio.fail_after(2):
+        with pytest.raises(TimeoutError):
+            await task()
+
+    event.set()
+
+
+async def test_task_retries():
+    attempts = 0
+
+    async def work():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise ConnectionError("unavailable")
+        return attempts
+
+    task = Task(work).with_options(retries=2, backoff=0.001)
+
+    assert await task() == 3
+
+
+async def test_task_retries_exhausted():
+    attempts = 0
+
+    def work():
+        nonlocal attempts
+        attempts += 1
+        raise ConnectionError("unavailable")
+
+    task = Task(work).with_options(retries=2)
+
+    with pytest.raises(ConnectionError):
+        await task()
+
+    assert attempts == 3
+
+
+async def test_task_retry_on_filters_exceptions():
+    attempts = 0
+
+    async def work():
+        nonlocal attempts
+        attempts += 1
+        raise KeyError("not retried")
+
+    task = Task(work).with_options(retries=5, retry_on=(ConnectionError,))
+
+    with pytest.raises(KeyError):
+        await task()
+
+    assert attempts == 1
+
+
+async def test_task_retries_timeouts():
+    attempts = 0
+
+    async def work():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            await anyio.sleep(10)
+        return attempts
+
+    task = Task(work).with_options(timeout=0.01, retries=1)
+
+    assert await task() == 2
+
+
+async def test_retries_keep_the_group_alive():
+    attempts = 0
+    done = []
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ConnectionError("unavailable")
+
+    async def work():
+        await anyio.sleep(0.01)
+        done.append(True)
+
+    tasks = Tasks([Task(flaky).with_options(retries=1), Task(work)], as_group=True)
+    await tasks()
+
+    assert done == [True]
+
+
+def test_retry_delay():
+    retry = Retry(retries=5, backoff=1, max_backoff=5, jitter=False)
+
+    assert [retry.delay(attempt) for attempt in range(5)] == [1, 2, 4, 5, 5]
+
+    retry.jitter = True
+    assert all(0 <= retry.delay(attempt) <= 5 for attempt in range(5))
+
+
+def test_retry_validation():
+    with pytest.raises(ValueError):
+        Retry(retries=-1)
+
+    async def work(): ...
+
+    with pytest.raises(ValueError):
+        Task(work).with_options(retries=1, retry_on=(BaseException,))
+
+
+@pytest.mark.parametrize("as_group", [False, True])
+async def test_tasks_return_exceptions(as_group):
+    async def work(number):
+        await anyio.sleep(0.01 * (5 - number))
+        if number % 2:
+            raise ValueError(number)
+        return number
+
+    tasks = Tasks(
+        [Task(work, number) for number in range(5)], as_group=as_group, return_exceptions=True
+    )
+    result = await tasks()
+
+    assert len(result) == 5
+    assert result.values == [0, None, 2, None, 4]
+    assert [str(exc) for exc in result.exceptions] == ["1", "3"]
+    assert [task_result.index for task_result in result.failed] == [1, 3]
+    assert not result.ok
+    assert result.duration >= 0
+    assert all(task_result.duration >= 0 for task_result in result.results)
+
+    with pytest.raises(ValueError):
+        result.raise_for_exceptions()
+    with pytest.raises(ValueError):
+        result[1].unwrap()
+
+
+async def test_tasks_return_exceptions_with_max_concurrency():
+    async def work(number):
+        if number == 0:
+            raise ValueError(number)
+        await anyio.sleep(0.01)
+        return number
+
+    tasks = Tasks(
+        [Task(work, number) for number in range(10)],
+        as_group=True,
+        max_concurrency=2,
+        return_exceptions=True,
+    )
+    result = await tasks()
+
+    assert result.values == [None] + list(range(1, 10))
+    assert len(result.failed) == 1
+
+
+async def test_tasks_return_results_in_order():
+    def work(number):
+        return number * 2
+
+    tasks = Tasks(as_group=True)
+    for number in range(3):
+        tasks.add_task(work, number)
+
+    result = await tasks()
+
+    assert result.ok
+    assert result.values == [0, 2, 4]
+
+
+@pytest.mark.parametrize("as_group", [True, False])
+async def test_tasks_chunk_size_runs_chunks_in_one_thread_hop(as_group):
+    threads = {}
+
+    def work(number):
+        threads[number] = threading.get_ident()
+        return number * 2
+
+    tasks = Tasks([Task(work, number) for number in range(10)], as_group=as_group, chunk_size=4)
+    result = await tasks()
+
+    assert result.values == [number * 2 for number in range(10)]
+    chunks = [{threads[number] for number in chunk} for chunk in ([0, 1, 2, 3], [4, 5, 6, 7])]
+    assert all(len(chunk) == 1 for chunk in chunks)
+
+
+async def test_tasks_chunk_size_keeps_the_order_around_other_tasks():
+    calls = []
+
+    def blocking(number):
+        calls.append(number)
+
+    async def coroutine(number):
+        calls.append(number)
+
+    tasks = Tasks(
+        [Task(blocking, 0), Task(blocking, 1), Task(coroutine, 2), Task(blocking, 3)],
+        chunk_size=10,
+    )
+    assert [len(unit) if isinstance(unit, list) else unit[0] for unit in tasks._units()] == [
+        2,
+        2,
+        1,
+    ]
+
+    await tasks()
+    assert calls == [0, 1, 2, 3]
+
+
+async def test_tasks_chunk_size_skips_the_tasks_with_options():
+    tasks = Tasks(
+        [Task(print).with_options(timeout=1), Task(print), Task(print).with_options(retries=1)],
+        chunk_size=10,
+    )
+
+    assert [isinstance(unit, list) for unit in tasks._units()] == [False, True, False]
+
+
+async def test_tasks_chunk_size_stops_at_the_first_exception():
+    calls = []
+
+    def work(number):
+        calls.append(number)
+        if number == 1:
+            raise ValueError(number)
+
+    tasks = Tasks([Task(work, number) for number in range(5)], as_group=True, chunk_size=5)
+    with pytest.raises(Exception) as info:
+        await tasks()
+
+    assert any(
+        isinstance(exc, ValueError) for exc in getattr(info.value, "exceptions", [info.value])
+    )
+    assert calls == [0, 1]
+
+
+async def test_tasks_chunk_size_collects_exceptions():
+    def work(number):
+        if number % 2:
+            raise ValueError(number)
+        return number
+
+    tasks = Tasks(
+        [Task(work, number) for number in range(6)],
+        as_group=True,
+        max_concurrency=2,
+        chunk_size=2,
+        return_exceptions=True,
+    )
+    result = await tasks()
+
+    assert result.values == [0, None, 2, None, 4, None]
+    assert [task_result.index for task_result in result.failed] == [1, 3, 5]
+
+
+async def test_tasks_chunk_size_respects_the_thread_limiter_of_the_tasks():
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+
+    limiter = CapacityLimiter(1)
+    tasks = Tasks(
+        [Task(work).with_options(thread_limiter=limiter) for _ in range(8)],
+        as_group=True,
+        chunk_size=2,
+    )
+    await tasks()
+    assert peak == 1
+
+    # The tasks with another limiter start a new chunk.
+    mixed = Tasks([Task(work), Task(work), *tasks.tasks[:3], Task(work)], chunk_size=10)
+    assert [len(unit) for unit in mixed._units()] == [2, 3, 1]
+
+
+def test_tasks_invalid_chunk_size():
+    with pytest.raises(ValueError):
+        Tasks(chunk_size=0)
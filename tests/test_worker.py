@@ -0,0 +1,277 @@
+import asyncio
+import os
+import queue
+import signal
+import socket
+import stat
+import subprocess
+import sys
+import threading
+import time
+
+import anyio
+import pytest
+
+from backgrounder.broker import Broker, LocalBroker
+from backgrounder.cli import build_parser, main
+from backgrounder.tasks import Task
+from backgrounder.worker import Worker, WorkerPool
+
+pytestmark = pytest.mark.anyio
+
+RESULTS = []
+
+
+async def record(value):
+    RESULTS.append(value)
+
+
+async def slow_record(value, delay):
+    await anyio.sleep(delay)
+    RESULTS.append(value)
+
+
+def fail():
+    raise ValueError("boom")
+
+
+def touch(path, delay=0.0):
+    time.sleep(delay)
+    with open(path, "w") as file:
+        file.write(str(os.getpid()))
+
+
+async def record_loop(path):
+    with open(path, "w") as file:
+        file.write(type(asyncio.get_running_loop()).__module__)
+
+
+class MemoryBroker(Broker):
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def publish(self, message):
+        self.queue.put(message)
+
+    def consume(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def qsize(self):
+        return self.queue.qsize()
+
+
+@pytest.fixture(autouse=True)
+def clear_results():
+    RESULTS.clear()
+
+
+def wait_for(predicate, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out.")
+        time.sleep(0.05)
+
+
+async def test_worker_runs_the_tasks_and_logs_the_errors(caplog):
+    broker = MemoryBroker()
+    for value in range(5):
+        broker.send(Task(record, value))
+    broker.send(Task(fail))
+
+    worker = Worker(broker, concurrency=2, poll_interval=0.01)
+    async with anyio.create_task_group() as group:
+        group.start_soon(worker.run)
+        while worker.processed < 6:
+            await anyio.sleep(0.01)
+        worker.stop()
+
+    assert sorted(RESULTS) == [0, 1, 2, 3, 4]
+    assert "Error while running the task" in caplog.text
+
+
+async def test_worker_prefetch_leaves_the_rest_in_the_broker():
+    broker = MemoryBroker()
+    for value in range(10):
+        broker.send(Task(slow_record, value, 0.2))
+
+    worker = Worker(broker, concurrency=2, prefetch=1, poll_interval=0.01)
+    async with anyio.create_task_group() as group:
+        group.start_soon(worker.run)
+        await anyio.sleep(0.05)
+        # 2 running, 1 buffered and at most 1 held by the fetcher.
+        assert broker.qsize() >= 6
+        worker.stop()
+
+    # The tasks taken before stopping were run, the others are left to other workers.
+    assert len(RESULTS) == 10 - broker.qsize()
+    assert 3 <= len(RESULTS) <= 4
+
+
+def test_pool_targets_follow_the_queue_depth():
+    pool = WorkerPool(MemoryBroker(), processes=1, max_processes=4, concurrency=5, prefetch=5)
+
+    assert pool.target(0) == 1
+    assert pool.target(10) == 1
+    assert pool.target(25) == 3
+    assert pool.target(1000) == 4
+
+
+def test_invalid_pools():
+    with pytest.raises(ValueError):
+        WorkerPool(MemoryBroker(), processes=0)
+    with pytest.raises(ValueError):
+        WorkerPool(MemoryBroker(), processes=2, max_processes=1)
+    with pytest.raises(ValueError):
+        Worker(MemoryBroker(), prefetch=-1)
+
+
+def test_pool_scales_and_drains(tmp_path):
+    broker = LocalBroker(str(tmp_path / "queue.sock")).serve()
+    try:
+        for index in range(12):
+            broker.send(Task(touch, str(tmp_path / f"{index}.done"), 0.3))
+
+        pool = WorkerPool(
+            broker, processes=1, max_processes=3, concurrency=1, prefetch=1, scale_interval=0.1
+        )
+        thread = threading.Thread(target=pool.run)
+        thread.start()
+        try:
+            wait_for(lambda: len(pool) == 3)
+            wait_for(lambda: len(list(tmp_path.glob("*.done"))) == 12)
+            # Once the queue is empty, the pool goes back to its minimum.
+            wait_for(lambda: len(pool) == 1)
+        finally:
+            pool.stop()
+            thread.join()
+
+        pids = {path.read_text() for path in tmp_path.glob("*.done")}
+        assert len(pids) > 1
+    finally:
+        broker.close()
+
+
+def test_tcp_address_needs_an_authkey(monkeypatch):
+    monkeypatch.delenv("BACKGROUNDER_AUTHKEY", raising=False)
+    with pytest.raises(ValueError):
+        LocalBroker("127.0.0.1:7000")
+    with pytest.raises(SystemExit):
+        main(["worker", "--address", "127.0.0.1:7000"])
+
+    assert LocalBroker("127.0.0.1:7000", "secret").authkey == b"secret"
+    monkeypatch.setenv("BACKGROUNDER_AUTHKEY", "from the environment")
+    assert LocalBroker("127.0.0.1:7000").authkey == b"from the environment"
+
+
+def test_serve_keeps_a_running_queue(tmp_path):
+    address = str(tmp_path / "queue.sock")
+    # Left behind by a server that did not stop cleanly.
+    with socket.socket(socket.AF_UNIX) as stale:
+        stale.bind(address)
+
+    with LocalBroker(address) as broker:
+        assert stat.S_IMODE(os.stat(address).st_mode) == 0o600
+        with pytest.raises(RuntimeError):
+            LocalBroker(address).serve()
+
+        broker.send(Task(record, 1))
+        assert broker.qsize() == 1
+
+
+def test_socket_key_is_random_and_private(tmp_path, monkeypatch):
+    monkeypatch.delenv("BACKGROUNDER_AUTHKEY", raising=False)
+    address = str(tmp_path / "queue.sock")
+
+    with LocalBroker(address) as broker:
+        keyfile = tmp_path / "queue.sock.key"
+        assert keyfile.read_bytes() == broker.authkey
+        assert stat.S_IMODE(keyfile.stat().st_mode) == 0o600
+
+        client = LocalBroker(address)
+        assert client.authkey is None
+        client.send(Task(record, 1))
+        assert client.authkey == broker.authkey
+
+        # A socket of another user may be a server listening in place of the queue.
+        monkeypatch.setattr(os, "getuid", lambda: os.stat(address).st_uid + 1)
+        with pytest.raises(PermissionError):
+            LocalBroker(address).qsize()
+
+    assert not keyfile.exists()
+    with LocalBroker(address) as broker:
+        assert keyfile.read_bytes() == broker.authkey != client.authkey
+
+
+def test_brokers_implement_the_interface():
+    class Incomplete(Broker):
+        def publish(self, message):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_parser_defaults():
+    arguments = build_parser().parse_args(["worker", "--workers", "2", "--max-workers", "4"])
+
+    assert arguments.workers == 2
+    assert arguments.max_workers == 4
+    assert arguments.concurrency == 10
+    assert arguments.prefetch is None
+    assert not arguments.connect
+    assert not arguments.uvloop
+
+
+def test_uvloop_needs_asyncio():
+    with pytest.raises(SystemExit):
+        main(["worker", "--backend", "trio", "--uvloop"])
+
+
+def test_invalid_broker_path():
+    with pytest.raises(TypeError):
+        main(["worker", "--broker", "os:getpid"])
+
+
+def test_cli_drains_on_sigterm(tmp_path):
+    address = str(tmp_path / "queue.sock")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "backgrounder", "worker", "--address", address, "-c", "2"],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    try:
+        wait_for(lambda: os.path.exists(address))
+        broker = LocalBroker(address)
+        broker.send(Task(touch, str(tmp_path / "first.done")))
+        wait_for(lambda: (tmp_path / "first.done").exists())
+
+        broker.send(Task(touch, str(tmp_path / "slow.done"), 1.0))
+        time.sleep(0.5)
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=15) == 0
+        # The task running when the signal arrived was finished before exiting.
+        assert (tmp_path / "slow.done").exists()
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+
+def test_cli_runs_the_workers_on_uvloop(tmp_path):
+    pytest.importorskip("uvloop")
+    address = str(tmp_path / "queue.sock")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "backgrounder", "worker", "--address", address, "--uvloop"],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    try:
+        wait_for(lambda: os.path.exists(address))
+        LocalBroker(address).send(Task(record_loop, str(tmp_path / "loop")))
+        wait_for(lambda: (tmp_path / "loop").exists() and (tmp_path / "loop").read_text())
+
+        assert (tmp_path / "loop").read_text().startswith("uvloop")
+    finally:
+        process.terminate()
+        process.wait(timeout=15)